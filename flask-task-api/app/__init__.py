@@ -6,69 +6,98 @@ configuration loading, and blueprint registration.
 """
 
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from flask_limiter import Limiter, RateLimitExceeded
 from flask_caching import Cache
 from flask_cors import CORS
-import os
-import logging
-from dotenv import load_dotenv
 from config import config
+from .utils import metrics
+from .utils.database import Database
+from .utils.json_provider import OrjsonProvider
+from .utils.logging_config import configure_logging
+from .utils.rate_limit import rate_limit_exceeded, rate_limit_key
+from .utils.token_cache import CachingJWTManager
 
-# Load environment variables
-load_dotenv()
-
-# Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
-limiter = Limiter(key_func=get_remote_address)
+# Initialize extensions; config loads the .env file
+db = Database()
+jwt = CachingJWTManager()
+limiter = Limiter(key_func=rate_limit_key)
 cache = Cache()
 cors = CORS()
 
-def create_app(config_name='default'):
+
+def create_app(config_name='default', cli=True):
     """
     Create and configure the Flask application.
 
     Args:
         config_name (str): Configuration name to use. Defaults to 'default'.
+        cli (bool): Register Flask-Migrate and the ``flask`` commands. Servers
+            pass False to skip importing them.
 
     Returns:
         Flask: Configured Flask application instance
     """
     app = Flask(__name__)
-    
+    app.json = OrjsonProvider(app)
+
     # Load configuration
     app.config.from_object(config[config_name])
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
     jwt.init_app(app)
     limiter.init_app(app)
-    cache.init_app(app, config={
-        'CACHE_TYPE': 'SimpleCache',
-        'CACHE_DEFAULT_TIMEOUT': 300
-    })
+    app.register_error_handler(RateLimitExceeded, rate_limit_exceeded(limiter))
+    cache.init_app(app)
     cors.init_app(app)
     
     # Import models
-    from .models import user, task
-    
-    # Setup logging
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    from .models import user, task, task_change, task_stat, job, revoked_token, scheduler_state, task_event
     
+    # Setup logging and request metrics
+    configure_logging(app)
+    metrics.init_app(app)
+
     # Register blueprints
     from .routes.auth_routes import auth_bp
     from .routes.task_routes import task_bp
     from .routes.health_routes import health_bp
+    from .routes.job_routes import job_bp
+    from .routes.user_routes import user_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(task_bp, url_prefix='/api/v1')
+    app.register_blueprint(job_bp, url_prefix='/api/v1')
+    app.register_blueprint(user_bp, url_prefix='/api/v1')
     app.register_blueprint(health_bp, url_prefix='/api')
 
+    # Register CLI commands; Flask-Migrate and Alembic take longer to import
+    # than the rest of the application
+    if cli:
+        from flask_migrate import Migrate
+        from . import cli as commands
+
+        Migrate(app, db)
+        commands.init_app(app)
+
+    # Cache task responses only where invalidation reaches every worker
+    from .services import cache_service
+    cache_service.init_app(app)
+
+    # Route reads to replicas only where read-your-writes state is shared
+    from .services import replica_service
+    replica_service.init_app(app)
+
+    # Check revoked tokens against the in-memory list of this process
+    from .services import token_service
+    token_service.init_app(app)
+
+    # Deliver task events to the event streams of this process
+    from .services import event_stream
+    event_stream.init_app(app)
+
+    # Run background jobs in this process if configured
+    from .services import job_worker
+    job_worker.init_app(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+ASGI application of the Task Management API.
+
+TaskAsgiApp serves the Flask application under an ASGI server such as
+uvicorn. Requests with a native async handler (see
+routes.async_task_routes) run on the event loop with an AsyncSession, so
+waiting on the database or on slow clients doesn't hold a thread. All other
+requests run the WSGI application in a thread pool of ASGI_THREADS threads.
+Native handlers may stream a response, such as the task event stream, by
+setting an async iterator of chunks as its ``async_body``.
+"""
+
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from werkzeug.exceptions import HTTPException
+from . import db, limiter
+from .routes.async_task_routes import native_view
+from .services.async_task_service import AsyncTaskService
+
+
+class _WsgiRequest(WsgiToAsgiInstance):
+    """
+    WSGI request running in the given thread pool.
+
+    asgiref runs every WSGI request of the process on one shared thread
+    unless told otherwise.
+    """
+
+    def __init__(self, wsgi_app, executor):
+        super().__init__(wsgi_app)
+        run = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+        self.run_wsgi_app = sync_to_async(partial(run, self), thread_sensitive=False, executor=executor)
+
+
+def _build_environ(scope):
+    """
+    Build the WSGI environment of a request without a body.
+    """
+    request = WsgiToAsgiInstance(None)
+    request.scope = scope
+    return request.build_environ(scope, io.BytesIO())
+
+
+class TaskAsgiApp:
+    """
+    ASGI application serving a Flask application of the Task Management API.
+
+    Native handlers run inside a request context of the Flask application:
+    before_request hooks, the JWT check, rate limits, error handlers and
+    after_request hooks apply to them as to any other request. Without an
+    asyncio driver for the database, or with ASGI_NATIVE_VIEWS disabled,
+    every request is served through WSGI.
+    """
+
+    def __init__(self, app):
+        """
+        Args:
+            app (Flask): The application to serve
+        """
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config['ASGI_THREADS'], thread_name_prefix='wsgi'
+        )
+        self.async_engine = None
+        self.async_session = None
+        self.native = app.config['ASGI_NATIVE_VIEWS']
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] == 'http' and self.native:
+            try:
+                environ = _build_environ(scope)
+                endpoint, view_args = self.app.url_map.bind_to_environ(environ).match()
+            except (HTTPException, ValueError):
+                # Unknown routes and malformed requests are answered by Flask
+                view = None
+            else:
+                view = native_view(endpoint, environ)
+            if view and self._start():
+                return await self._dispatch(view, view_args, environ, receive, send)
+
+        await _WsgiRequest(self.app, self.executor)(scope, receive, send)
+
+    def _start(self):
+        """
+        Create the asyncio engine on first use.
+
+        Returns:
+            bool: True if native handlers can be used
+        """
+        if self.async_session is None and self.native:
+            try:
+                self.async_engine = db.create_async_engine(self.app)
+            except ValueError as e:
+                self.app.logger.warning('Serving all requests through WSGI: %s', e)
+                self.native = False
+                return False
+            self.async_session = sessionmaker(self.async_engine, class_=AsyncSession)
+        return self.native
+
+    def _prime_blocklist(self):
+        with self.app.app_context():
+            self.app.extensions['token_blocklist'].prime()
+
+    async def _lifespan(self, receive, send):
+        """
+        Create the asyncio engine and load the revoked tokens at startup, and
+        dispose of the engine at shutdown.
+
+        The revoked tokens are loaded in the thread pool, so that the JWT
+        checks of native handlers don't wait for the database on the event
+        loop.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await asyncio.get_running_loop().run_in_executor(self.executor, self._prime_blocklist)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.async_engine is not None:
+                    await self.async_engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _dispatch(self, view, view_args, environ, receive, send):
+        """
+        Run a native handler the way Flask runs a view, and send its response.
+        """
+        app = self.app
+        with app.request_context(environ):
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    verify_jwt_in_request()
+                    if limiter.enabled:
+                        limiter.check()
+                    async with self.async_session() as session:
+                        rv = await view(AsyncTaskService(session), **view_args)
+            except Exception as e:
+                try:
+                    rv = app.handle_user_exception(e)
+                except Exception as e:
+                    rv = app.handle_exception(e)
+            response = app.finalize_request(rv)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in response.headers.items()
+            ],
+        })
+        body = getattr(response, 'async_body', None)
+        if body is None:
+            await send({'type': 'http.response.body', 'body': response.get_data()})
+        else:
+            await _stream(body, receive, send)
+
+
+async def _stream(chunks, receive, send):
+    """
+    Send the chunks of a streamed response until it ends or the client
+    disconnects, and close the iterator.
+    """
+    async def disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(disconnect())
+    chunk = None
+    try:
+        while True:
+            chunk = asyncio.ensure_future(chunks.__anext__())
+            await asyncio.wait({chunk, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not chunk.done():
+                return
+            try:
+                data = chunk.result()
+            except StopAsyncIteration:
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            await send({'type': 'http.response.body', 'body': data, 'more_body': True})
+    finally:
+        disconnected.cancel()
+        if chunk is not None and not chunk.done():
+            # The iterator can only be closed once the pending step ended
+            chunk.cancel()
+            await asyncio.wait({chunk})
+        await chunks.aclose()
@@ -0,0 +1,218 @@
+"""
+Command line interface of the Task Management API.
+
+This module defines the ``flask`` commands used to maintain the database,
+run background jobs and the due date scheduler, prune revoked tokens and
+task events, and generate synthetic data.
+"""
+
+import time
+from datetime import timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+tasks_cli = AppGroup('tasks', help='Maintain task data.')
+jobs_cli = AppGroup('jobs', help='Run and maintain background jobs.')
+fixtures_cli = AppGroup('fixtures', help='Generate synthetic data for profiling.')
+tokens_cli = AppGroup('tokens', help='Maintain revoked access tokens.')
+scheduler_cli = AppGroup('scheduler', help='Report tasks that are due soon or overdue.')
+events_cli = AppGroup('events', help='Maintain the task event outbox.')
+
+
+@click.command('create-tables')
+def create_tables():
+    """
+    Create the database tables that do not exist yet.
+
+    Existing tables are left unchanged; upgrade existing databases with
+    ``flask db upgrade``.
+    """
+    from . import db
+
+    db.create_all()
+    click.echo('Created missing tables.')
+
+
+@tasks_cli.command('rebuild-stats')
+def rebuild_stats():
+    """
+    Recompute the task statistics counters from the tasks table.
+    """
+    from .services.task_service import TaskService
+
+    rows = TaskService.rebuild_stats()
+    click.echo(f'Rebuilt task statistics ({rows} counters).')
+
+
+@tasks_cli.command('rebuild-search')
+def rebuild_search():
+    """
+    Create the full-text search index if missing and refill it from the tasks.
+    """
+    from .services.task_service import TaskService
+
+    TaskService.rebuild_search_index()
+    click.echo('Rebuilt task search index.')
+
+
+@jobs_cli.command('worker')
+@click.option('--concurrency', type=int, help='Worker threads (default: JOB_WORKER_CONCURRENCY).')
+@click.option('--stats-interval', type=float, default=60.0, show_default=True,
+              help='Seconds between throughput reports.')
+def run_worker(concurrency, stats_interval):
+    """
+    Run background jobs until interrupted.
+    """
+    from .services.job_worker import JobWorker
+
+    app = current_app._get_current_object()
+    worker = JobWorker(
+        app, concurrency or app.config['JOB_WORKER_CONCURRENCY'], app.config['JOB_POLL_INTERVAL']
+    )
+    worker.start()
+    click.echo(f'Job worker {worker.name} running {worker.concurrency} threads.')
+
+    def report():
+        stats = worker.get_stats()
+        click.echo(
+            '{succeeded} succeeded, {errors} failed attempts, {jobs_per_second:.2f} jobs/s, '
+            '{utilization:.0%} utilization'.format(**stats)
+        )
+
+    try:
+        while True:
+            time.sleep(stats_interval)
+            report()
+    except KeyboardInterrupt:
+        click.echo('Stopping after the running jobs...')
+        worker.stop()
+        report()
+
+
+@jobs_cli.command('purge')
+@click.option('--days', type=int, default=7, show_default=True,
+              help='Delete jobs finished more than this many days ago.')
+def purge_jobs(days):
+    """
+    Delete finished jobs and their export files.
+    """
+    from .services.job_service import JobService
+
+    count = JobService.purge_jobs(timedelta(days=days))
+    click.echo(f'Deleted {count} jobs.')
+
+
+@tokens_cli.command('prune')
+def prune_tokens():
+    """
+    Delete revoked tokens that have expired.
+    """
+    from .services import token_service
+
+    count = token_service.prune_revoked_tokens()
+    click.echo(f'Deleted {count} expired revoked tokens.')
+
+
+@events_cli.command('prune')
+@click.option('--days', type=float, help='Delete events older than this many days (default: EVENTS_RETENTION_DAYS).')
+def prune_events(days):
+    """
+    Delete old task events from the outbox.
+    """
+    from .services import event_stream
+
+    count = event_stream.prune_events(current_app.config['EVENTS_RETENTION_DAYS'] if days is None else days)
+    click.echo(f'Deleted {count} task events.')
+
+
+@scheduler_cli.command('run')
+@click.option('--interval', type=float, help='Seconds between ticks (default: SCHEDULER_INTERVAL).')
+def run_scheduler(interval):
+    """
+    Scan for due tasks every interval until interrupted.
+    """
+    from .services.scheduler_service import TaskScheduler
+
+    app = current_app._get_current_object()
+    scheduler = TaskScheduler(app, interval or app.config['SCHEDULER_INTERVAL'])
+    scheduler.start()
+    click.echo(f'Scheduler {scheduler.name} ticking every {scheduler.interval:g}s '
+               f"to {app.config['SCHEDULER_SINKS']}.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        click.echo('Stopping after the running tick...')
+        scheduler.stop()
+        click.echo('{ticks} ticks, {errors} failed, {reported} tasks reported.'.format(**scheduler.get_stats()))
+
+
+@scheduler_cli.command('tick')
+def scheduler_tick():
+    """
+    Scan for due tasks once.
+    """
+    from .services.scheduler_service import SchedulerService
+
+    started = time.perf_counter()
+    reported = SchedulerService.tick()
+    click.echo(
+        f"Reported {reported['due_soon']} tasks due soon and {reported['overdue']} overdue "
+        f'in {(time.perf_counter() - started) * 1000:.1f} ms.'
+    )
+
+
+@fixtures_cli.command('generate')
+@click.option('--users', type=int, default=1000, show_default=True, help='Users to create.')
+@click.option('--tasks', type=int, default=1000000, show_default=True, help='Tasks spread across the users.')
+@click.option('--seed', type=int, default=42, show_default=True, help='Seed making the data reproducible.')
+@click.option('--processes', type=int, default=1, show_default=True, help='Loader processes.')
+@click.option('--chunk-size', type=int, default=10000, show_default=True, help='Tasks per insert.')
+@click.option('--password', default='password', show_default=True, help='Password of every user.')
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+@click.option('--yes', is_flag=True, help='Do not ask before dropping the tables.')
+def generate_fixtures(users, tasks, seed, processes, chunk_size, password, reset, yes):
+    """
+    Fill an empty database with synthetic users and tasks.
+
+    Users are named user1, user2, ... and share one password; user1 is an
+    admin. The same seed always generates the same data.
+    """
+    from . import db
+    from .services.fixture_service import FixtureService
+
+    if reset:
+        if not yes:
+            click.confirm(f'Drop all tables of {db.engine.url!r}?', abort=True)
+        db.drop_all()
+        db.create_all()
+    with click.progressbar(length=tasks, label=f'Generating {tasks} tasks') as bar:
+        try:
+            result = FixtureService.generate(
+                users, tasks, seed=seed, processes=processes, chunk_size=chunk_size,
+                password=password, progress=bar.update
+            )
+        except ValueError as e:
+            raise click.ClickException(f'{e}; use --reset to replace it.')
+    rate = tasks / result['insert_seconds'] if result['insert_seconds'] else 0
+    click.echo(
+        f"Inserted {users} users and {tasks} tasks in {result['insert_seconds']:.1f}s ({rate:,.0f} tasks/s), "
+        f"indexed in {result['index_seconds']:.1f}s."
+    )
+
+
+def init_app(app):
+    """
+    Register the command groups with the application.
+
+    Args:
+        app (Flask): The application to register the commands with
+    """
+    app.cli.add_command(create_tables)
+    app.cli.add_command(tasks_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(fixtures_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(events_cli)
@@ -0,0 +1,63 @@
+"""
+Job model module for the Task Management API.
+
+This module defines the queue table of background jobs.
+"""
+
+from app import db
+from app.utils.timestamps import utcnow
+
+
+class Job(db.Model):
+    """
+    Background job, such as a task export or import.
+
+    Jobs are queued in this table and claimed by the worker threads of
+    JobService; no external broker is needed. A job is retried with
+    exponential backoff until it succeeds or max_attempts is reached.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'succeeded' or 'failed'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False)
+    run_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        """
+        Convert Job object to a dictionary representation.
+
+        Returns:
+            dict: Dictionary containing job information
+        """
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'attempts': self.attempts,
+            'result': self.result,
+            'error': self.error,
+            'run_at': self.run_at.isoformat(),
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'user_id': self.user_id
+        }
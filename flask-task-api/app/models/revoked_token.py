@@ -0,0 +1,26 @@
+"""
+Revoked token model module for the Task Management API.
+
+This module defines the table of revoked access tokens.
+"""
+
+from app import db
+from app.utils.timestamps import utcnow
+
+
+class RevokedToken(db.Model):
+    """
+    Access token revoked before its expiry, such as by logging out.
+
+    Rows are identified by the token's ``jti`` claim and only matter until
+    the token expires. Server processes keep an in-memory copy of the
+    unexpired rows, synced by ``revoked_at``, so revocation checks don't
+    query this table per request.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
@@ -0,0 +1,27 @@
+"""
+Scheduler state model module for the Task Management API.
+
+This module defines the persisted progress of the due date scans.
+"""
+
+from app import db
+from app.utils.timestamps import utcnow
+
+
+class SchedulerState(db.Model):
+    """
+    High-water mark of a due date scan.
+
+    Every task whose (due_date, id) is at or before (due_mark, id_mark) has
+    been reported; an empty id_mark means every task due at due_mark has.
+    ``version`` is incremented by each scan batch, which advances the mark
+    with a compare-and-set so that concurrent schedulers don't both commit
+    the same batch.
+    """
+    __tablename__ = 'scheduler_state'
+
+    name = db.Column(db.String(50), primary_key=True)
+    due_mark = db.Column(db.DateTime, nullable=False)
+    id_mark = db.Column(db.Integer)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
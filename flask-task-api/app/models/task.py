@@ -4,8 +4,11 @@ Task model module for the Task Management API.
 This module defines the Task model and related functionality for task management.
 """
 
-from datetime import datetime
+from sqlalchemy import event
 from app import db
+from app.utils import search
+from app.utils.timestamps import utcnow
+
 
 class Task(db.Model):
     """
@@ -14,6 +17,11 @@ class Task(db.Model):
     Represents a task that can be assigned to a user with various attributes.
     """
     __tablename__ = 'tasks'
+    __table_args__ = (
+        db.Index('ix_tasks_user_id_status_due_date', 'user_id', 'status', 'due_date'),
+        db.Index('ix_tasks_user_id_updated_at', 'user_id', 'updated_at'),
+        db.Index('ix_tasks_due_date_status', 'due_date', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -21,9 +29,9 @@ class Task(db.Model):
     status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'in_progress', 'completed'
     priority = db.Column(db.String(20), nullable=False, default='medium')  # 'low', 'medium', 'high'
     due_date = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
 
     def to_dict(self):
         """
@@ -32,14 +40,35 @@ class Task(db.Model):
         Returns:
             dict: Dictionary containing task information
         """
+        return Task.row_to_dict(self)
+
+    @staticmethod
+    def row_to_dict(row):
+        """
+        Convert a row of task columns to the dictionary representation of to_dict.
+
+        Serializing rows selected with ``Task.__table__.columns`` skips ORM
+        instance hydration and the identity map.
+
+        Args:
+            row: Task instance or Row with the task's columns
+
+        Returns:
+            dict: Dictionary containing task information
+        """
+        due_date = row.due_date
         return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'status': self.status,
-            'priority': self.priority,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'user_id': self.user_id
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'status': row.status,
+            'priority': row.priority,
+            'due_date': due_date.isoformat() if due_date else None,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat(),
+            'user_id': row.user_id
         }
+
+
+event.listen(Task.__table__, 'after_create', search.create_index)
+event.listen(Task.__table__, 'before_drop', search.drop_index)
@@ -0,0 +1,30 @@
+"""
+Task change model module for the Task Management API.
+
+This module defines the change log used to sync task changes incrementally.
+"""
+
+from app import db
+from app.utils.timestamps import utcnow
+
+
+class TaskChange(db.Model):
+    """
+    Latest change of a task.
+
+    Each task has at most one row, replaced on every change, so the log grows
+    with the number of tasks and tombstones rather than with write volume.
+    ``seq`` increases monotonically and never reuses values, so it can be
+    used as a sync cursor.
+    """
+    __tablename__ = 'task_changes'
+    __table_args__ = (
+        db.Index('ix_task_changes_user_id_seq', 'user_id', 'seq'),
+        {'sqlite_autoincrement': True}
+    )
+
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False, unique=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete'
+    changed_at = db.Column(db.DateTime, nullable=False, default=utcnow)
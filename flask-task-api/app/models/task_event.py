@@ -0,0 +1,30 @@
+"""
+Task event model module for the Task Management API.
+
+This module defines the outbox of task events.
+"""
+
+from app import db
+from app.utils.timestamps import utcnow
+
+
+class TaskEvent(db.Model):
+    """
+    Event about a task, such as a due date reminder, kept for consumers.
+
+    Rows are appended in the transaction that produced the event. ``id``
+    increases monotonically and is never reused, so consumers can resume
+    after the last event they processed.
+    """
+    __tablename__ = 'task_events'
+    __table_args__ = (
+        db.Index('ix_task_events_user_id_id', 'user_id', 'id'),
+        {'sqlite_autoincrement': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(30), nullable=False)  # e.g. 'task.due_soon', 'task.overdue'
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow, index=True)
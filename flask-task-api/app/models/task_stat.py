@@ -0,0 +1,23 @@
+"""
+Task statistics model module for the Task Management API.
+
+This module defines the counter table behind the global task statistics.
+"""
+
+from app import db
+
+
+class TaskStat(db.Model):
+    """
+    Number of tasks of a user with a given status and priority.
+
+    Counters are adjusted by TaskService in the same transaction as the task
+    writes, so reading global statistics never scans the tasks table. The
+    table can be rebuilt from the tasks with ``flask tasks rebuild-stats``.
+    """
+    __tablename__ = 'task_stats'
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    status = db.Column(db.String(20), primary_key=True)
+    priority = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -4,9 +4,10 @@ User model module for the Task Management API.
 This module defines the User model and related functionality for user authentication and authorization.
 """
 
-from datetime import datetime
-import bcrypt
 from app import db
+from app.services import password_service
+from app.utils.timestamps import utcnow
+
 
 class User(db.Model):
     """
@@ -21,8 +22,8 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='user')  # 'user' or 'admin'
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow, onupdate=utcnow)
     tasks = db.relationship('Task', backref='user', lazy=True)
 
     def __init__(self, username, email, password, role='user'):
@@ -47,8 +48,7 @@ class User(db.Model):
         Args:
             password (str): Plain text password to hash
         """
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        self.password_hash = password_service.hash_password(password)
 
     def check_password(self, password):
         """
@@ -60,7 +60,16 @@ class User(db.Model):
         Returns:
             bool: True if password matches, False otherwise
         """
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_service.verify_password(password, self.password_hash)
+
+    def password_needs_rehash(self):
+        """
+        Check whether the stored hash uses a different work factor than configured.
+
+        Returns:
+            bool: True if the password should be hashed again
+        """
+        return password_service.needs_rehash(self.password_hash)
 
     def to_dict(self):
         """
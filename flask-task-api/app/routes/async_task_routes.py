@@ -0,0 +1,135 @@
+"""
+Native async task routes for the ASGI mode of the Task Management API.
+
+This module serves the task read endpoints with an AsyncSession when the
+API runs under an ASGI server (see app.asgi). Handlers are looked up by the
+endpoint of the matched task blueprint route, which also supplies the JWT
+check and rate limits, so URLs, validation and responses are the same as
+those of the synchronous views.
+"""
+
+import asyncio
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from ..models.task import Task
+from ..services import event_stream
+from ..services.auth_service import get_current_user_async
+from ..utils.conditional import (
+    is_not_modified, make_etag, not_modified_response, set_validators, task_etag
+)
+from .task_routes import NDJSON_MIMETYPE, _event_stream_response, _link_next_page, _page_limit
+
+
+async def get_tasks(service):
+    """
+    Get a page of tasks for the current user; see task_routes.get_tasks.
+
+    NDJSON streaming is left to the synchronous view.
+    """
+    user = await get_current_user_async(service.session)
+    limit = _page_limit()
+    last_modified, count = await service.get_tasks_version(user, request.args)
+    etag = make_etag('tasks', user.id, request.full_path, last_modified, count)
+    if is_not_modified(etag):
+        return not_modified_response(etag, last_modified)
+
+    tasks, next_cursor = await service.get_tasks_page(
+        user,
+        limit,
+        cursor=request.args.get('cursor'),
+        filters=request.args,
+        sort=request.args.get('sort', 'id')
+    )
+    response = set_validators(jsonify([Task.row_to_dict(task) for task in tasks]), etag, last_modified)
+    return _link_next_page(response, next_cursor, limit)
+
+
+async def get_task_changes(service):
+    """
+    Get the tasks changed since a sync cursor; see task_routes.get_task_changes.
+    """
+    user = await get_current_user_async(service.session)
+    return jsonify(await service.get_changes(user, request.args.get('since'), _page_limit()))
+
+
+async def get_task_stats(service):
+    """
+    Get task counts of the current user; see task_routes.get_task_stats.
+    """
+    user = await get_current_user_async(service.session)
+    return jsonify(await service.get_stats(user))
+
+
+async def get_task(service, task_id):
+    """
+    Get a specific task by ID; see task_routes.get_task.
+    """
+    user = await get_current_user_async(service.session)
+    updated_at = await service.get_task_version(task_id, user)
+    etag = task_etag(task_id, updated_at)
+    if is_not_modified(etag, updated_at):
+        return not_modified_response(etag, updated_at)
+
+    task = await service.get_task_by_id(task_id, user)
+    return set_validators(jsonify(Task.row_to_dict(task)), etag, updated_at)
+
+
+async def get_task_events(service):
+    """
+    Stream the events of the current user's tasks; see
+    task_routes.get_task_events.
+
+    The response's ``async_body`` is sent by the ASGI application after the
+    request; waiting for events holds no thread.
+    """
+    user = await get_current_user_async(service.session)
+    config = current_app.config
+    notifier = current_app.extensions['event_notifier']
+    subscription = event_stream.AsyncSubscription(
+        event_stream.subscription_key(user), config['EVENTS_QUEUE_SIZE'], asyncio.get_running_loop()
+    )
+    since = event_stream.parse_last_event_id(request.headers.get('Last-Event-ID'))
+    # Subscribing reads the end of the outbox the first time
+    await asyncio.to_thread(notifier.subscribe, subscription)
+    try:
+        backlog = await event_stream.missed_events_async(
+            service.session, user, since, config['EVENTS_BACKLOG_LIMIT'], current_app.json.dumps
+        )
+    except BaseException:
+        notifier.unsubscribe(subscription)
+        raise
+    response = _event_stream_response()
+    response.async_body = event_stream.stream_async(
+        notifier, subscription, since, backlog, config['EVENTS_HEARTBEAT_INTERVAL'], get_jwt().get('exp')
+    )
+    return response
+
+
+ASYNC_VIEWS = {
+    'task.get_tasks': get_tasks,
+    'task.get_task_changes': get_task_changes,
+    'task.get_task_stats': get_task_stats,
+    'task.get_task': get_task,
+    'task.get_task_events': get_task_events,
+}
+
+
+def native_view(endpoint, environ):
+    """
+    Find the native async handler of a request, if it has one.
+
+    Args:
+        endpoint (str): Endpoint of the matched route
+        environ (dict): WSGI environment of the request
+
+    Returns:
+        callable: Async handler, or None to serve the request through WSGI
+    """
+    if environ['REQUEST_METHOD'] != 'GET':
+        return None
+    accept = parse_accept_header(environ.get('HTTP_ACCEPT'), MIMEAccept)
+    if accept.best == NDJSON_MIMETYPE:
+        return None
+    return ASYNC_VIEWS.get(endpoint)
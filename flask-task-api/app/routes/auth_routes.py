@@ -5,17 +5,22 @@ This module defines the API endpoints for user authentication and registration.
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 from ..models.user import User, db
+from ..services import token_service
+from ..services.password_service import PasswordHasherBusy
+from ..services.user_service import UserService
 
 auth_bp = Blueprint('auth', __name__)
 
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
     Register a new user.
 
-    This endpoint allows users to create a new account.
+    This endpoint allows users to create a new account. The username and
+    email are checked with one query before the password is hashed.
 
     Returns:
         dict: Success message if registration is successful
@@ -23,27 +28,21 @@ def register():
 
     Raises:
         HTTPException: 400 Bad Request if username or email already exists
+        HTTPException: 503 Service Unavailable if password hashing is saturated
     """
     data = request.get_json()
-    
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'message': 'Username already exists'}), 400
-        
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'message': 'Email already exists'}), 400
-    
-    user = User(
+    _, conflict = UserService.register(
         username=data['username'],
         email=data['email'],
         password=data['password'],
         role=data.get('role', 'user')
     )
-    
-    db.session.add(user)
-    db.session.commit()
-    
+    if conflict:
+        return jsonify({'message': conflict}), 400
+
     return jsonify({'message': 'User created successfully'}), 201
 
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """
@@ -57,11 +56,15 @@ def login():
 
     Raises:
         HTTPException: 401 Unauthorized if credentials are invalid
+        HTTPException: 503 Service Unavailable if password hashing is saturated
     """
     data = request.get_json()
     user = User.query.filter_by(username=data['username']).first()
     
     if user and user.check_password(data['password']):
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
         access_token = create_access_token(identity=str(user.id))
         return jsonify({
             'access_token': access_token,
@@ -69,3 +72,37 @@ def login():
         })
     
     return jsonify({'message': 'Invalid credentials'}), 401
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """
+    Revoke the access token of the request.
+
+    The token is rejected by every later request until it expires.
+
+    Returns:
+        dict: Success message
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 401 Unauthorized if the token is missing, invalid or
+            already revoked
+    """
+    token_service.revoke_token(get_jwt())
+    return jsonify({'message': 'Successfully logged out'})
+
+
+@auth_bp.app_errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    """
+    Shed load when the password hashing pool is saturated.
+
+    Returns:
+        dict: Error message
+        int: HTTP status code 503 with a Retry-After header
+    """
+    response = jsonify({'message': 'Too many authentication requests, please retry'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
@@ -1,8 +1,14 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, abort, current_app, jsonify
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
 from ..models.user import db
+from ..services import cache_service, event_stream, token_service
+from ..services.auth_service import admin_required
+from ..utils import metrics
 
 health_bp = Blueprint('health', __name__)
 
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -21,3 +27,38 @@ def health_check():
     
     status_code = 200 if health_status['status'] == 'healthy' else 503
     return jsonify(health_status), status_code
+
+
+@health_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+def cache_stats():
+    """Task response cache hit/miss counters of this process."""
+    return jsonify(cache_service.get_stats())
+
+
+@health_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, SQL, cache, token and event stream metrics of this process in the Prometheus text format."""
+    if not current_app.config['METRICS_ENABLED']:
+        abort(HTTPStatus.NOT_FOUND)
+    cache = cache_service.get_stats()
+    tokens = token_service.get_stats()
+    claims_cache = tokens['claims_cache'] or {'hits': 0, 'misses': 0}
+    events = event_stream.get_stats(current_app)
+    extra = [
+        ('task_cache_hits_total', 'counter', 'Task response cache hits.', cache['hits']),
+        ('task_cache_misses_total', 'counter', 'Task response cache misses.', cache['misses']),
+        ('task_cache_errors_total', 'counter', 'Task response cache errors.', cache['errors']),
+        ('token_claims_cache_hits_total', 'counter', 'Access tokens served from the verified token cache.',
+         claims_cache['hits']),
+        ('token_claims_cache_misses_total', 'counter', 'Access tokens decoded and verified.',
+         claims_cache['misses']),
+        ('revoked_tokens', 'gauge', 'Unexpired revoked tokens held in memory.', tokens['revoked_tokens']),
+        ('task_event_subscriptions', 'gauge', 'Open task event streams.', events['subscriptions']),
+        ('task_events_read_total', 'counter', 'Task events read from the outbox.', events['events']),
+        ('task_event_deliveries_total', 'counter', 'Batches of task events queued for streams.',
+         events['deliveries']),
+        ('task_event_streams_dropped_total', 'counter', 'Streams closed for falling behind.', events['dropped']),
+    ]
+    return Response(metrics.render(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,207 @@
+"""
+Job routes module for the Task Management API.
+
+This module defines the API endpoints submitting background jobs and
+reporting their status.
+"""
+
+import os
+from http import HTTPStatus
+from flask import Blueprint, abort, current_app, jsonify, request, send_file, url_for
+from flask_jwt_extended import jwt_required
+from .. import limiter
+from ..services import job_worker
+from ..services.auth_service import get_current_user, admin_required
+from ..services.job_handlers import result_path
+from ..services.job_service import JobService
+from ..utils.rate_limit import configured_limit
+from ..utils.task_io import FORMATS, request_format
+
+job_bp = Blueprint('job', __name__)
+
+# Query parameters of GET /tasks accepted by exports
+EXPORT_FILTERS = ('status', 'priority', 'due_before', 'due_after', 'updated_since')
+
+
+def _job_accepted(job):
+    """
+    Build the 202 Accepted response of a submitted job.
+
+    Args:
+        job (Job): The queued job
+
+    Returns:
+        tuple: Job information, HTTP status code 202 and the Location of
+            the job's status
+    """
+    location = url_for('job.get_job', job_id=job.id)
+    return jsonify(job.to_dict()), 202, {'Location': location}
+
+
+@job_bp.route('/tasks:export', methods=['POST'])
+@jwt_required()
+@limiter.limit(configured_limit('jobs'))
+def export_tasks():
+    """
+    Export the current user's tasks in the background.
+
+    Accepts the format, filter and sort query parameters of
+    ``GET /tasks/export``; admin users export all tasks. When the job has
+    succeeded, the file is downloaded from ``GET /jobs/<id>/result``.
+
+    Returns:
+        dict: Job information
+        int: HTTP status code 202
+
+    Raises:
+        HTTPException: 400 Bad Request if the format is invalid
+    """
+    user = get_current_user()
+    format = request_format(request.args.get('format', 'ndjson'), None)
+    if format is None:
+        abort(HTTPStatus.BAD_REQUEST, "format must be csv or ndjson")
+    payload = {
+        'format': format,
+        'filters': {name: request.args[name] for name in EXPORT_FILTERS if name in request.args},
+        'sort': request.args.get('sort', 'id')
+    }
+    return _job_accepted(JobService.submit_job('export_tasks', payload, user))
+
+
+@job_bp.route('/tasks:import', methods=['POST'])
+@jwt_required()
+@limiter.limit(configured_limit('jobs'))
+def import_tasks():
+    """
+    Create many tasks in the background.
+
+    The body is ``{"tasks": [...]}`` with items as accepted by
+    ``POST /tasks``. The job result counts the created and failed items and
+    lists the first errors.
+
+    Returns:
+        dict: Job information
+        int: HTTP status code 202
+
+    Raises:
+        HTTPException: 400 Bad Request if the list is missing, empty or
+            larger than JOB_IMPORT_MAX_ITEMS
+    """
+    user = get_current_user()
+    data = request.get_json()
+    items = data.get('tasks') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        abort(HTTPStatus.BAD_REQUEST, "tasks must be a non-empty list")
+    max_items = current_app.config['JOB_IMPORT_MAX_ITEMS']
+    if len(items) > max_items:
+        abort(HTTPStatus.BAD_REQUEST, f"At most {max_items} tasks can be imported in one job")
+    job = JobService.submit_job('import_tasks', {'tasks': items}, user, total=len(items))
+    return _job_accepted(job)
+
+
+@job_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_reads'))
+def get_job(job_id):
+    """
+    Get the status of a job.
+
+    Users can only access their own jobs unless they are admin.
+
+    Args:
+        job_id (int): ID of the job
+
+    Returns:
+        dict: Job information, including progress, attempts, result and error
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 404 Not Found if the job doesn't exist
+        HTTPException: 403 Forbidden if user doesn't have access
+    """
+    return jsonify(JobService.get_job(job_id, get_current_user()).to_dict())
+
+
+@job_bp.route('/jobs/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_reads'))
+def get_job_result(job_id):
+    """
+    Download the file produced by a succeeded export job.
+
+    Args:
+        job_id (int): ID of the job
+
+    Returns:
+        Response: CSV or NDJSON file of the exported tasks
+
+    Raises:
+        HTTPException: 404 Not Found if the job doesn't exist or has no file
+        HTTPException: 409 Conflict if the job has not succeeded
+    """
+    job = JobService.get_job(job_id, get_current_user())
+    if job.kind != 'export_tasks':
+        abort(HTTPStatus.NOT_FOUND, "Job has no result file")
+    if job.status != 'succeeded':
+        abort(HTTPStatus.CONFLICT, f"Job is {job.status}")
+    path = result_path(job)
+    if not os.path.exists(path):
+        # Purged, or written to a JOB_EXPORT_DIR this node doesn't share
+        abort(HTTPStatus.NOT_FOUND, "Export file not found")
+    format = job.payload.get('format', 'ndjson')
+    return send_file(
+        path,
+        mimetype=FORMATS[format],
+        as_attachment=True,
+        download_name=f'tasks-{job.id}.{format}'
+    )
+
+
+@job_bp.route('/admin/tasks/stats:rebuild', methods=['POST'])
+@jwt_required()
+@admin_required()
+@limiter.limit(configured_limit('admin'))
+def rebuild_task_stats():
+    """
+    Recompute the task statistics counters in the background (admin only).
+
+    Returns:
+        dict: Job information
+        int: HTTP status code 202
+    """
+    return _job_accepted(JobService.submit_job('rebuild_stats', {}, get_current_user()))
+
+
+@job_bp.route('/admin/tasks/search:rebuild', methods=['POST'])
+@jwt_required()
+@admin_required()
+@limiter.limit(configured_limit('admin'))
+def rebuild_task_search():
+    """
+    Rebuild the full-text search index in the background (admin only).
+
+    Returns:
+        dict: Job information
+        int: HTTP status code 202
+    """
+    return _job_accepted(JobService.submit_job('rebuild_search', {}, get_current_user()))
+
+
+@job_bp.route('/admin/jobs/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit(configured_limit('admin'))
+def get_job_stats():
+    """
+    Get queue statistics and the throughput of this process's worker (admin only).
+
+    Returns:
+        dict: Queue statistics in ``queue``, and in ``worker`` the jobs per
+            second and utilization of the in-process worker, or None
+        int: HTTP status code 200
+    """
+    worker = job_worker.get_worker()
+    return jsonify({
+        'queue': JobService.get_stats(),
+        'worker': worker.get_stats() if worker else None
+    })
@@ -4,43 +4,411 @@ Task routes module for the Task Management API.
 This module defines the API endpoints for task management operations.
 """
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from http import HTTPStatus
+from flask import (
+    Blueprint, Response, abort, current_app, jsonify, request,
+    stream_with_context, url_for
+)
+from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
+from .. import limiter
+from ..services import cache_service, event_stream
+from ..models.task import Task
 from ..services.task_service import TaskService
 from ..services.auth_service import get_current_user, admin_required
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from ..utils.conditional import (
+    is_not_modified, make_etag, not_modified_response, set_validators, task_etag
+)
+from ..utils.rate_limit import configured_limit
+from ..utils.task_io import FORMATS, NDJSON_MIMETYPE, decode_tasks, encode_tasks, request_format
 
 task_bp = Blueprint('task', __name__)
-limiter = Limiter(key_func=get_remote_address)
+
+# Number of failed import records reported in the response
+MAX_REPORTED_ERRORS = 100
+
+EVENT_STREAM_MIMETYPE = 'text/event-stream'
+
+
+def _page_limit():
+    """
+    Read the page size from the request, bounded by the configured maximum.
+
+    Returns:
+        int: Number of tasks to return in one page
+
+    Raises:
+        HTTPException: 400 Bad Request if the limit is not a positive integer
+    """
+    limit = request.args.get('limit', current_app.config['TASKS_PAGE_SIZE'], type=int)
+    if limit is None or limit < 1:
+        abort(HTTPStatus.BAD_REQUEST, "limit must be a positive integer")
+    return min(limit, current_app.config['TASKS_MAX_PAGE_SIZE'])
+
+
+def _batch_items(key):
+    """
+    Read the list of batch items from the request body.
+
+    Args:
+        key (str): Name of the list in the JSON body
+
+    Returns:
+        list: Items to process
+
+    Raises:
+        HTTPException: 400 Bad Request if the list is missing, empty or
+            larger than TASKS_BATCH_MAX_ITEMS
+    """
+    data = request.get_json()
+    items = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        abort(HTTPStatus.BAD_REQUEST, f"{key} must be a non-empty list")
+    max_items = current_app.config['TASKS_BATCH_MAX_ITEMS']
+    if len(items) > max_items:
+        abort(HTTPStatus.BAD_REQUEST, f"At most {max_items} {key} can be sent in one batch")
+    return items
+
+
+def _task_list_response(user):
+    """
+    Build the response for a task listing endpoint.
+
+    Clients sending ``Accept: application/x-ndjson`` receive every visible task
+    streamed one JSON document per line. Otherwise a single page is returned and
+    the cursor of the following page is sent in the ``X-Next-Cursor`` and
+    ``Link`` headers. Pages carry an ETag derived from the latest updated_at
+    and count of the matching tasks, and a matching If-None-Match is answered
+    with 304 Not Modified.
+
+    Args:
+        user (User): The user whose tasks are listed
+
+    Returns:
+        Response: Paginated JSON list or streamed NDJSON response
+    """
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        tasks = TaskService.iter_tasks(
+            user,
+            current_app.config['TASKS_STREAM_BATCH_SIZE'],
+            filters=request.args,
+            sort=request.args.get('sort', 'id')
+        )
+        chunks = encode_tasks(tasks, 'ndjson', current_app.json.dumps)
+        return Response(stream_with_context(chunks), mimetype=NDJSON_MIMETYPE)
+
+    limit = _page_limit()
+    last_modified, count = TaskService.get_tasks_version(user, request.args)
+    etag = make_etag('tasks', user.id, request.full_path, last_modified, count)
+    # Deletions don't move the latest updated_at, so only the ETag is trusted
+    if is_not_modified(etag):
+        return not_modified_response(etag, last_modified)
+
+    def load_page():
+        tasks, next_cursor = TaskService.get_tasks_page(
+            user,
+            limit,
+            cursor=request.args.get('cursor'),
+            filters=request.args,
+            sort=request.args.get('sort', 'id')
+        )
+        return [Task.row_to_dict(task) for task in tasks], next_cursor
+
+    page, next_cursor = cache_service.cached(user, 'list:' + request.full_path, load_page)
+    response = set_validators(jsonify(page), etag, last_modified)
+    return _link_next_page(response, next_cursor, limit)
+
+
+def _link_next_page(response, next_cursor, limit):
+    """
+    Send the cursor of the next page in the X-Next-Cursor and Link headers.
+
+    Args:
+        response (Response): Response carrying the current page
+        next_cursor (str): Cursor of the next page, or None on the last page
+        limit (int): Page size to repeat in the link
+
+    Returns:
+        Response: The response, with the headers set if there is a next page
+    """
+    if next_cursor:
+        args = request.args.to_dict()
+        args.update(cursor=next_cursor, limit=limit)
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = '<{}>; rel="next"'.format(url_for(request.endpoint, **args))
+    return response
+
 
 @task_bp.route('/tasks', methods=['GET'])
 @jwt_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('task_reads'))
 def get_tasks():
     """
     Get all tasks for the current user.
 
-    This endpoint returns a list of all tasks that belong to the authenticated user.
-    Admin users can view all tasks in the system.
+    This endpoint returns a page of tasks that belong to the authenticated user.
+    Admin users can view all tasks in the system. Pages are selected with the
+    ``limit`` and ``cursor`` query parameters; NDJSON streaming is available
+    through the ``Accept`` header.
+
+    Query parameters:
+        status, priority: Comma-separated values to match
+        due_before, due_after, updated_since: ISO 8601 datetimes
+        sort: id, created_at, updated_at or due_date, prefixed with '-'
+            for descending order
 
     Returns:
         list: List of task dictionaries
         int: HTTP status code 200
     """
+    return _task_list_response(get_current_user())
+
+
+@task_bp.route('/tasks/changes', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_reads'))
+def get_task_changes():
+    """
+    Get the tasks created, updated or deleted since a sync cursor.
+
+    Call without ``since`` to obtain the current cursor before a full
+    listing, then pass the returned ``cursor`` as ``since`` to receive only
+    later changes. Deleted tasks are reported by ID in ``deleted``.
+
+    Returns:
+        dict: Changed tasks, deleted task IDs, next cursor and has_more flag
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is invalid
+    """
+    user = get_current_user()
+    return jsonify(TaskService.get_changes(user, request.args.get('since'), _page_limit()))
+
+
+def _event_stream_response(body=()):
+    """
+    Build a Server-Sent Events response that proxies pass through unbuffered.
+    """
+    response = Response(body, mimetype=EVENT_STREAM_MIMETYPE)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@task_bp.route('/tasks/events', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_reads'))
+def get_task_events():
+    """
+    Stream the events of the current user's tasks as Server-Sent Events.
+
+    Each event has the ID of the event, its type (task.created,
+    task.updated, task.deleted, task.due_soon or task.overdue) and a JSON
+    payload with the task ID, owner and written fields. Admin users receive
+    the events of all tasks. A client reconnecting with ``Last-Event-ID``
+    first receives the events it missed, or a ``reset`` event if it must
+    resync with ``GET /tasks/changes``. Comments are sent every
+    EVENTS_HEARTBEAT_INTERVAL seconds, and the stream ends when the access
+    token expires.
+
+    Served through WSGI, each stream holds a server thread, so it needs a
+    threaded server, and each process serves at most
+    EVENTS_WSGI_MAX_STREAMS streams at once. The ASGI server streams events
+    with async_task_routes.get_task_events instead, without these limits.
+
+    Returns:
+        Response: ``text/event-stream`` response
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 503 Service Unavailable if the server is not
+            threaded, or with a Retry-After header if this process already
+            serves EVENTS_WSGI_MAX_STREAMS streams
+    """
+    if not request.environ.get('wsgi.multithread'):
+        abort(
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            "Event streams need a threaded server: use gunicorn's gthread workers or the ASGI entry point"
+        )
+    slots = current_app.extensions['event_stream_slots']
+    if not slots.acquire(blocking=False):
+        response = jsonify({'message': 'Too many event streams on this server, please retry'})
+        response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+        response.headers['Retry-After'] = str(event_stream.BUSY_RETRY_AFTER)
+        abort(response)
+
+    user = get_current_user()
+    config = current_app.config
+    notifier = current_app.extensions['event_notifier']
+    subscription = event_stream.Subscription(event_stream.subscription_key(user), config['EVENTS_QUEUE_SIZE'])
+    since = event_stream.parse_last_event_id(request.headers.get('Last-Event-ID'))
+    try:
+        notifier.subscribe(subscription)
+        try:
+            backlog = event_stream.missed_events(
+                user, since, config['EVENTS_BACKLOG_LIMIT'], current_app.json.dumps
+            )
+        except Exception:
+            notifier.unsubscribe(subscription)
+            raise
+    except Exception:
+        slots.release()
+        raise
+    response = _event_stream_response(event_stream.stream(
+        notifier, subscription, since, backlog, config['EVENTS_HEARTBEAT_INTERVAL'], get_jwt().get('exp')
+    ))
+    # Called by the server when the stream ends, even if it never started
+    response.call_on_close(slots.release)
+    return response
+
+
+@task_bp.route('/tasks/search', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_search'))
+def search_tasks():
+    """
+    Search tasks by title and description.
+
+    Every word of ``q`` must occur in the task's title or description; the
+    last word also matches as a prefix. Results are ranked best first and
+    paginated with ``limit`` and ``cursor`` like ``GET /tasks``. Admin users
+    search all tasks.
+
+    Returns:
+        list: List of matching task dictionaries
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if q has no words or the cursor is invalid
+    """
+    user = get_current_user()
+    limit = _page_limit()
+
+    def load_page():
+        tasks, next_cursor = TaskService.search_tasks(
+            user, request.args.get('q'), limit, cursor=request.args.get('cursor')
+        )
+        return [Task.row_to_dict(task) for task in tasks], next_cursor
+
+    page, next_cursor = cache_service.cached(user, 'search:' + request.full_path, load_page)
+    return _link_next_page(jsonify(page), next_cursor, limit)
+
+
+@task_bp.route('/tasks/stats', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_reads'))
+def get_task_stats():
+    """
+    Get task counts of the current user by status and priority.
+
+    Returns:
+        dict: Total, by_status, by_priority and overdue counts
+        int: HTTP status code 200
+    """
+    return jsonify(TaskService.get_stats(get_current_user()))
+
+
+@task_bp.route('/tasks/export', methods=['GET'])
+@jwt_required()
+@limiter.limit(configured_limit('task_transfers'))
+def export_tasks():
+    """
+    Stream the current user's tasks as a CSV or NDJSON file.
+
+    Admin users export all tasks. Rows are fetched from the database in
+    batches of TASKS_STREAM_BATCH_SIZE and written as they are fetched, so
+    any number of tasks is exported in bounded memory.
+
+    Query parameters:
+        format: csv or ndjson (default)
+        status, priority, due_before, due_after, updated_since, sort:
+            as for ``GET /tasks``
+
+    Returns:
+        Response: Streamed file download
+
+    Raises:
+        HTTPException: 400 Bad Request if the format or a filter is invalid
+    """
+    format = request_format(request.args.get('format', 'ndjson'), None)
+    if format is None:
+        abort(HTTPStatus.BAD_REQUEST, "format must be csv or ndjson")
+    tasks = TaskService.iter_tasks(
+        get_current_user(),
+        current_app.config['TASKS_STREAM_BATCH_SIZE'],
+        filters=request.args,
+        sort=request.args.get('sort', 'id')
+    )
+    chunks = encode_tasks(tasks, format, current_app.json.dumps)
+    response = Response(stream_with_context(chunks), mimetype=FORMATS[format])
+    response.headers['Content-Disposition'] = f'attachment; filename=tasks.{format}'
+    return response
+
+
+@task_bp.route('/tasks/import', methods=['POST'])
+@jwt_required()
+@limiter.limit(configured_limit('task_transfers'))
+def import_tasks():
+    """
+    Create tasks from an uploaded CSV or NDJSON stream.
+
+    The body is read incrementally and the tasks are created in
+    transactions of TASKS_IMPORT_BATCH_SIZE records, so uploads of any size
+    are imported in bounded memory. Records take the fields of
+    ``POST /tasks``; files produced by ``GET /tasks/export`` can be imported
+    as they are. A failed record does not stop the import.
+
+    Clients sending ``Accept: application/x-ndjson`` receive one progress
+    line per batch with the processed, created and failed counts, followed
+    by the final summary.
+
+    Query parameters:
+        format: csv or ndjson, if not given by the Content-Type
+
+    Returns:
+        dict: Processed, created and failed counts, and the first
+            MAX_REPORTED_ERRORS failed records with their zero-based index
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 415 Unsupported Media Type if the format is unknown
+    """
     user = get_current_user()
-    tasks = TaskService.get_all_tasks(user)
-    return jsonify([task.to_dict() for task in tasks])
+    format = request_format(request.args.get('format'), request.mimetype)
+    if format is None:
+        abort(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Upload text/csv or application/x-ndjson")
+    progress = TaskService.import_tasks(
+        decode_tasks(request.stream, format), user, current_app.config['TASKS_IMPORT_BATCH_SIZE']
+    )
+
+    def summaries():
+        summary = {'processed': 0, 'created': 0, 'failed': 0}
+        errors = []
+        for batch in progress:
+            errors.extend(batch.pop('errors')[:MAX_REPORTED_ERRORS - len(errors)])
+            summary = batch
+            yield summary
+        yield {**summary, 'errors': errors}
+
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        dumps = current_app.json.dumps
+        lines = (dumps(summary) + '\n' for summary in summaries())
+        return Response(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
+    *_, summary = summaries()
+    return jsonify(summary)
+
 
 @task_bp.route('/tasks/<int:task_id>', methods=['GET'])
 @jwt_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('task_reads'))
 def get_task(task_id):
     """
     Get a specific task by ID.
 
     This endpoint returns a single task by its ID.
     Users can only access their own tasks unless they are admin.
+    Responses carry ETag and Last-Modified headers; conditional requests
+    for an unchanged task are answered with 304 Not Modified.
 
     Args:
         task_id (int): ID of the task to retrieve
@@ -54,12 +422,20 @@ def get_task(task_id):
         HTTPException: 403 Forbidden if user doesn't have access
     """
     user = get_current_user()
-    task = TaskService.get_task_by_id(task_id, user)
-    return jsonify(task.to_dict())
+    updated_at = TaskService.get_task_version(task_id, user)
+    etag = task_etag(task_id, updated_at)
+    if is_not_modified(etag, updated_at):
+        return not_modified_response(etag, updated_at)
+
+    task = cache_service.cached(
+        user, f'task:{task_id}', lambda: TaskService.get_task_by_id(task_id, user).to_dict()
+    )
+    return set_validators(jsonify(task), etag, updated_at)
+
 
 @task_bp.route('/tasks', methods=['POST'])
 @jwt_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('task_writes'))
 def create_task():
     """
     Create a new task.
@@ -77,15 +453,17 @@ def create_task():
     task = TaskService.create_task(data, user)
     return jsonify(task.to_dict()), 201
 
+
 @task_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 @jwt_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('task_writes'))
 def update_task(task_id):
     """
     Update an existing task.
 
     This endpoint allows users to update a task's information.
     Users can only update their own tasks unless they are admin.
+    Sending the task's ETag in If-Match makes the update conditional.
 
     Args:
         task_id (int): ID of the task to update
@@ -97,15 +475,17 @@ def update_task(task_id):
     Raises:
         HTTPException: 404 Not Found if task doesn't exist
         HTTPException: 403 Forbidden if user doesn't have access
+        HTTPException: 412 Precondition Failed if If-Match doesn't match
     """
     user = get_current_user()
     data = request.get_json()
-    task = TaskService.update_task(task_id, data, user)
-    return jsonify(task.to_dict())
+    task = TaskService.update_task(task_id, data, user, if_match=request.if_match)
+    return set_validators(jsonify(task.to_dict()), task_etag(task.id, task.updated_at), task.updated_at)
+
 
 @task_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
 @jwt_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('task_writes'))
 def delete_task(task_id):
     """
     Delete a task.
@@ -128,15 +508,85 @@ def delete_task(task_id):
     TaskService.delete_task(task_id, user)
     return '', 204
 
+
+@task_bp.route('/tasks:batch', methods=['POST'])
+@jwt_required()
+@limiter.limit(configured_limit('task_batches'))
+def create_tasks_batch():
+    """
+    Create several tasks in one request.
+
+    Request body: ``{"tasks": [{...}, ...]}`` with the same fields as
+    ``POST /tasks``. All valid tasks are created in a single transaction.
+
+    Returns:
+        dict: Per-item results, in request order, each with an HTTP status
+            and the created task ID or an error message
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if the batch is missing or too large
+    """
+    user = get_current_user()
+    results = TaskService.create_tasks(_batch_items('tasks'), user)
+    return jsonify({'results': results})
+
+
+@task_bp.route('/tasks:batch', methods=['PATCH'])
+@jwt_required()
+@limiter.limit(configured_limit('task_batches'))
+def update_tasks_batch():
+    """
+    Update several tasks in one request.
+
+    Request body: ``{"tasks": [{"id": 1, ...}, ...]}``. Each item names the
+    task to update and the fields to change. Users can only update their own
+    tasks unless they are admin.
+
+    Returns:
+        dict: Per-item results, in request order
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if the batch is missing or too large
+    """
+    user = get_current_user()
+    results = TaskService.update_tasks(_batch_items('tasks'), user)
+    return jsonify({'results': results})
+
+
+@task_bp.route('/tasks:batch', methods=['DELETE'])
+@jwt_required()
+@limiter.limit(configured_limit('task_batches'))
+def delete_tasks_batch():
+    """
+    Delete several tasks in one request.
+
+    Request body: ``{"ids": [1, 2, ...]}``. Users can only delete their own
+    tasks unless they are admin.
+
+    Returns:
+        dict: Per-item results, in request order
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if the batch is missing or too large
+    """
+    user = get_current_user()
+    results = TaskService.delete_tasks(_batch_items('ids'), user)
+    return jsonify({'results': results})
+
+
 @task_bp.route('/admin/tasks', methods=['GET'])
 @jwt_required()
 @admin_required()
-@limiter.limit("100/hour")
+@limiter.limit(configured_limit('admin'))
 def get_all_tasks_admin():
     """
     Get all tasks (admin only).
 
-    This endpoint returns a list of all tasks in the system.
+    This endpoint returns a page of all tasks in the system, paginated,
+    filtered and streamable in the same way as ``GET /tasks``.
     Only accessible by admin users.
 
     Returns:
@@ -146,5 +596,25 @@ def get_all_tasks_admin():
     Raises:
         HTTPException: 403 Forbidden if user is not admin
     """
-    tasks = TaskService.get_all_tasks(get_current_user())
-    return jsonify([task.to_dict() for task in tasks])
+    return _task_list_response(get_current_user())
+
+
+@task_bp.route('/admin/tasks/stats', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit(configured_limit('admin'))
+def get_task_stats_admin():
+    """
+    Get task counts of all users (admin only).
+
+    Returns the same counts as ``GET /tasks/stats`` over all tasks, with a
+    per-user breakdown in ``users``.
+
+    Returns:
+        dict: Overall counts and the counts of each user
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 403 Forbidden if user is not admin
+    """
+    return jsonify(TaskService.get_global_stats())
@@ -0,0 +1,47 @@
+"""
+User routes module for the Task Management API.
+
+This module defines the admin endpoints for provisioning users.
+"""
+
+from http import HTTPStatus
+from flask import Blueprint, abort, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from .. import limiter
+from ..services.auth_service import admin_required
+from ..services.user_service import UserService
+from ..utils.rate_limit import configured_limit
+
+user_bp = Blueprint('user', __name__)
+
+
+@user_bp.route('/admin/users:batch', methods=['POST'])
+@jwt_required()
+@admin_required()
+@limiter.limit(configured_limit('admin'))
+def create_users_batch():
+    """
+    Create several users in one request (admin only).
+
+    Request body: ``{"users": [{"username": ..., "email": ..., "password":
+    ..., "role": "user"}, ...]}``. Taken usernames and emails are found with
+    one query, the passwords are hashed in parallel and all valid users are
+    created in a single transaction.
+
+    Returns:
+        dict: Per-item results, in request order, each with an HTTP status
+            and the created user ID or an error message
+        int: HTTP status code 200
+
+    Raises:
+        HTTPException: 400 Bad Request if the batch is missing or too large
+        HTTPException: 403 Forbidden if user is not admin
+    """
+    data = request.get_json()
+    items = data.get('users') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        abort(HTTPStatus.BAD_REQUEST, "users must be a non-empty list")
+    max_items = current_app.config['USERS_BATCH_MAX_ITEMS']
+    if len(items) > max_items:
+        abort(HTTPStatus.BAD_REQUEST, f"At most {max_items} users can be sent in one batch")
+    return jsonify({'results': UserService.create_users(items)})
@@ -0,0 +1,204 @@
+"""
+Async task service module for the Task Management API.
+
+This module provides the read operations of TaskService on an asyncio
+session for the native views of the ASGI mode. Queries, filters, cursors
+and results are the same as in TaskService; writes stay in TaskService so
+that the change log, statistics and cache invalidation have one
+implementation.
+"""
+
+from ..models.task import Task
+from ..models.task_change import TaskChange
+from ..utils.pagination import encode_cursor
+from .task_service import (
+    _decode_change_cursor, _decode_task_cursor, _encode_task_cursor,
+    _keyset_condition, _overdue_conditions, _parse_sort, _sort_order,
+    _stats_summary, _task_conditions, user_can_access_task
+)
+from flask import abort
+from http import HTTPStatus
+from sqlalchemy import func, select
+
+
+class AsyncTaskService:
+    """
+    Service class for task reads on an AsyncSession.
+
+    Mirrors the read methods of TaskService; unlike TaskService it does not
+    route reads to replicas and is bound to the session of one request.
+    """
+
+    def __init__(self, session):
+        """
+        Args:
+            session (AsyncSession): Session of the request
+        """
+        self.session = session
+
+    async def get_tasks_page(self, user, limit, cursor=None, filters=None, sort='id'):
+        """
+        Get one page of tasks using keyset pagination.
+
+        Args:
+            user (User): The user to get tasks for
+            limit (int): Maximum number of tasks to return
+            cursor (str): Opaque cursor returned with the previous page
+            filters (dict): Optional filters, see TaskService._tasks_query
+            sort (str): Sort field, prefixed with '-' for descending order
+
+        Returns:
+            tuple: List of task rows (see Task.row_to_dict) and the cursor of
+                the next page, or None if this is the last page
+
+        Raises:
+            HTTPException: 400 Bad Request if the cursor, sort or filters are invalid
+        """
+        field, descending = _parse_sort(sort)
+        column = getattr(Task, field)
+        query = select(*Task.__table__.columns).where(*_task_conditions(user, filters))
+        if cursor:
+            value, last_id = _decode_task_cursor(cursor, field)
+            query = query.where(_keyset_condition(column, descending, value, last_id))
+
+        result = await self.session.execute(
+            query.order_by(*_sort_order(column, descending)).limit(limit + 1)
+        )
+        tasks = result.all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = _encode_task_cursor(tasks[-1], field)
+        return tasks, next_cursor
+
+    async def get_changes(self, user, since, limit):
+        """
+        Get the tasks changed after a sync cursor.
+
+        Args:
+            user (User): The user to get changes for
+            since (str): Opaque cursor returned by a previous call, or None
+            limit (int): Maximum number of changes to return
+
+        Returns:
+            dict: Changed tasks, IDs of deleted tasks, the cursor to use next
+                and whether more changes are pending
+
+        Raises:
+            HTTPException: 400 Bad Request if the cursor is invalid
+        """
+        conditions = [] if user.role == 'admin' else [TaskChange.user_id == user.id]
+
+        if since is None:
+            result = await self.session.execute(
+                select(func.max(TaskChange.seq)).where(*conditions)
+            )
+            last_seq = result.scalar() or 0
+            return {'tasks': [], 'deleted': [], 'cursor': encode_cursor([last_seq]), 'has_more': False}
+
+        last_seq = _decode_change_cursor(since)
+        result = await self.session.execute(
+            select(TaskChange.seq, TaskChange.task_id, TaskChange.operation, *Task.__table__.columns)
+            .outerjoin(Task, Task.id == TaskChange.task_id)
+            .where(TaskChange.seq > last_seq, *conditions)
+            .order_by(TaskChange.seq)
+            .limit(limit + 1)
+        )
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tasks = [Task.row_to_dict(row) for row in rows if row.operation == 'upsert' and row.id]
+        deleted = [row.task_id for row in rows if row.operation == 'delete']
+        if rows:
+            last_seq = rows[-1].seq
+        return {'tasks': tasks, 'deleted': deleted, 'cursor': encode_cursor([last_seq]), 'has_more': has_more}
+
+    async def get_task_by_id(self, task_id, user):
+        """
+        Get a specific task by ID.
+
+        Args:
+            task_id (int): ID of the task to retrieve
+            user (User): The user making the request
+
+        Returns:
+            Row: The task's columns (see Task.row_to_dict)
+
+        Raises:
+            HTTPException: 404 Not Found if task doesn't exist
+            HTTPException: 403 Forbidden if user doesn't have access
+        """
+        result = await self.session.execute(
+            select(*Task.__table__.columns).where(Task.id == task_id)
+        )
+        task = result.first()
+        if task is None:
+            abort(HTTPStatus.NOT_FOUND)
+        if not user_can_access_task(user, task):
+            abort(HTTPStatus.FORBIDDEN, "Access denied")
+        return task
+
+    async def get_task_version(self, task_id, user):
+        """
+        Get the last modification time of a task without loading it.
+
+        Args:
+            task_id (int): ID of the task
+            user (User): The user making the request
+
+        Returns:
+            datetime: The task's updated_at
+
+        Raises:
+            HTTPException: 404 Not Found if task doesn't exist
+            HTTPException: 403 Forbidden if user doesn't have access
+        """
+        result = await self.session.execute(
+            select(Task.user_id, Task.updated_at).where(Task.id == task_id)
+        )
+        row = result.first()
+        if row is None:
+            abort(HTTPStatus.NOT_FOUND)
+        if not user_can_access_task(user, row):
+            abort(HTTPStatus.FORBIDDEN, "Access denied")
+        return row.updated_at
+
+    async def get_tasks_version(self, user, filters=None):
+        """
+        Summarize the tasks visible to a user with one aggregate query.
+
+        Args:
+            user (User): The user to get tasks for
+            filters (dict): Optional filters, see TaskService._tasks_query
+
+        Returns:
+            tuple: Latest updated_at (None if there are no tasks) and count
+        """
+        result = await self.session.execute(
+            select(func.max(Task.updated_at), func.count(Task.id))
+            .where(*_task_conditions(user, filters))
+        )
+        return tuple(result.one())
+
+    async def get_stats(self, user):
+        """
+        Count the tasks of a user by status and priority, and the overdue ones.
+
+        Args:
+            user (User): The user to get statistics for
+
+        Returns:
+            dict: Total count, counts by status and by priority, and the
+                number of overdue tasks
+        """
+        result = await self.session.execute(
+            select(Task.status, Task.priority, func.count(Task.id))
+            .where(Task.user_id == user.id)
+            .group_by(Task.status, Task.priority)
+        )
+        stats = _stats_summary(result.all())
+        result = await self.session.execute(
+            select(func.count(Task.id)).where(Task.user_id == user.id, *_overdue_conditions())
+        )
+        stats['overdue'] = result.scalar()
+        return stats
@@ -4,10 +4,25 @@ Authentication service module for the Task Management API.
 This module provides helper functions for user authentication and authorization.
 """
 
+import threading
+import time
+from collections import OrderedDict, namedtuple
 from functools import wraps
-from flask import jsonify
+from flask import current_app, g, jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from ..models.user import User
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+from ..models.user import User, db
+from . import cache_service
+
+# Identity and role of an authenticated user, all that authorization needs
+CurrentUser = namedtuple('CurrentUser', ['id', 'role'])
+
+# Process-level cache of user_id -> (CurrentUser, expiry time, generation),
+# least recently used first
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
 
 def admin_required():
     """
@@ -22,24 +37,167 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            
+            user = get_current_user()
+
             if not user or user.role != 'admin':
                 return jsonify({'message': 'Admin privileges required'}), 403
             return fn(*args, **kwargs)
         return decorator
     return wrapper
 
+
 def get_current_user():
     """
     Get the current authenticated user.
 
+    The user is looked up at most once per request and is served from a
+    short-lived process-level cache across requests; see _cached_user.
+
+    Returns:
+        CurrentUser: The currently authenticated user, or None if the user
+            no longer exists
+    """
+    user_id = int(get_jwt_identity())
+    cached = g.get('current_user')
+    if cached is None or cached[0] != user_id:
+        cached = g.current_user = (user_id, _load_user(user_id))
+    return cached[1]
+
+
+async def get_current_user_async(session):
+    """
+    Get the current authenticated user in a native async view.
+
+    Same as get_current_user, but a user missing from the caches is loaded
+    through the given AsyncSession.
+
+    Args:
+        session (AsyncSession): Session of the async request
+
+    Returns:
+        CurrentUser: The currently authenticated user, or None if the user
+            no longer exists
+    """
+    user_id = int(get_jwt_identity())
+    cached = g.get('current_user')
+    if cached is None or cached[0] != user_id:
+        generation = _user_generation(user_id)
+        user = _cached_user(user_id, generation)
+        if user is None:
+            result = await session.execute(select(User.id, User.role).where(User.id == user_id))
+            row = result.first()
+            user = _remember_user(row, generation) if row else None
+        cached = g.current_user = (user_id, user)
+    return cached[1]
+
+
+def _load_user(user_id):
+    """
+    Load a user's identity and role, using the process-level cache.
+
+    Args:
+        user_id (int): ID of the user to load
+
     Returns:
-        User: The currently authenticated user object
+        CurrentUser: The user's identity and role, or None if not found
     """
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    generation = _user_generation(user_id)
+    user = _cached_user(user_id, generation)
+    if user is not None:
+        return user
+
+    row = db.session.query(User.id, User.role).filter_by(id=user_id).first()
+    if row is None:
+        return None
+    return _remember_user(row, generation)
+
+
+def _user_generation(user_id):
+    """
+    Get the account generation token of a user from the shared cache.
+
+    It is read before the user is loaded, so that a change committed after
+    the load replaces the token the cached copy is stored with.
+
+    Returns:
+        str: Generation token, or None if users are not cached across
+            requests: without a shared cache backend, a worker would not
+            see the role changes and deletions made through the others
+    """
+    if current_app.config['USER_CACHE_TTL'] <= 0:
+        return None
+    return cache_service.user_generation(user_id)
+
+
+def _cached_user(user_id, generation):
+    """
+    Get a user from the process-level cache, or None if missing, expired or
+    changed since it was cached.
+    """
+    if generation is None:
+        return None
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry is None or entry[1] <= time.monotonic() or entry[2] != generation:
+            return None
+        _user_cache.move_to_end(user_id)
+        return entry[0]
+
+
+def _remember_user(row, generation):
+    """
+    Add a loaded (id, role) row to the process-level cache.
+
+    The least recently used user is evicted when the cache holds
+    USER_CACHE_MAX_SIZE users.
+
+    Returns:
+        CurrentUser: The user's identity and role
+    """
+    user = CurrentUser(row.id, row.role)
+    if generation is not None:
+        expires = time.monotonic() + current_app.config['USER_CACHE_TTL']
+        with _user_cache_lock:
+            _user_cache[row.id] = (user, expires, generation)
+            _user_cache.move_to_end(row.id)
+            while len(_user_cache) > current_app.config['USER_CACHE_MAX_SIZE']:
+                _user_cache.popitem(last=False)
+    return user
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached copies of a user in every worker.
+
+    Args:
+        user_id (int): ID of the user that changed
+    """
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+    cache_service.invalidate_users([user_id])
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _record_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    # Invalidated after the commit: a worker reloading the user before it
+    # would cache the old role under the new generation
+    for user_id in session.info.pop('changed_users', ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_changed_users(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop('changed_users', None)
+
 
 def user_can_access_task(user, task):
     """
@@ -0,0 +1,252 @@
+"""
+Cache service module for the Task Management API.
+
+This module caches serialized task responses per user. Every cache key
+embeds a generation token of the viewer's scope; task writes replace the
+token of the affected users, which invalidates all of their cached
+responses at once without enumerating keys.
+
+Each token records when the write happened. Until READ_REPLICA_STICKY_SECONDS
+have passed, a miss is filled from the primary database: a read replica
+that has not caught up would otherwise put the pre-write response back
+into the cache.
+
+The same tokens let auth_service trust its per-process copies of user
+accounts: each copy is used only while the account's token is unchanged.
+
+Invalidation only reaches every server worker when the backend is shared
+between them, so by default responses are cached only with a Redis or
+Memcached backend; a per-process backend would serve other workers' stale
+copies until they expire.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from flask import current_app
+from .. import cache
+from . import replica_service
+
+logger = logging.getLogger(__name__)
+
+# Scope of admin users, who see the tasks of every user
+GLOBAL_SCOPE = 'all'
+
+# Flask-Caching backends whose entries every worker and node sees
+SHARED_BACKENDS = frozenset({
+    'RedisCache', 'RedisSentinelCache', 'RedisClusterCache', 'MemcachedCache', 'SASLMemcachedCache'
+})
+
+_stats = {'hits': 0, 'misses': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def init_app(app):
+    """
+    Decide whether task responses are cached by the application.
+
+    TASK_CACHE_ENABLED 'auto' caches only with a shared backend; 'true'
+    caches with any backend and is safe only for a single server process.
+
+    Args:
+        app (Flask): The application
+    """
+    setting = app.config['TASK_CACHE_ENABLED']
+    backend = str(app.config['CACHE_TYPE']).rsplit('.', 1)[-1]
+    if setting == 'auto':
+        enabled = backend in SHARED_BACKENDS
+        if not enabled:
+            logger.info('Task response caching disabled: %s is not shared between workers', backend)
+    else:
+        enabled = setting == 'true'
+    app.extensions['task_cache'] = enabled
+
+
+def enabled():
+    """
+    Check whether task responses are cached by the current application.
+    """
+    return current_app.extensions.get('task_cache', False)
+
+
+def _generation_key(scope):
+    return f'tasks:generation:{scope}'
+
+
+def _new_generation(written_at=0):
+    return f'{uuid.uuid4().hex}:{written_at:.3f}'
+
+
+def _written_recently(generation):
+    """
+    Check whether a generation token was made by a write within the
+    replica stickiness window.
+    """
+    _, separator, written_at = generation.rpartition(':')
+    if not separator:
+        return False
+    return time.time() - float(written_at) < current_app.config['READ_REPLICA_STICKY_SECONDS']
+
+
+def _generation(key):
+    """
+    Get the current generation token stored at a key, creating it if missing.
+
+    Args:
+        key (str): Cache key of the token
+
+    Returns:
+        str: Generation token
+    """
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_generation()
+        if not cache.add(key, generation, timeout=0):
+            generation = cache.get(key) or generation
+    return generation
+
+
+def viewer_scope(user):
+    """
+    Get the cache scope of a user: admins share the global scope.
+
+    Args:
+        user (User): The user viewing tasks
+
+    Returns:
+        Scope of the user's cached responses
+    """
+    return GLOBAL_SCOPE if user.role == 'admin' else user.id
+
+
+def cached(user, name, compute):
+    """
+    Return a cached response value for a user, computing it on a miss.
+
+    Cache errors are logged and treated as misses so that an unavailable
+    backend never fails a request. The value is always computed when
+    caching is disabled.
+
+    Args:
+        user (User): The user making the request
+        name (str): Name of the response within the user's scope
+        compute (callable): Function producing the value on a miss
+
+    Returns:
+        The cached or freshly computed value
+    """
+    if not enabled():
+        return compute()
+    try:
+        scope = viewer_scope(user)
+        generation = _generation(_generation_key(scope))
+        key = f'tasks:{scope}:{generation}:{name}'
+        value = cache.get(key)
+    except Exception:
+        logger.warning('Task cache unavailable', exc_info=True)
+        _count('errors')
+        return compute()
+
+    if value is not None:
+        _count('hits')
+        return value
+
+    _count('misses')
+    if _written_recently(generation):
+        with replica_service.reading_primary():
+            value = compute()
+    else:
+        value = compute()
+    try:
+        cache.set(key, value)
+    except Exception:
+        logger.warning('Failed to store task cache entry', exc_info=True)
+        _count('errors')
+    return value
+
+
+def invalidate(user_ids):
+    """
+    Invalidate the cached task responses of the given task owners.
+
+    Admin responses are invalidated as well, since they include every
+    user's tasks.
+
+    Args:
+        user_ids (iterable): IDs of the users whose tasks changed
+    """
+    if not enabled():
+        return
+    scopes = set(user_ids) | {GLOBAL_SCOPE}
+    written_at = time.time()
+    try:
+        cache.set_many(
+            {_generation_key(scope): _new_generation(written_at) for scope in scopes},
+            timeout=0
+        )
+    except Exception:
+        logger.warning('Failed to invalidate task cache', exc_info=True)
+        _count('errors')
+
+
+def _user_generation_key(user_id):
+    return f'users:generation:{user_id}'
+
+
+def user_generation(user_id):
+    """
+    Get the generation token of a user's account, which changes with every
+    committed change of the account.
+
+    Args:
+        user_id (int): ID of the user
+
+    Returns:
+        str: Generation token, or None if caching is disabled or the
+            backend is unavailable
+    """
+    if not enabled():
+        return None
+    try:
+        return _generation(_user_generation_key(user_id))
+    except Exception:
+        logger.warning('User cache unavailable', exc_info=True)
+        _count('errors')
+        return None
+
+
+def invalidate_users(user_ids):
+    """
+    Replace the account generation tokens of changed users.
+
+    Args:
+        user_ids (iterable): IDs of the users whose account changed
+    """
+    if not enabled():
+        return
+    try:
+        cache.set_many({_user_generation_key(user_id): _new_generation() for user_id in user_ids}, timeout=0)
+    except Exception:
+        logger.warning('Failed to invalidate user cache', exc_info=True)
+        _count('errors')
+
+
+def get_stats():
+    """
+    Get the cache hit and miss counters of this process.
+
+    Returns:
+        dict: Whether caching is enabled, hits, misses, errors and hit ratio
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['enabled'] = enabled()
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
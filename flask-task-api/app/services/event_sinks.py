@@ -0,0 +1,118 @@
+"""
+Event sinks of the Task Management API.
+
+A sink receives the task events produced by the due date scheduler, as
+JSON-serializable dicts with the event type and the task's fields. Sinks
+are registered by name with the event_sink decorator and selected with the
+comma-separated SCHEDULER_SINKS setting. A sink's emit runs inside the
+transaction that advances the scheduler, before it commits: rows added by
+the outbox sink are committed together with the scan's progress, and an
+exception from any sink rolls the batch back so that it is scanned again.
+Events reach external sinks at least once.
+"""
+
+import json
+import logging
+import urllib.request
+from flask import current_app
+from ..models.task_event import TaskEvent, db
+from ..utils.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Sink name -> factory called with the application config
+_sinks = {}
+
+
+def event_sink(name):
+    """
+    Register the factory of a kind of sink.
+
+    Args:
+        name (str): Name of the sink in SCHEDULER_SINKS
+
+    Returns:
+        callable: Decorator registering the factory
+    """
+    def register(factory):
+        _sinks[name] = factory
+        return factory
+    return register
+
+
+def configured_sinks():
+    """
+    Create the sinks named in SCHEDULER_SINKS.
+
+    Returns:
+        list: Sink instances
+
+    Raises:
+        ValueError: If a name is not a registered sink
+    """
+    config = current_app.config
+    names = [name.strip() for name in config['SCHEDULER_SINKS'].split(',') if name.strip()]
+    unknown = [name for name in names if name not in _sinks]
+    if unknown:
+        raise ValueError(f"Unknown event sinks: {', '.join(unknown)}")
+    return [_sinks[name](config) for name in names]
+
+
+@event_sink('log')
+class LogSink:
+    """
+    Log each event at INFO level with its fields as structured data.
+    """
+
+    def __init__(self, config):
+        pass
+
+    def emit(self, events):
+        for event in events:
+            logger.info('Task %s %s', event['task_id'], event['type'], extra={'event': event})
+
+
+@event_sink('outbox')
+class OutboxSink:
+    """
+    Append the events to the task_events table in the scheduler's transaction.
+    """
+
+    def __init__(self, config):
+        pass
+
+    def emit(self, events):
+        now = utcnow()
+        db.session.execute(TaskEvent.__table__.insert(), [
+            {
+                'type': event['type'],
+                'task_id': event['task_id'],
+                'user_id': event['user_id'],
+                'payload': event,
+                'created_at': now
+            }
+            for event in events
+        ])
+
+
+@event_sink('webhook')
+class WebhookSink:
+    """
+    POST the events of each batch as ``{"events": [...]}`` to
+    SCHEDULER_WEBHOOK_URL; a failed delivery fails the batch.
+    """
+
+    def __init__(self, config):
+        self.url = config['SCHEDULER_WEBHOOK_URL']
+        self.timeout = config['SCHEDULER_WEBHOOK_TIMEOUT']
+        if not self.url:
+            raise ValueError('SCHEDULER_WEBHOOK_URL is required by the webhook sink')
+
+    def emit(self, events):
+        body = json.dumps({'events': events}).encode('utf-8')
+        request = urllib.request.Request(
+            self.url, data=body, method='POST', headers={'Content-Type': 'application/json'}
+        )
+        # urlopen raises on responses other than 2xx and 3xx
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
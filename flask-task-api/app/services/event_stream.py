@@ -0,0 +1,545 @@
+"""
+Task event stream of the Task Management API.
+
+Clients follow the events of their tasks at ``GET /api/v1/tasks/events`` as
+Server-Sent Events instead of polling the task list. Events come from the
+task_events outbox, which task writes and the due date scheduler append to
+in their own transactions, so a client sees only committed changes.
+
+Each process runs one EventNotifier thread, started with the first
+subscription, which reads the new events of the outbox every
+EVENTS_POLL_INTERVAL seconds with one query however many clients are
+subscribed, encodes each event once and hands it to the subscriptions of
+its owner and of admins; task writes of the same process wake it at once.
+An idle subscription costs a small queue and, under the ASGI server, no
+thread; under a threaded WSGI server each stream holds a thread, and each
+process serves at most EVENTS_WSGI_MAX_STREAMS streams.
+
+A client reconnecting with the ``Last-Event-ID`` header first receives the
+events it missed from the outbox, up to EVENTS_BACKLOG_LIMIT; beyond that,
+or when the events it missed were pruned, it receives a ``reset`` event and
+resyncs with ``GET /api/v1/tasks/changes``.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from sqlalchemy import func, or_, select
+from ..models.task_event import TaskEvent, db
+from ..utils.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Reconnection delay suggested to clients, in milliseconds
+RETRY_MS = 3000
+
+# Seconds after which a client refused for lack of WSGI stream slots may retry
+BUSY_RETRY_AFTER = 30
+
+HEARTBEAT = b': keepalive\n\n'
+
+# Missing IDs below the notifier's cursor are read again for this long,
+# which covers transactions committing out of ID order on databases that
+# allocate IDs before commit; SQLite commits them in order
+GAP_TIMEOUT = 60
+
+# Subscription key of the subscriptions receiving every user's events
+ALL_USERS = None
+
+
+def encode_event(event_id, event_type, payload, dumps):
+    """
+    Encode an event as a Server-Sent Events frame.
+
+    Args:
+        event_id (int): ID of the event in the outbox
+        event_type (str): Type of the event, e.g. 'task.updated'
+        payload (dict): Data of the event
+        dumps (callable): JSON encoder
+
+    Returns:
+        bytes: The frame, ending with a blank line
+    """
+    return f'id: {event_id}\nevent: {event_type}\ndata: {dumps(payload)}\n\n'.encode('utf-8')
+
+
+def reset_frame(event_id):
+    """
+    Encode the frame telling a client that events it missed are no longer
+    available; the client resyncs and continues from event_id.
+    """
+    return f'id: {event_id}\nevent: reset\ndata: {{}}\n\n'.encode('utf-8')
+
+
+def open_frame():
+    return f'retry: {RETRY_MS}\n\n'.encode('utf-8')
+
+
+class Subscription:
+    """
+    Events of one client, queued by the notifier until they are sent.
+    """
+
+    def __init__(self, user_id, max_pending):
+        """
+        Args:
+            user_id (int): User whose events are delivered, or ALL_USERS
+            max_pending (int): Queued events after which the subscription is
+                closed; the client catches up from the outbox on reconnect
+        """
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.closed = False
+        self._frames = deque()
+        self._ready = threading.Event()
+
+    def push(self, frames):
+        """
+        Queue (event ID, frame) pairs; called by the notifier thread.
+        """
+        if len(self._frames) + len(frames) > self.max_pending:
+            self.closed = True
+        else:
+            self._frames.extend(frames)
+        self._wake()
+
+    def drain(self):
+        """
+        Take the queued (event ID, frame) pairs.
+
+        Returns:
+            list: The pairs in delivery order
+        """
+        frames = []
+        while self._frames:
+            frames.append(self._frames.popleft())
+        return frames
+
+    def _wake(self):
+        self._ready.set()
+
+    def wait(self, timeout):
+        """
+        Wait until events are queued or the subscription is closed.
+
+        Args:
+            timeout (float): Seconds to wait at most
+        """
+        self._ready.wait(timeout)
+        self._ready.clear()
+
+
+class AsyncSubscription(Subscription):
+    """
+    Subscription waited on by a coroutine of the ASGI server's event loop.
+    """
+
+    def __init__(self, user_id, max_pending, loop):
+        super().__init__(user_id, max_pending)
+        self._loop = loop
+        self._async_ready = asyncio.Event()
+
+    def _wake(self):
+        self._loop.call_soon_threadsafe(self._async_ready.set)
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self._async_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._async_ready.clear()
+
+
+class EventNotifier:
+    """
+    Thread reading new events from the outbox and delivering them to the
+    subscriptions of this process.
+    """
+
+    def __init__(self, app, poll_interval, batch_size):
+        """
+        Args:
+            app (Flask): The application whose outbox is read
+            poll_interval (float): Seconds between reads of the outbox
+            batch_size (int): Events read at most per query
+        """
+        self.app = app
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._subscriptions = {}  # user ID or ALL_USERS -> set of subscriptions
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._gaps = {}  # missing event ID -> monotonic time it was noticed
+        self._thread = None
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+        self._stats = {'polls': 0, 'events': 0, 'deliveries': 0, 'dropped': 0}
+
+    def subscribe(self, subscription):
+        """
+        Deliver the events committed from now on to a subscription.
+
+        Starts the notifier on first use. When the notifier is idle the
+        current end of the outbox is read before returning, so that no
+        event committed after this call is missed.
+
+        Args:
+            subscription (Subscription): The subscription to add
+        """
+        with self._lock:
+            if self._cursor is None:
+                with db.engine.connect() as connection:
+                    self._cursor = connection.execute(select(func.max(TaskEvent.id))).scalar() or 0
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-notifier', daemon=True)
+                self._thread.start()
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+
+    def unsubscribe(self, subscription):
+        """
+        Stop delivering events to a subscription.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def stop(self, timeout=None):
+        """
+        Stop the notifier thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """
+        Read the outbox now rather than at the next interval; called after
+        writes of this process commit events.
+        """
+        if self._subscriptions:
+            self._wakeup.set()
+
+    def _run(self):
+        with self.app.app_context():
+            self._poll_until_stopped()
+
+    def _poll_until_stopped(self):
+        while not self._stopping.is_set():
+            with self._lock:
+                if not self._subscriptions:
+                    # Idle: the next subscription reads the end of the outbox
+                    self._cursor = None
+                    self._gaps.clear()
+            read = 0
+            if self._cursor is not None:
+                try:
+                    read = self.poll()
+                except Exception:
+                    logger.warning('Failed to read task events', exc_info=True)
+            if read < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def poll(self):
+        """
+        Read the events committed since the previous poll and deliver them.
+
+        Returns:
+            int: Number of events read
+        """
+        now = time.monotonic()
+        self._gaps = {event_id: noticed for event_id, noticed in self._gaps.items() if now - noticed < GAP_TIMEOUT}
+        condition = TaskEvent.id > self._cursor
+        if self._gaps:
+            condition = or_(condition, TaskEvent.id.in_(self._gaps))
+        query = select(TaskEvent.id, TaskEvent.type, TaskEvent.user_id, TaskEvent.payload).where(
+            condition
+        ).order_by(TaskEvent.id).limit(self.batch_size)
+        with db.engine.connect() as connection:
+            rows = connection.execute(query).all()
+
+        dumps = self.app.json.dumps
+        by_user = {}
+        for row in rows:
+            if row.id > self._cursor:
+                missing = range(max(self._cursor + 1, row.id - self.batch_size), row.id)
+                self._gaps.update((event_id, now) for event_id in missing)
+                self._cursor = row.id
+            else:
+                self._gaps.pop(row.id, None)
+            by_user.setdefault(row.user_id, []).append(
+                (row.id, encode_event(row.id, row.type, row.payload, dumps))
+            )
+
+        deliveries = dropped = 0
+        if by_user:
+            with self._lock:
+                targets = [
+                    (subscription, frames)
+                    for user_id, frames in by_user.items()
+                    for subscription in self._subscriptions.get(user_id, ())
+                ]
+                everyone = list(self._subscriptions.get(ALL_USERS, ()))
+            if everyone:
+                frames = sorted(frame for frames in by_user.values() for frame in frames)
+                targets += [(subscription, frames) for subscription in everyone]
+            for subscription, frames in targets:
+                subscription.push(frames)
+                if subscription.closed:
+                    dropped += 1
+                    self.unsubscribe(subscription)
+                else:
+                    deliveries += 1
+        self._stats['polls'] += 1
+        self._stats['events'] += len(rows)
+        self._stats['deliveries'] += deliveries
+        self._stats['dropped'] += dropped
+        return len(rows)
+
+    def get_stats(self):
+        """
+        Get the counters of this notifier since it started.
+
+        Returns:
+            dict: Subscriptions, polls, events read, deliveries to
+                subscriptions and subscriptions closed for falling behind
+        """
+        with self._lock:
+            subscriptions = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+        return {'subscriptions': subscriptions, **self._stats}
+
+
+def init_app(app):
+    """
+    Create the event notifier of an application, whose thread starts with
+    the first subscription, and the slots of its WSGI streams.
+
+    Args:
+        app (Flask): The application to set up
+    """
+    app.extensions['event_notifier'] = EventNotifier(
+        app, app.config['EVENTS_POLL_INTERVAL'], app.config['EVENTS_BATCH_SIZE']
+    )
+    app.extensions['event_stream_slots'] = threading.BoundedSemaphore(app.config['EVENTS_WSGI_MAX_STREAMS'])
+
+
+def get_stats(app):
+    """
+    Get the event stream counters of an application's process.
+
+    Returns:
+        dict: See EventNotifier.get_stats
+    """
+    return app.extensions['event_notifier'].get_stats()
+
+
+def subscription_key(user):
+    """
+    Get the subscription key of a user: admins receive every user's events.
+    """
+    return ALL_USERS if user.role == 'admin' else user.id
+
+
+def parse_last_event_id(value):
+    """
+    Parse the Last-Event-ID header of a reconnecting client.
+
+    Returns:
+        int: ID of the last event the client received, or None if the
+            header is missing or not an event ID
+    """
+    if value is None or not value.isdigit():
+        return None
+    return int(value)
+
+
+def backlog_query(user, since, limit):
+    """
+    Build the queries of the events a reconnecting client missed.
+
+    Args:
+        user (User): The subscribing user
+        since (int): ID of the last event the client received
+        limit (int): Events to send at most
+
+    Returns:
+        tuple: Query of up to limit + 1 missed events, and query of the
+            lowest event ID still in the outbox
+    """
+    query = select(TaskEvent.id, TaskEvent.type, TaskEvent.payload).where(TaskEvent.id > since)
+    if user.role != 'admin':
+        query = query.where(TaskEvent.user_id == user.id)
+    return query.order_by(TaskEvent.id).limit(limit + 1), select(func.min(TaskEvent.id))
+
+
+def backlog_frames(rows, oldest, since, limit, dumps):
+    """
+    Encode the events a reconnecting client missed.
+
+    Args:
+        rows (list): Rows of the backlog query
+        oldest (int): Lowest event ID in the outbox, or None if it is empty
+        since (int): ID of the last event the client received
+        limit (int): Events to send at most
+        dumps (callable): JSON encoder
+
+    Returns:
+        list: (event ID, frame) pairs; a single reset frame if more than
+            limit events were missed or events after since were pruned
+    """
+    if len(rows) > limit or (oldest is not None and oldest > since + 1):
+        return [(since, reset_frame(since))]
+    return [(row.id, encode_event(row.id, row.type, row.payload, dumps)) for row in rows]
+
+
+class _StreamState:
+    """
+    Frames of one event stream, shared by stream and stream_async, which
+    only differ in how they wait for the subscription.
+
+    Live events are sent only if their ID is above the last one sent: events
+    of the backlog, and events up to Last-Event-ID that the subscription
+    received before the backlog was read, are not sent again.
+    """
+
+    def __init__(self, subscription, since, backlog, heartbeat, expires):
+        self.subscription = subscription
+        self.backlog = backlog
+        self.heartbeat = heartbeat
+        self.expires = expires
+        self.last = max([since or 0] + [event_id for event_id, frame in backlog])
+
+    def opening(self):
+        """
+        Get the frames sent before waiting: the open frame and the backlog.
+        """
+        return [open_frame()] + [frame for event_id, frame in self.backlog]
+
+    def timeout(self):
+        """
+        Get the seconds to wait for events, or None once the stream must end.
+        """
+        if self.subscription.closed:
+            return None
+        if not self.expires:
+            return self.heartbeat
+        remaining = self.expires - time.time()
+        return min(self.heartbeat, remaining) if remaining > 0 else None
+
+    def drain(self):
+        """
+        Get the frames of the new events, or a heartbeat if there are none.
+        """
+        frames = []
+        for event_id, frame in self.subscription.drain():
+            if event_id > self.last:
+                frames.append(frame)
+                self.last = event_id
+        return b''.join(frames) if frames else HEARTBEAT
+
+
+def stream(notifier, subscription, since, backlog, heartbeat, expires):
+    """
+    Generate the frames of an event stream for a WSGI response.
+
+    The subscription must be added before the backlog is read. The stream
+    ends when the access token expires, and when the client falls too far
+    behind; the client reconnects with Last-Event-ID in both cases.
+
+    Args:
+        notifier (EventNotifier): The notifier the subscription was added to
+        subscription (Subscription): The client's subscription
+        since (int): Last-Event-ID of the client, or None
+        backlog (list): (event ID, frame) pairs of the missed events
+        heartbeat (float): Seconds of silence after which a comment is sent
+        expires (float): UNIX time at which the access token expires, or None
+
+    Yields:
+        bytes: Frames and heartbeat comments
+    """
+    state = _StreamState(subscription, since, backlog, heartbeat, expires)
+    try:
+        yield from state.opening()
+        timeout = state.timeout()
+        while timeout is not None:
+            subscription.wait(timeout)
+            yield state.drain()
+            timeout = state.timeout()
+    finally:
+        notifier.unsubscribe(subscription)
+
+
+async def stream_async(notifier, subscription, since, backlog, heartbeat, expires):
+    """
+    Generate the frames of an event stream for the ASGI server; see stream.
+    """
+    state = _StreamState(subscription, since, backlog, heartbeat, expires)
+    try:
+        for frame in state.opening():
+            yield frame
+        timeout = state.timeout()
+        while timeout is not None:
+            await subscription.wait(timeout)
+            yield state.drain()
+            timeout = state.timeout()
+    finally:
+        notifier.unsubscribe(subscription)
+
+
+def prune_events(days):
+    """
+    Delete the events older than a number of days from the outbox.
+
+    Args:
+        days (float): Age in days of the oldest events kept
+
+    Returns:
+        int: Number of deleted events
+    """
+    cutoff = utcnow() - timedelta(days=days)
+    deleted = TaskEvent.query.filter(TaskEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def missed_events(user, since, limit, dumps):
+    """
+    Read the events a reconnecting client missed; see backlog_frames.
+
+    Args:
+        user (User): The subscribing user
+        since (int): ID of the last event the client received, or None for
+            a new client, which receives only events committed from now on
+        limit (int): Events to send at most
+        dumps (callable): JSON encoder
+
+    Returns:
+        list: (event ID, frame) pairs
+    """
+    if since is None:
+        return []
+    query, oldest = backlog_query(user, since, limit)
+    rows = db.session.execute(query).all()
+    return backlog_frames(rows, db.session.execute(oldest).scalar(), since, limit, dumps)
+
+
+async def missed_events_async(session, user, since, limit, dumps):
+    """
+    Read the events a reconnecting client missed on an AsyncSession; see
+    missed_events.
+    """
+    if since is None:
+        return []
+    query, oldest = backlog_query(user, since, limit)
+    rows = (await session.execute(query)).all()
+    return backlog_frames(rows, (await session.execute(oldest)).scalar(), since, limit, dumps)
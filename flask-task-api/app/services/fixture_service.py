@@ -0,0 +1,276 @@
+"""
+Fixture service module for the Task Management API.
+
+This module generates large synthetic datasets of users and tasks for
+profiling. Rows are built from a vocabulary drawn once per seed and
+inserted with executemany statements that bypass the ORM. All users share
+one password hash, computed once. The tasks are generated in chunks whose
+content depends only on the seed and the chunk number, so a dataset is the
+same however many processes load it.
+"""
+
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import lru_cache, partial
+from sqlalchemy import create_engine, event
+from ..models.task import Task, db
+from ..models.user import User
+from ..utils import search
+from ..utils.database import _pragma_setter
+from . import password_service
+from ..utils.timestamps import utcnow
+from .task_service import PRIORITIES, STATUSES, TaskService
+
+WORDS = (
+    'report', 'meeting', 'budget', 'review', 'invoice', 'client', 'design', 'deploy',
+    'release', 'backup', 'server', 'update', 'email', 'call', 'plan', 'draft',
+    'schedule', 'contract', 'payment', 'order', 'milk', 'groceries', 'doctor', 'car',
+    'garden', 'book', 'flight', 'hotel', 'ticket', 'birthday', 'gift', 'party',
+    'research', 'paper', 'slides', 'training', 'hiring', 'interview', 'onboarding', 'audit',
+    'security', 'database', 'migration', 'index', 'query', 'cache', 'metrics', 'alert',
+    'quarterly', 'weekly', 'urgent', 'follow', 'prepare', 'send', 'fix', 'check',
+    'renew', 'cancel', 'submit', 'approve'
+)
+
+# Tasks are created over the past HISTORY_DAYS and due up to DUE_WITHIN_DAYS
+# after their creation
+HISTORY_DAYS = 365
+DUE_WITHIN_DAYS = 60
+
+# Distinct titles and descriptions drawn per seed (12 random bits each)
+VOCABULARY_SIZE = 4096
+
+USER_COLUMNS = ('id', 'username', 'email', 'password_hash', 'role', 'created_at', 'updated_at')
+TASK_COLUMNS = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at', 'user_id'
+)
+
+# Engine of a loader process, created by its first chunk
+_process_engine = None
+
+
+@lru_cache(maxsize=4)
+def _vocabulary(seed):
+    rng = random.Random(seed)
+    titles = [' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize() for _ in range(VOCABULARY_SIZE)]
+    descriptions = [
+        '{} ref {}'.format(' '.join(rng.choices(WORDS, k=rng.randint(8, 20))), rng.randrange(100000))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    return titles, descriptions
+
+
+@lru_cache(maxsize=4)
+def _timestamps(today):
+    """
+    Text of the dates and times of day that generated timestamps combine.
+
+    Timestamps are written as text in the format SQLAlchemy stores on
+    SQLite, which PostgreSQL parses as well, so that no row is converted
+    from datetime objects.
+
+    Returns:
+        tuple: Day offset before today -> 'YYYY-MM-DD', and minute of the
+            day -> 'HH:MM:SS.ffffff'
+    """
+    dates = {
+        offset: (today - timedelta(days=offset)).isoformat()
+        for offset in range(-DUE_WITHIN_DAYS, HISTORY_DAYS + 1)
+    }
+    times = [f'{minute // 60:02d}:{minute % 60:02d}:00.000000' for minute in range(1440)]
+    return dates, times
+
+
+def _task_rows(seed, chunk, first_id, count, users, today):
+    """
+    Generate the rows of one chunk of tasks.
+
+    Each row takes its fields from two 64-bit random numbers: about 70% of
+    the tasks have a description and 80% a due date, statuses and
+    priorities are uniform, and owners are spread evenly over the users.
+
+    Args:
+        seed (int): Seed of the dataset
+        chunk (int): Chunk number, which seeds the random numbers of the chunk
+        first_id (int): ID of the first task
+        count (int): Number of tasks
+        users (int): Number of users owning the tasks, with IDs from 1
+        today (date): Date the timestamps are relative to
+
+    Returns:
+        list: Row tuples in the order of TASK_COLUMNS
+    """
+    titles, descriptions = _vocabulary(seed)
+    dates, times = _timestamps(today)
+    getrandbits = random.Random(f'{seed}:{chunk}').getrandbits
+    rows = []
+    for task_id in range(first_id, first_id + count):
+        a = getrandbits(64)
+        b = getrandbits(64)
+        day = (b & 0x1FF) % HISTORY_DAYS + 1
+        minute = (b >> 9 & 0x7FF) % 1440
+        updated = minute + (b >> 20 & 0x7FF) % 1440
+        rows.append((
+            task_id,
+            titles[a & 0xFFF],
+            descriptions[a >> 12 & 0xFFF] if (a >> 24 & 0x3FF) < 717 else None,
+            STATUSES[(a >> 34 & 0xFF) % 3],
+            PRIORITIES[(a >> 42 & 0xFF) % 3],
+            dates[day - (b >> 31 & 0x3F) % DUE_WITHIN_DAYS] + ' ' + times[minute]
+            if (a >> 50 & 0x3FF) < 819 else None,
+            dates[day] + ' ' + times[minute],
+            dates[day - 1] + ' ' + times[updated - 1440] if updated >= 1440 else dates[day] + ' ' + times[updated],
+            (b >> 37) % users + 1
+        ))
+    return rows
+
+
+def _insert(connection, table, columns, rows):
+    """
+    Insert row tuples with one executemany statement, without the ORM or
+    SQLAlchemy type processing.
+    """
+    marker = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+    connection.exec_driver_sql(
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join([marker] * len(columns))})', rows
+    )
+
+
+def _load_chunk(database_url, pragmas, seed, users, today, chunk):
+    """
+    Generate and insert a chunk of tasks in a loader process.
+
+    Args:
+        database_url (str): URL of the database
+        pragmas (dict): SQLITE_PRAGMAS of the application
+        seed (int): Seed of the dataset
+        users (int): Number of users
+        today (date): Date the timestamps are relative to
+        chunk (tuple): Chunk number, first task ID and number of tasks
+
+    Returns:
+        int: Number of tasks inserted
+    """
+    global _process_engine
+    if _process_engine is None:
+        _process_engine = create_engine(database_url)
+        if _process_engine.dialect.name == 'sqlite' and pragmas:
+            event.listen(_process_engine, 'connect', _pragma_setter(pragmas))
+    number, first_id, count = chunk
+    with _process_engine.begin() as connection:
+        _insert(connection, Task.__tablename__, TASK_COLUMNS, _task_rows(seed, number, first_id, count, users, today))
+    return count
+
+
+class FixtureService:
+    """
+    Service class for generating synthetic users and tasks.
+    """
+
+    @staticmethod
+    def generate(users, tasks, seed=42, processes=1, chunk_size=10000, password='password',
+                 password_hash=None, progress=None):
+        """
+        Fill an empty database with synthetic users and tasks.
+
+        Users are named user1, user2, ... with the same password; user1 is
+        an admin. While the tasks are loaded, the task indexes and the
+        search index are suspended; they are rebuilt afterwards, together
+        with the task statistics, as that is faster than updating them for
+        every row. With several processes, each generates and inserts its
+        own chunks; on SQLite the inserts still take turns, but the rows
+        are generated in parallel.
+
+        Args:
+            users (int): Number of users to create
+            tasks (int): Number of tasks spread across the users
+            seed (int): Seed making the dataset reproducible
+            processes (int): Loader processes; 1 loads in this process
+            chunk_size (int): Tasks per insert statement and transaction
+            password (str): Password of every user
+            password_hash (str): Precomputed hash of the password, which
+                skips hashing it with the configured work factor
+            progress (callable): Called with the number of tasks of each
+                inserted chunk
+
+        Returns:
+            dict: Numbers of users and tasks, and the seconds spent
+                inserting and indexing
+
+        Raises:
+            ValueError: If the database already contains users or tasks
+        """
+        if users < 1 and tasks:
+            raise ValueError("Tasks need at least one user")
+        if db.session.query(User.id).first() or db.session.query(Task.id).first():
+            raise ValueError("The database already contains users or tasks")
+        if password_hash is None:
+            password_hash = password_service.hash_password(password)
+
+        started = utcnow()
+        today = started.date()
+        created_at = started.isoformat(' ', timespec='microseconds')
+        connection = db.session.connection()
+        for start in range(0, users, chunk_size):
+            _insert(connection, User.__tablename__, USER_COLUMNS, [
+                (user_id, f'user{user_id}', f'user{user_id}@example.com', password_hash,
+                 'admin' if user_id == 1 else 'user', created_at, created_at)
+                for user_id in range(start + 1, min(start + chunk_size, users) + 1)
+            ])
+        indexes = list(Task.__table__.indexes)
+        for index in indexes:
+            index.drop(connection)
+        search.suspend_index(connection)
+        db.session.commit()
+
+        chunks = [
+            (number, start + 1, min(chunk_size, tasks - start))
+            for number, start in enumerate(range(0, tasks, chunk_size))
+        ]
+        try:
+            if processes > 1 and len(chunks) > 1 and db.engine.url.database not in (None, '', ':memory:'):
+                _load_in_processes(chunks, processes, seed, users, today, progress)
+            else:
+                for number, first_id, count in chunks:
+                    _insert(db.session.connection(), Task.__tablename__, TASK_COLUMNS,
+                            _task_rows(seed, number, first_id, count, users, today))
+                    db.session.commit()
+                    if progress:
+                        progress(count)
+        finally:
+            # Restore the indexes even if the load failed
+            loaded = utcnow()
+            db.session.rollback()
+            connection = db.session.connection()
+            for index in indexes:
+                index.create(connection)
+            search.rebuild_index(connection)
+            if connection.dialect.name == 'postgresql':
+                for table in (User.__tablename__, Task.__tablename__):
+                    connection.exec_driver_sql(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                    )
+            db.session.commit()
+        TaskService.rebuild_stats()
+        return {
+            'users': users,
+            'tasks': tasks,
+            'insert_seconds': (loaded - started).total_seconds(),
+            'index_seconds': (utcnow() - loaded).total_seconds()
+        }
+
+
+def _load_in_processes(chunks, processes, seed, users, today, progress):
+    load = partial(
+        _load_chunk, db.engine.url.render_as_string(hide_password=False),
+        db.get_app().config.get('SQLITE_PRAGMAS'), seed, users, today
+    )
+    # Spawned processes do not inherit the connections of this one
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        for count in executor.map(load, chunks):
+            if progress:
+                progress(count)
@@ -0,0 +1,135 @@
+"""
+Background job handlers of the Task Management API.
+
+This module implements the job kinds run by JobService: task exports and
+imports, and the admin-wide recomputation of the statistics counters and
+the search index.
+"""
+
+import os
+from flask import current_app
+from ..models.task import db
+from ..utils.task_io import encode_tasks
+from .job_service import JobService, job_handler
+from .task_service import TaskService
+
+# Number of failed import items reported in the job result
+MAX_REPORTED_ERRORS = 100
+
+
+def result_path(job):
+    """
+    Get the path of the file produced by an export job.
+    """
+    name = 'tasks-{}.{}'.format(job.id, job.payload.get('format', 'ndjson'))
+    return os.path.abspath(os.path.join(current_app.config['JOB_EXPORT_DIR'], name))
+
+
+def remove_result_file(job):
+    """
+    Delete the file produced by a job, if any.
+    """
+    if job.kind == 'export_tasks':
+        try:
+            os.remove(result_path(job))
+        except FileNotFoundError:
+            pass
+
+
+@job_handler('export_tasks')
+def export_tasks(job, user):
+    """
+    Write the tasks visible to the user as CSV or NDJSON to JOB_EXPORT_DIR.
+
+    The payload holds the format, and the filters and sort of GET /tasks.
+    Tasks are read in keyset pages of TASKS_STREAM_BATCH_SIZE, and the
+    job's claim is refreshed after each page. The file is written under a
+    temporary name and renamed when complete.
+
+    Returns:
+        dict: Number of exported tasks
+    """
+    path = result_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    batch_size = current_app.config['TASKS_STREAM_BATCH_SIZE']
+    count = 0
+
+    def pages():
+        nonlocal count
+        cursor = None
+        while True:
+            tasks, cursor = TaskService.get_tasks_page(
+                user,
+                batch_size,
+                cursor=cursor,
+                filters=job.payload.get('filters'),
+                sort=job.payload.get('sort', 'id')
+            )
+            count += len(tasks)
+            yield from tasks
+            if cursor is None:
+                return
+            JobService.refresh_lock(job, progress=count)
+            db.session.commit()
+
+    format = job.payload.get('format', 'ndjson')
+    with open(path + '.tmp', 'w', encoding='utf-8', newline='') as output:
+        output.writelines(encode_tasks(pages(), format, current_app.json.dumps))
+    os.replace(path + '.tmp', path)
+    return {'count': count}
+
+
+@job_handler('import_tasks')
+def import_tasks(job, user):
+    """
+    Create the tasks of the payload in chunks of TASKS_BATCH_MAX_ITEMS.
+
+    Each chunk is created in one transaction together with the job's
+    progress, result and refreshed claim, so a retried job resumes after the
+    last imported chunk with its counts, and a reclaimed job is never
+    imported twice.
+
+    Returns:
+        dict: Number of created tasks and the first failed items
+    """
+    items = job.payload['tasks']
+    chunk_size = current_app.config['TASKS_BATCH_MAX_ITEMS']
+    result = {'created': 0, 'failed': 0, **(job.result or {})}
+    result['errors'] = list(result.get('errors', ()))
+    for start in range(job.progress, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        JobService.refresh_lock(job, progress=start + len(chunk))
+        results = TaskService.create_tasks(chunk, user, commit=False)
+        for index, item in enumerate(results, start):
+            if item['status'] == 201:
+                result['created'] += 1
+                continue
+            result['failed'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append({'index': index, **item})
+        job.result = {**result, 'errors': list(result['errors'])}
+        db.session.commit()
+    return result
+
+
+@job_handler('rebuild_stats', admin_only=True)
+def rebuild_stats(job, user):
+    """
+    Recompute the task statistics counters from the tasks table.
+
+    Returns:
+        dict: Number of counters written
+    """
+    return {'counters': TaskService.rebuild_stats()}
+
+
+@job_handler('rebuild_search', admin_only=True)
+def rebuild_search(job, user):
+    """
+    Create the full-text search index if missing and refill it from the tasks.
+
+    Returns:
+        dict: Empty result
+    """
+    TaskService.rebuild_search_index()
+    return {}
@@ -0,0 +1,320 @@
+"""
+Job service module for the Task Management API.
+
+This module queues background jobs in the jobs table and runs them. Job
+kinds are registered with the job_handler decorator; a handler receives the
+claimed Job and the submitting user, and returns the job's JSON result.
+Workers (see job_worker) claim jobs with a compare-and-set UPDATE, so any
+number of threads and processes can share the queue. Handlers refresh the
+claim as they progress, and an attempt only records its outcome while its
+worker still holds the job.
+"""
+
+import logging
+from datetime import timedelta
+from flask import abort, current_app
+from http import HTTPStatus
+from sqlalchemy import func
+from werkzeug.exceptions import HTTPException
+from ..models.job import Job, db
+from ..models.user import User
+from ..utils.timestamps import utcnow
+from .auth_service import CurrentUser
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> (handler, admin only)
+_handlers = {}
+
+
+class JobLockLost(Exception):
+    """
+    Raised when another worker has claimed a job that was still running.
+    """
+
+
+def job_handler(kind, admin_only=False):
+    """
+    Register the function running a kind of job.
+
+    Args:
+        kind (str): Name of the job kind
+        admin_only (bool): Whether only admins may submit the job
+
+    Returns:
+        callable: Decorator registering the handler
+    """
+    def register(fn):
+        _handlers[kind] = (fn, admin_only)
+        return fn
+    return register
+
+
+def _job_user(job):
+    """
+    Load the identity and role of the user who submitted a job.
+    """
+    row = db.session.query(User.id, User.role).filter_by(id=job.user_id).one()
+    return CurrentUser(row.id, row.role)
+
+
+class JobService:
+    """
+    Service class for background job operations.
+
+    Provides methods for submitting jobs, polling them, and claiming and
+    running them in workers.
+    """
+
+    @staticmethod
+    def submit_job(kind, payload, user, total=None):
+        """
+        Queue a job.
+
+        Args:
+            kind (str): Kind of the job, registered with job_handler
+            payload (dict): JSON arguments of the job
+            user (User): The user submitting the job
+            total (int): Number of items the job will process, if known
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            HTTPException: 403 Forbidden if the job requires admin privileges
+        """
+        if _handlers[kind][1] and user.role != 'admin':
+            abort(HTTPStatus.FORBIDDEN, "Admin privileges required")
+
+        job = Job(
+            kind=kind,
+            payload=payload,
+            user_id=user.id,
+            total=total,
+            max_attempts=current_app.config['JOB_MAX_ATTEMPTS']
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        from . import job_worker
+        job_worker.notify(current_app._get_current_object())
+        return job
+
+    @staticmethod
+    def get_job(job_id, user):
+        """
+        Get a job by ID.
+
+        Args:
+            job_id (int): ID of the job
+            user (User): The user making the request
+
+        Returns:
+            Job: The requested Job object
+
+        Raises:
+            HTTPException: 404 Not Found if the job doesn't exist
+            HTTPException: 403 Forbidden if user doesn't have access
+        """
+        job = Job.query.get_or_404(job_id)
+        if user.role != 'admin' and job.user_id != user.id:
+            abort(HTTPStatus.FORBIDDEN, "Access denied")
+        return job
+
+    @staticmethod
+    def claim_job(worker_id):
+        """
+        Claim the next due job for a worker.
+
+        Jobs still marked running after JOB_TIMEOUT seconds belong to a
+        worker that died and are claimed again, or failed once they have
+        used all their attempts.
+
+        Args:
+            worker_id (str): Name of the claiming worker
+
+        Returns:
+            Job: The claimed job, now running, or None if no job is due;
+                its ``claim`` attribute holds the worker and attempt number
+        """
+        now = utcnow()
+        stale = now - timedelta(seconds=current_app.config['JOB_TIMEOUT'])
+        Job.query.filter(
+            Job.status == 'running', Job.locked_at < stale, Job.attempts >= Job.max_attempts
+        ).update(
+            {'status': 'failed', 'error': 'Timed out', 'finished_at': now, 'locked_by': None},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        while True:
+            candidate = (
+                db.session.query(Job.id, Job.attempts)
+                .filter(db.or_(
+                    db.and_(Job.status == 'queued', Job.run_at <= now),
+                    db.and_(Job.status == 'running', Job.locked_at < stale)
+                ))
+                .order_by(Job.run_at, Job.id)
+                .first()
+            )
+            if candidate is None:
+                db.session.rollback()
+                return None
+
+            # Only one worker can move the job past the attempt it read
+            claimed = Job.query.filter(
+                Job.id == candidate.id, Job.attempts == candidate.attempts
+            ).update({
+                'status': 'running',
+                'attempts': Job.attempts + 1,
+                'locked_by': worker_id,
+                'locked_at': now,
+                'started_at': now
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                job = Job.query.get(candidate.id)
+                # Identifies this attempt; the columns are reloaded after each
+                # commit and show another worker's claim once it took the job
+                job.claim = {'locked_by': worker_id, 'attempts': candidate.attempts + 1}
+                return job
+
+    @staticmethod
+    def refresh_lock(job, **values):
+        """
+        Refresh the claim of a running job in the current transaction.
+
+        Handlers call it for each chunk of work, so that a job making
+        progress is not reclaimed as abandoned after JOB_TIMEOUT seconds.
+        The values, such as the progress, are written by the same UPDATE
+        and are committed with the caller's transaction.
+
+        Args:
+            job (Job): The running job
+            **values: Other job columns to update
+
+        Raises:
+            JobLockLost: If another worker has claimed the job meanwhile;
+                the transaction is rolled back
+        """
+        updated = Job.query.filter_by(id=job.id, **job.claim).update(
+            {'locked_at': utcnow(), **values}, synchronize_session='evaluate'
+        )
+        if not updated:
+            db.session.rollback()
+            raise JobLockLost(f'Job {job.id} was claimed by another worker')
+
+    @staticmethod
+    def _finish(job, values):
+        """
+        Record the outcome of a job attempt if its worker still holds the job.
+
+        Returns:
+            bool: False if another worker has claimed the job meanwhile
+        """
+        finished = Job.query.filter_by(id=job.id, **job.claim).update(
+            {'locked_by': None, **values}, synchronize_session=False
+        )
+        db.session.commit()
+        if not finished:
+            logger.warning('Job %s (%s) attempt %s was claimed by another worker, outcome discarded',
+                           job.id, job.kind, job.claim['attempts'])
+        return bool(finished)
+
+    @staticmethod
+    def run_job(job):
+        """
+        Run a claimed job and record its outcome.
+
+        Errors are retried after JOB_RETRY_BACKOFF * 2^(attempt - 1) seconds
+        until max_attempts is reached. HTTP errors raised by the services,
+        such as an invalid filter, fail the job at once. Nothing is recorded
+        if another worker has claimed the job meanwhile.
+
+        Args:
+            job (Job): A job returned by claim_job
+
+        Returns:
+            bool: True if the job succeeded
+        """
+        handler = _handlers[job.kind][0]
+        try:
+            result = handler(job, _job_user(job))
+        except JobLockLost:
+            db.session.rollback()
+            logger.warning('Job %s (%s) attempt %s was claimed by another worker, stopped',
+                           job.id, job.kind, job.claim['attempts'])
+            return False
+        except Exception as e:
+            db.session.rollback()
+            retry = not isinstance(e, HTTPException) and job.attempts < job.max_attempts
+            error = e.description if isinstance(e, HTTPException) else f'{type(e).__name__}: {e}'
+            logger.warning('Job %s (%s) attempt %s failed: %s', job.id, job.kind, job.attempts, error,
+                           exc_info=not isinstance(e, HTTPException))
+            if retry:
+                delay = current_app.config['JOB_RETRY_BACKOFF'] * 2 ** (job.attempts - 1)
+                outcome = {'status': 'queued', 'run_at': utcnow() + timedelta(seconds=delay)}
+            else:
+                outcome = {'status': 'failed', 'finished_at': utcnow()}
+            JobService._finish(job, {'error': error, **outcome})
+            return False
+
+        return JobService._finish(job, {
+            'status': 'succeeded', 'result': result, 'error': None, 'finished_at': utcnow()
+        })
+
+    @staticmethod
+    def get_stats():
+        """
+        Summarize the queue: jobs by status, backlog, and recent throughput.
+
+        Returns:
+            dict: Job counts by status, number of due queued jobs, age of the
+                oldest due job, and jobs finished in the last hour with their
+                average run time in seconds
+        """
+        now = utcnow()
+        by_status = dict(db.session.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        due, oldest = (
+            db.session.query(func.count(Job.id), func.min(Job.run_at))
+            .filter(Job.status == 'queued', Job.run_at <= now)
+            .one()
+        )
+        finished = (
+            db.session.query(Job.started_at, Job.finished_at)
+            .filter(Job.finished_at >= now - timedelta(hours=1))
+            .all()
+        )
+        run_times = [(end - start).total_seconds() for start, end in finished if start]
+        return {
+            'by_status': by_status,
+            'due': due,
+            'oldest_due_seconds': (now - oldest).total_seconds() if oldest else None,
+            'finished_last_hour': len(finished),
+            'average_run_seconds': sum(run_times) / len(run_times) if run_times else None
+        }
+
+    @staticmethod
+    def purge_jobs(older_than):
+        """
+        Delete finished jobs and their export files.
+
+        Args:
+            older_than (timedelta): Minimum age of the jobs to delete
+
+        Returns:
+            int: Number of deleted jobs
+        """
+        jobs = Job.query.filter(
+            Job.status.in_(('succeeded', 'failed')),
+            Job.finished_at < utcnow() - older_than
+        ).all()
+        for job in jobs:
+            job_handlers.remove_result_file(job)
+            db.session.delete(job)
+        db.session.commit()
+        return len(jobs)
+
+
+# Register the job kinds
+from . import job_handlers  # noqa: E402
@@ -0,0 +1,185 @@
+"""
+Background job worker of the Task Management API.
+
+JobWorker runs jobs from the jobs table in a pool of threads. It runs on
+its own with ``flask jobs worker``, or inside each server process, started
+with its first request, when JOB_WORKERS_IN_PROCESS is set.
+Each worker reports its throughput and the share of time its threads spent
+running jobs.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from ..models.job import db
+
+logger = logging.getLogger(__name__)
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+class JobWorker:
+    """
+    Pool of threads claiming and running background jobs.
+    """
+
+    def __init__(self, app, concurrency, poll_interval):
+        """
+        Args:
+            app (Flask): The application whose jobs are run
+            concurrency (int): Number of threads
+            poll_interval (float): Seconds an idle thread waits between polls
+        """
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self._threads = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._started_at = None
+        self._busy_seconds = 0.0
+        self._counts = {'succeeded': 0, 'errors': 0}
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        self._started_at = time.monotonic()
+        for index in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._run, args=(f'{self.name}:{index}',), name=f'job-worker-{index}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """
+        Stop the threads after their current job.
+
+        Args:
+            timeout (float): Seconds to wait for each thread
+        """
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wake(self):
+        """
+        Make idle threads poll for jobs now.
+        """
+        self._wake.set()
+
+    def _run(self, worker_id):
+        from .job_service import JobService
+
+        while not self._stopping.is_set():
+            with self.app.app_context():
+                try:
+                    job = JobService.claim_job(worker_id)
+                    if job is not None:
+                        started = time.monotonic()
+                        succeeded = JobService.run_job(job)
+                        self._record(time.monotonic() - started, succeeded)
+                except Exception:
+                    logger.exception('Job worker %s failed', worker_id)
+                    job = None
+                finally:
+                    db.session.remove()
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _record(self, seconds, succeeded):
+        with self._stats_lock:
+            self._busy_seconds += seconds
+            self._counts['succeeded' if succeeded else 'errors'] += 1
+
+    def get_stats(self):
+        """
+        Get the throughput and utilization of this worker since it started.
+
+        Returns:
+            dict: Thread count, uptime, succeeded jobs, failed attempts
+                (including retried ones), jobs per second and the fraction of
+                thread time spent running jobs
+        """
+        with self._stats_lock:
+            uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+            processed = sum(self._counts.values())
+            return {
+                'name': self.name,
+                'concurrency': self.concurrency,
+                'uptime_seconds': uptime,
+                **self._counts,
+                'jobs_per_second': processed / uptime if uptime else 0.0,
+                'utilization': self._busy_seconds / (uptime * self.concurrency) if uptime else 0.0
+            }
+
+
+def ensure_worker(app):
+    """
+    Start the in-process worker of this process if it is not running.
+
+    Does nothing when JOB_WORKERS_IN_PROCESS is 0. The worker is created once
+    per process, so that each forked server worker runs its own threads.
+
+    Args:
+        app (Flask): The application whose jobs are run
+
+    Returns:
+        JobWorker: The in-process worker, or None if disabled
+    """
+    global _worker, _worker_pid
+    if _worker_pid == os.getpid():
+        return _worker
+    concurrency = app.config['JOB_WORKERS_IN_PROCESS']
+    if concurrency <= 0:
+        return None
+    with _worker_lock:
+        if _worker_pid != os.getpid():
+            _worker = JobWorker(app, concurrency, app.config['JOB_POLL_INTERVAL'])
+            _worker.start()
+            _worker_pid = os.getpid()
+    return _worker
+
+
+def notify(app):
+    """
+    Signal a submitted job to the in-process worker, starting it if needed.
+
+    Args:
+        app (Flask): The application the job was submitted to
+    """
+    worker = ensure_worker(app)
+    if worker is not None:
+        worker.wake()
+
+
+def init_app(app):
+    """
+    Start the in-process worker with the first request of each process, so
+    that jobs queued before a restart are picked up.
+
+    Args:
+        app (Flask): The application to register the hook with
+    """
+    if app.config['JOB_WORKERS_IN_PROCESS'] > 0:
+        @app.before_request
+        def start_job_worker():
+            ensure_worker(app)
+
+
+def get_worker():
+    """
+    Get the in-process worker of this process, or None if it is not running.
+    """
+    if _worker_pid == os.getpid():
+        return _worker
+    return None
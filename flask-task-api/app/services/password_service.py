@@ -0,0 +1,213 @@
+"""
+Password service module for the Task Management API.
+
+This module hashes and verifies passwords with bcrypt. When
+PASSWORD_HASH_WORKERS is set, the work runs in a bounded process pool so that
+a burst of logins cannot pin every request thread on CPU. Operations beyond
+PASSWORD_HASH_MAX_PENDING per process are rejected with PasswordHasherBusy
+instead of being queued. A pool broken by the death of one of its processes
+is replaced and the operation retried once.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULTS = {
+    'BCRYPT_ROUNDS': 12,
+    'PASSWORD_HASH_WORKERS': 0,
+    'PASSWORD_HASH_MAX_PENDING': 16,
+    'PASSWORD_HASH_RETRY_AFTER': 1
+}
+
+_pool = None
+_pool_pid = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when too many password operations are already in progress.
+    """
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing capacity exceeded')
+        self.retry_after = retry_after
+
+
+def _setting(name):
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+def _get_pool(workers, max_pending):
+    """
+    Get the process pool of the current process, creating it on first use.
+
+    The pool is recreated after a fork so that each server worker owns its
+    own hashing processes. They are started by a forkserver process rather
+    than forked from the worker, whose other request threads may hold locks
+    that a forked child would never see released.
+    """
+    global _pool, _pool_pid, _slots
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            _pool = None
+            _slots = threading.BoundedSemaphore(max_pending)
+            _pool_pid = os.getpid()
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('forkserver')
+            )
+        return _pool, _slots
+
+
+def _discard_pool(pool):
+    """
+    Drop a broken pool so that the next operation starts a new one.
+
+    A pool breaks when one of its processes dies, e.g. killed for memory;
+    every later submission to it fails.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _run(fn, *args):
+    """
+    Run a bcrypt operation inline or in the process pool.
+
+    Raises:
+        PasswordHasherBusy: If PASSWORD_HASH_MAX_PENDING operations are
+            already in progress in this process
+    """
+    workers = _setting('PASSWORD_HASH_WORKERS')
+    if workers <= 0:
+        return fn(*args)
+
+    pool, slots = _get_pool(workers, _setting('PASSWORD_HASH_MAX_PENDING'))
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy(_setting('PASSWORD_HASH_RETRY_AFTER'))
+    try:
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            pool, _ = _get_pool(workers, _setting('PASSWORD_HASH_MAX_PENDING'))
+            return pool.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+
+def _hash_in_pool(pool, slots, workers, passwords, rounds):
+    """
+    Hash passwords in the pool, at most one per pool process at a time.
+    """
+    pending = deque()
+    hashes = []
+    for password in passwords:
+        if len(pending) >= workers:
+            hashes.append(pending.popleft().result())
+        slots.acquire()
+        try:
+            future = pool.submit(_hashpw, password.encode('utf-8'), rounds)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        pending.append(future)
+    hashes.extend(future.result() for future in pending)
+    return hashes
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured bcrypt work factor.
+
+    Args:
+        password (str): Plain text password
+
+    Returns:
+        str: bcrypt hash
+    """
+    return _run(_hashpw, password.encode('utf-8'), _setting('BCRYPT_ROUNDS')).decode('utf-8')
+
+
+def hash_passwords(passwords):
+    """
+    Hash several passwords with the configured bcrypt work factor.
+
+    With PASSWORD_HASH_WORKERS set, the passwords are hashed in parallel in
+    the process pool, at most one per pool process at a time, so that the
+    operations of other requests wait for one hash at most. Unlike single
+    operations, they wait for a free slot instead of failing when the pool
+    is saturated.
+
+    Args:
+        passwords (list): Plain text passwords
+
+    Returns:
+        list: bcrypt hashes, in the order of the passwords
+    """
+    rounds = _setting('BCRYPT_ROUNDS')
+    workers = _setting('PASSWORD_HASH_WORKERS')
+    if workers <= 0:
+        return [_hashpw(password.encode('utf-8'), rounds).decode('utf-8') for password in passwords]
+
+    pool, slots = _get_pool(workers, _setting('PASSWORD_HASH_MAX_PENDING'))
+    try:
+        hashes = _hash_in_pool(pool, slots, workers, passwords, rounds)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        pool, slots = _get_pool(workers, _setting('PASSWORD_HASH_MAX_PENDING'))
+        hashes = _hash_in_pool(pool, slots, workers, passwords, rounds)
+    return [password_hash.decode('utf-8') for password_hash in hashes]
+
+
+def verify_password(password, password_hash):
+    """
+    Verify a password against a bcrypt hash.
+
+    Args:
+        password (str): Plain text password
+        password_hash (str): Stored bcrypt hash
+
+    Returns:
+        bool: True if the password matches
+    """
+    return _run(_checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def needs_rehash(password_hash):
+    """
+    Check whether a hash was made with a different work factor than configured.
+
+    Args:
+        password_hash (str): Stored bcrypt hash, e.g. '$2b$12$...'
+
+    Returns:
+        bool: True if the password should be hashed again
+    """
+    try:
+        rounds = int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != _setting('BCRYPT_ROUNDS')
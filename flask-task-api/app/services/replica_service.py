@@ -0,0 +1,162 @@
+"""
+Replica service module for the Task Management API.
+
+This module decides when reads can be served by a read replica. Reads go
+to a healthy replica from READ_REPLICA_BINDS unless the user wrote within
+the last READ_REPLICA_STICKY_SECONDS, in which case they stay on the
+primary so that users always read their own writes.
+
+The stickiness windows are kept in the cache backend, so replicas are only
+used when that backend is shared by every server worker.
+"""
+
+import inspect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from .. import cache, db
+
+logger = logging.getLogger(__name__)
+
+# Bind key -> (healthy, monotonic time of the last check)
+_health = {}
+_health_lock = threading.Lock()
+
+_primary_reads = ContextVar('primary_reads', default=False)
+
+
+def init_app(app):
+    """
+    Enable the configured read replicas if their stickiness can be shared.
+
+    With a per-process cache backend, a worker would not know about writes
+    made through another worker and could send their author to a replica
+    that has not caught up, so every read stays on the primary.
+
+    Args:
+        app (Flask): The application
+    """
+    from .cache_service import SHARED_BACKENDS
+
+    bind_keys = list(app.config['READ_REPLICA_BINDS'])
+    backend = str(app.config['CACHE_TYPE']).rsplit('.', 1)[-1]
+    if bind_keys and backend not in SHARED_BACKENDS:
+        logger.warning('Read replicas disabled: %s cannot share read-your-writes state between workers', backend)
+        bind_keys = []
+    app.extensions['read_replicas'] = bind_keys
+
+
+@contextmanager
+def reading_primary():
+    """
+    Keep the replica-routed reads of this block on the primary.
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+def _sticky_key(user_id):
+    return f'replica:sticky:{user_id}'
+
+
+def record_write(user):
+    """
+    Pin a user's reads to the primary for READ_REPLICA_STICKY_SECONDS.
+
+    Args:
+        user (User): The user that wrote
+    """
+    if not current_app.extensions['read_replicas'] or user is None:
+        return
+    try:
+        cache.set(_sticky_key(user.id), 1, timeout=current_app.config['READ_REPLICA_STICKY_SECONDS'])
+    except Exception:
+        logger.warning('Failed to record write for replica stickiness', exc_info=True)
+
+
+def _is_sticky(user_id):
+    try:
+        return cache.get(_sticky_key(user_id)) is not None
+    except Exception:
+        logger.warning('Replica stickiness unavailable', exc_info=True)
+        return True
+
+
+def _set_health(bind_key, healthy):
+    with _health_lock:
+        previous = _health.get(bind_key)
+        _health[bind_key] = (healthy, time.monotonic())
+    if previous and previous[0] != healthy:
+        logger.warning('Read replica %s is now %s', bind_key, 'healthy' if healthy else 'unhealthy')
+
+
+def _is_healthy(bind_key):
+    """
+    Check a replica, reusing the result for READ_REPLICA_HEALTH_INTERVAL seconds.
+    """
+    state = _health.get(bind_key)
+    if state and time.monotonic() - state[1] < current_app.config['READ_REPLICA_HEALTH_INTERVAL']:
+        return state[0]
+    try:
+        with db.get_engine(current_app, bind=bind_key).connect() as connection:
+            connection.execute(text('SELECT 1'))
+        healthy = True
+    except Exception:
+        logger.warning('Read replica %s health check failed', bind_key, exc_info=True)
+        healthy = False
+    _set_health(bind_key, healthy)
+    return healthy
+
+
+def choose_replica(user):
+    """
+    Choose the replica to read from for a user.
+
+    Args:
+        user (User): The user making the request, or None
+
+    Returns:
+        str: Bind key of a healthy replica, or None to read from the primary
+    """
+    bind_keys = current_app.extensions['read_replicas']
+    if not bind_keys or _primary_reads.get() or (user is not None and _is_sticky(user.id)):
+        return None
+    healthy = [bind_key for bind_key in bind_keys if _is_healthy(bind_key)]
+    return random.choice(healthy) if healthy else None
+
+
+def read_replica(fn):
+    """
+    Decorator running a read-only service function against a read replica.
+
+    The function's ``user`` argument selects the stickiness window. If the
+    replica fails with a connection error, it is marked unhealthy and the
+    call is repeated on the primary.
+    """
+    signature = inspect.signature(fn)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        user = signature.bind(*args, **kwargs).arguments.get('user')
+        bind_key = choose_replica(user)
+        if bind_key is None:
+            return fn(*args, **kwargs)
+        try:
+            with db.reading_from(bind_key):
+                return fn(*args, **kwargs)
+        except (OperationalError, InterfaceError):
+            logger.warning('Read from replica %s failed, using primary', bind_key, exc_info=True)
+            _set_health(bind_key, False)
+            db.session.rollback()
+            return fn(*args, **kwargs)
+    return wrapper
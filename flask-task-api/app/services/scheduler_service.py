@@ -0,0 +1,282 @@
+"""
+Due date scheduler of the Task Management API.
+
+Each tick reports the open tasks that became due soon (within
+SCHEDULER_REMINDER_LEAD seconds) or overdue since the previous tick, and
+sends them to the configured event sinks. Each scan keeps a high-water mark
+of the last (due_date, id) it reported in the scheduler_state table and
+reads only the tasks past it, as a range of the (due_date, status) index,
+so a tick costs the same however many tasks the table holds. A scan starts
+at its first tick: due dates that passed before are not reported, nor are
+tasks created or moved behind the mark.
+
+The scheduler runs with ``flask scheduler run``. Each batch advances the
+mark with a compare-and-set on the version of the scan's state row, so
+with several schedulers the outbox still receives each task once; external
+sinks receive events at least once.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, OperationalError
+from ..models.scheduler_state import SchedulerState
+from ..models.task import Task, db
+from ..utils.timestamps import utcnow
+from .event_sinks import configured_sinks
+
+logger = logging.getLogger(__name__)
+
+# SQLite result code prefixes of a write that lost to another connection;
+# SQLITE_BUSY covers SQLITE_BUSY_SNAPSHOT
+SQLITE_CONFLICTS = ('SQLITE_BUSY', 'SQLITE_LOCKED')
+# SQLSTATE of a PostgreSQL serialization failure
+SERIALIZATION_FAILURE = '40001'
+
+# Scan name -> event type; due_soon scans up to the reminder lead ahead
+SCANS = {
+    'due_soon': 'task.due_soon',
+    'overdue': 'task.overdue',
+}
+
+
+def _lost_race(error):
+    """
+    Check whether a write failed because another scheduler committed first.
+
+    SQLite refuses the write of a transaction whose snapshot is stale
+    (SQLITE_BUSY_SNAPSHOT) or while another connection writes (SQLITE_BUSY,
+    SQLITE_LOCKED); PostgreSQL reports a serialization failure under
+    snapshot isolation. Other errors, such as a dropped connection or a
+    full disk, are not a lost race.
+
+    Args:
+        error (OperationalError): The error raised by the write
+
+    Returns:
+        bool: True if the scan can stop and leave the batch to the winner
+    """
+    name = getattr(error.orig, 'sqlite_errorname', None)
+    if name is not None:
+        return name.startswith(SQLITE_CONFLICTS)
+    return getattr(error.orig, 'pgcode', None) == SERIALIZATION_FAILURE
+
+
+def _event(event_type, row):
+    return {
+        'type': event_type,
+        'task_id': row.id,
+        'user_id': row.user_id,
+        'title': row.title,
+        'status': row.status,
+        'priority': row.priority,
+        'due_date': row.due_date.isoformat()
+    }
+
+
+def _scan(name, upper, sinks, batch_size):
+    """
+    Report the open tasks due after the scan's mark and up to upper.
+
+    Each batch of up to batch_size tasks is recorded as the new mark and
+    sent to the sinks in one transaction. The scan stops without sending
+    the batch if another scheduler advanced the mark meanwhile.
+
+    Args:
+        name (str): Name of the scan in SCANS
+        upper (datetime): Latest due date to report
+        sinks (list): Sinks receiving the events
+        batch_size (int): Tasks per batch
+
+    Returns:
+        int: Number of tasks reported
+    """
+    reported = 0
+    while True:
+        state = db.session.get(SchedulerState, name)
+        if state is None:
+            db.session.add(SchedulerState(name=name, due_mark=upper, version=0, updated_at=utcnow()))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+            return reported
+        due_mark, id_mark, version = state.due_mark, state.id_mark, state.version
+        if due_mark >= upper and id_mark is None:
+            db.session.rollback()
+            return reported
+
+        conditions = [Task.due_date <= upper, Task.status != 'completed']
+        if id_mark is None:
+            conditions.append(Task.due_date > due_mark)
+        else:
+            # Stated as a range on due_date so that the index bounds the scan
+            conditions += [Task.due_date >= due_mark, or_(Task.due_date > due_mark, Task.id > id_mark)]
+        rows = db.session.query(
+            Task.id, Task.user_id, Task.title, Task.status, Task.priority, Task.due_date
+        ).filter(*conditions).order_by(Task.due_date, Task.id).limit(batch_size).all()
+
+        if len(rows) == batch_size:
+            mark = {'due_mark': rows[-1].due_date, 'id_mark': rows[-1].id}
+        else:
+            mark = {'due_mark': upper, 'id_mark': None}
+        # The mark is claimed before the batch is emitted: the claim is the
+        # transaction's first write, so a scheduler that lost the race stops
+        # there, before its outbox INSERT or its webhook call
+        try:
+            advanced = SchedulerState.query.filter_by(name=name, version=version).update(
+                {**mark, 'version': version + 1, 'updated_at': utcnow()}, synchronize_session=False
+            )
+        except OperationalError as e:
+            if not _lost_race(e):
+                db.session.rollback()
+                raise
+            advanced = 0
+        if not advanced:
+            db.session.rollback()
+            logger.info('Scan %s advanced by another scheduler', name)
+            return reported
+        if rows:
+            events = [_event(SCANS[name], row) for row in rows]
+            try:
+                for sink in sinks:
+                    sink.emit(events)
+            except Exception:
+                # The mark is not advanced; the batch is scanned again by the next tick
+                db.session.rollback()
+                raise
+        db.session.commit()
+        reported += len(rows)
+        if len(rows) < batch_size:
+            return reported
+
+
+class SchedulerService:
+    """
+    Service class for the due date scans.
+    """
+
+    @staticmethod
+    def tick(now=None, sinks=None):
+        """
+        Run each scan once.
+
+        Args:
+            now (datetime): Current time in UTC; defaults to the clock
+            sinks (list): Sinks receiving the events; defaults to the sinks
+                named in SCHEDULER_SINKS
+
+        Returns:
+            dict: Number of tasks reported by each scan
+        """
+        config = current_app.config
+        now = now or utcnow()
+        sinks = configured_sinks() if sinks is None else sinks
+        bounds = {
+            'due_soon': now + timedelta(seconds=config['SCHEDULER_REMINDER_LEAD']),
+            'overdue': now,
+        }
+        return {
+            name: _scan(name, bounds[name], sinks, config['SCHEDULER_BATCH_SIZE'])
+            for name in SCANS
+        }
+
+    @staticmethod
+    def get_state():
+        """
+        Get the high-water marks of the scans.
+
+        Returns:
+            dict: Scan name -> due date and task ID of the mark and the time
+                it last advanced, or None for scans that have not run
+        """
+        states = {state.name: state for state in SchedulerState.query.filter(SchedulerState.name.in_(SCANS))}
+        return {
+            name: {
+                'due_mark': states[name].due_mark.isoformat(),
+                'id_mark': states[name].id_mark,
+                'updated_at': states[name].updated_at.isoformat()
+            } if name in states else None
+            for name in SCANS
+        }
+
+
+class TaskScheduler:
+    """
+    Thread running a scheduler tick every interval.
+    """
+
+    def __init__(self, app, interval):
+        """
+        Args:
+            app (Flask): The application whose tasks are scanned
+            interval (float): Seconds between the starts of two ticks
+        """
+        self.app = app
+        self.interval = interval
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self._thread = None
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'ticks': 0, 'errors': 0, 'reported': 0, 'last_tick_ms': None}
+
+    def start(self):
+        """
+        Start the scheduler thread.
+        """
+        self._thread = threading.Thread(target=self._run, name='task-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the thread after its current tick.
+
+        Args:
+            timeout (float): Seconds to wait for the thread
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        with self.app.app_context():
+            sinks = configured_sinks()
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            with self.app.app_context():
+                try:
+                    reported = SchedulerService.tick(sinks=sinks)
+                    self._record(time.monotonic() - started, sum(reported.values()))
+                    if any(reported.values()):
+                        logger.info('Scheduler tick reported %s', reported, extra={'reported': reported})
+                except Exception:
+                    logger.exception('Scheduler tick failed')
+                    self._record(time.monotonic() - started, None)
+                finally:
+                    db.session.remove()
+            self._stopping.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def _record(self, seconds, reported):
+        with self._stats_lock:
+            self._stats['ticks'] += 1
+            self._stats['last_tick_ms'] = seconds * 1000
+            if reported is None:
+                self._stats['errors'] += 1
+            else:
+                self._stats['reported'] += reported
+
+    def get_stats(self):
+        """
+        Get the tick counters of this scheduler since it started.
+
+        Returns:
+            dict: Ticks, failed ticks, reported tasks and the duration of
+                the last tick in milliseconds
+        """
+        with self._stats_lock:
+            return {'name': self.name, 'interval': self.interval, **self._stats}
@@ -5,15 +5,448 @@ This module provides business logic and helper functions for task management ope
 """
 
 from ..models.task import Task, db
+from ..models.task_change import TaskChange
+from ..models.task_event import TaskEvent
+from ..models.task_stat import TaskStat
 from ..models.user import User
-from flask import abort
+from ..utils.conditional import task_etag
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils import search
+from ..utils.bulk import insert_rows, item_error
+from ..utils.task_io import InvalidRecord
+from . import cache_service, replica_service
+from ..utils.timestamps import utcnow
+from .replica_service import read_replica
+from collections import Counter
+from itertools import chain
+from datetime import datetime, timezone
+from flask import abort, current_app
 from http import HTTPStatus
+from sqlalchemy import and_, column, event, func, literal_column, or_, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+SORTABLE_FIELDS = ('id', 'created_at', 'updated_at', 'due_date')
+UPDATABLE_FIELDS = ('title', 'description', 'status', 'priority', 'due_date')
+STATUSES = ('pending', 'in_progress', 'completed')
+PRIORITIES = ('low', 'medium', 'high')
+# Task columns sent with change events
+EVENT_FIELDS = UPDATABLE_FIELDS + ('created_at', 'updated_at')
+# INSERT constructs supporting ON CONFLICT DO UPDATE, by dialect
+UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
 
 def user_can_access_task(user, task):
     if user.role == 'admin':
         return True
     return task.user_id == user.id
 
+
+def _parse_datetime(value, name):
+    """
+    Parse an ISO 8601 query parameter into a naive UTC datetime.
+
+    Raises:
+        HTTPException: 400 Bad Request if the value is not a valid datetime
+    """
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST, f"{name} must be an ISO 8601 datetime")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_due_date(value):
+    """
+    Convert a due_date string from a request body into a datetime.
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 datetime
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _choice_error(data):
+    """
+    Check the status and priority of task data against the allowed values.
+
+    Returns:
+        str: Error message, or None if the values are allowed or absent
+    """
+    for name, choices in (('status', STATUSES), ('priority', PRIORITIES)):
+        if name in data and data[name] not in choices:
+            return f"{name} must be one of {', '.join(choices)}"
+    return None
+
+
+def _task_states(task_ids):
+    """
+    Fetch the owner, status and priority of each existing task among
+    task_ids with one IN query.
+
+    Returns:
+        dict: Mapping of task ID to a (user_id, status, priority) tuple
+    """
+    ids = {task_id for task_id in task_ids if isinstance(task_id, int)}
+    if not ids:
+        return {}
+    rows = db.session.query(Task.id, Task.user_id, Task.status, Task.priority).filter(Task.id.in_(ids))
+    return {row.id: (row.user_id, row.status, row.priority) for row in rows}
+
+
+def _access_error(task_id, states, user):
+    """
+    Check that a batch item refers to a task the user may modify.
+
+    Returns:
+        dict: Result entry describing the error, or None if access is allowed
+    """
+    if not isinstance(task_id, int):
+        return item_error(HTTPStatus.BAD_REQUEST, "id must be an integer")
+    if task_id not in states:
+        return item_error(HTTPStatus.NOT_FOUND, "Task not found", id=task_id)
+    if user.role != 'admin' and states[task_id][0] != user.id:
+        return item_error(HTTPStatus.FORBIDDEN, "Access denied", id=task_id)
+    return None
+
+
+def _after_write(user, owner_ids):
+    """
+    Apply the effects of a committed task write outside the transaction.
+
+    Args:
+        user (User): The user who made the write
+        owner_ids (iterable): IDs of the owners of the written tasks
+    """
+    cache_service.invalidate(owner_ids)
+    replica_service.record_write(user)
+    current_app.extensions['event_notifier'].wake()
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_task_writes(session):
+    # Writes left to the caller's transaction, see TaskService.create_tasks
+    for user, owner_ids in session.info.pop('task_writes', ()):
+        _after_write(user, owner_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_task_writes(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop('task_writes', None)
+
+
+def _record_changes(event_type, changes):
+    """
+    Record changes of tasks in the change log and the event outbox.
+
+    Runs in the caller's transaction, so the log and the events are
+    committed or rolled back together with the write. Previous change rows
+    of the tasks are replaced so that each task keeps only its most recent
+    change; events are appended to task_events for the event stream.
+
+    Args:
+        event_type (str): 'task.created', 'task.updated' or 'task.deleted'
+        changes (iterable): (task_id, user_id, fields) tuples of the changed
+            tasks, where fields maps the written columns to their new values
+    """
+    changes = {task_id: (user_id, fields) for task_id, user_id, fields in changes}
+    if not changes:
+        return
+    TaskChange.query.filter(TaskChange.task_id.in_(changes)).delete(synchronize_session=False)
+    operation = 'delete' if event_type == 'task.deleted' else 'upsert'
+    now = utcnow()
+    db.session.execute(TaskChange.__table__.insert(), [
+        {'task_id': task_id, 'user_id': user_id, 'operation': operation, 'changed_at': now}
+        for task_id, (user_id, fields) in changes.items()
+    ])
+    db.session.execute(TaskEvent.__table__.insert(), [
+        {
+            'type': event_type,
+            'task_id': task_id,
+            'user_id': user_id,
+            'payload': {'type': event_type, 'task_id': task_id, 'user_id': user_id, **_event_fields(fields)},
+            'created_at': now
+        }
+        for task_id, (user_id, fields) in changes.items()
+    ])
+
+
+def _event_fields(values):
+    """
+    Serialize written task columns for an event payload.
+
+    Args:
+        values (dict): Column name -> value
+
+    Returns:
+        dict: The task columns among values, with datetimes in ISO 8601
+    """
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items() if key in EVENT_FIELDS
+    }
+
+
+def _task_conditions(user, filters=None):
+    """
+    Build the conditions selecting the tasks visible to a user.
+
+    Args:
+        user (User): The user to scope the tasks to
+        filters (dict): Optional filter values as received in the query
+            string: status, priority, due_before, due_after, updated_since
+
+    Returns:
+        list: SQL conditions, restricted to the user's tasks unless admin
+
+    Raises:
+        HTTPException: 400 Bad Request if a filter value is invalid
+    """
+    conditions = []
+    if user.role != 'admin':
+        conditions.append(Task.user_id == user.id)
+    if not filters:
+        return conditions
+
+    for field in ('status', 'priority'):
+        if filters.get(field):
+            values = [value for value in filters[field].split(',') if value]
+            conditions.append(getattr(Task, field).in_(values))
+    if filters.get('due_before'):
+        conditions.append(Task.due_date < _parse_datetime(filters['due_before'], 'due_before'))
+    if filters.get('due_after'):
+        conditions.append(Task.due_date > _parse_datetime(filters['due_after'], 'due_after'))
+    if filters.get('updated_since'):
+        conditions.append(Task.updated_at >= _parse_datetime(filters['updated_since'], 'updated_since'))
+    return conditions
+
+
+def _stat_deltas(removed=(), added=()):
+    """
+    Count the changes to the statistics counters caused by a task write.
+
+    Args:
+        removed (iterable): (user_id, status, priority) of tasks before the
+            write, for updated and deleted tasks
+        added (iterable): (user_id, status, priority) of tasks after the
+            write, for created and updated tasks
+
+    Returns:
+        Counter: Count changes keyed by (user_id, status, priority)
+    """
+    deltas = Counter()
+    for key in removed:
+        deltas[key] -= 1
+    for key in added:
+        deltas[key] += 1
+    return deltas
+
+
+def _stat_key_order(item):
+    return tuple(map(str, item[0]))
+
+
+def _adjust_stats(deltas):
+    """
+    Apply count changes to the task statistics counters.
+
+    Runs in the caller's transaction, like _record_changes, so the counters
+    always match the committed tasks. On PostgreSQL and SQLite all counters
+    are upserted with one INSERT ... ON CONFLICT statement, so two
+    transactions creating the same missing counter both succeed.
+
+    Args:
+        deltas (Counter): Count changes keyed by (user_id, status, priority)
+    """
+    table = TaskStat.__table__
+    # Counters are written in key order so that concurrent writers can't
+    # deadlock; keys compare as strings, whatever the types of their values
+    rows = [
+        {'user_id': user_id, 'status': status, 'priority': priority, 'count': delta}
+        for (user_id, status, priority), delta in sorted(deltas.items(), key=_stat_key_order) if delta
+    ]
+    if not rows:
+        return
+    upsert = UPSERTS.get(db.engine.dialect.name)
+    if upsert is not None:
+        statement = upsert(table).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.status, table.c.priority],
+            set_={'count': table.c.count + statement.excluded.count}
+        ))
+        return
+    for row in rows:
+        key = and_(table.c.user_id == row['user_id'], table.c.status == row['status'],
+                   table.c.priority == row['priority'])
+        result = db.session.execute(table.update().where(key).values(count=table.c.count + row['count']))
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(**row))
+
+
+def _stats_summary(rows):
+    """
+    Fold (status, priority, count) rows into totals per status and priority.
+
+    Returns:
+        dict: Total count and counts by status and by priority
+    """
+    by_status = {}
+    by_priority = {}
+    total = 0
+    for status, priority, count in rows:
+        total += count
+        by_status[status] = by_status.get(status, 0) + count
+        by_priority[priority] = by_priority.get(priority, 0) + count
+    return {'total': total, 'by_status': by_status, 'by_priority': by_priority}
+
+
+def _overdue_conditions():
+    """
+    Build the conditions selecting tasks that are past due and not completed.
+    """
+    return [Task.due_date < utcnow(), Task.status != 'completed']
+
+
+def _overdue_query():
+    """
+    Build the query counting tasks that are past due and not completed.
+    """
+    return db.session.query(func.count(Task.id)).filter(*_overdue_conditions())
+
+
+def _iter_rows(query, bind_key):
+    """
+    Iterate over the rows of a query, on the given read replica if any.
+    """
+    if bind_key is None:
+        yield from query
+        return
+    with db.reading_from(bind_key):
+        yield from query
+
+
+def _parse_sort(sort):
+    """
+    Split a sort parameter such as '-due_date' into field and direction.
+
+    Raises:
+        HTTPException: 400 Bad Request if the field is not sortable
+    """
+    descending = sort.startswith('-')
+    field = sort.lstrip('-')
+    if field not in SORTABLE_FIELDS:
+        abort(HTTPStatus.BAD_REQUEST, f"sort must be one of: {', '.join(SORTABLE_FIELDS)}")
+    return field, descending
+
+
+def _sort_order(column, descending):
+    """
+    Build the ORDER BY clause for a sort column with the task ID as tie-breaker.
+
+    NULLs of nullable columns sort first in ascending order and last in
+    descending order, on every database.
+    """
+    if column is Task.id:
+        return (Task.id.desc() if descending else Task.id,)
+    if descending:
+        order = column.desc().nullslast() if column.nullable else column.desc()
+        return order, Task.id.desc()
+    order = column.asc().nullsfirst() if column.nullable else column.asc()
+    return order, Task.id.asc()
+
+
+def _keyset_condition(column, descending, value, last_id):
+    """
+    Build the condition selecting rows after (value, last_id) in sort order.
+    """
+    after_id = Task.id < last_id if descending else Task.id > last_id
+    if column is Task.id:
+        return after_id
+    if value is None:
+        if descending:
+            return and_(column.is_(None), after_id)
+        return or_(column.isnot(None), and_(column.is_(None), after_id))
+
+    beyond = column < value if descending else column > value
+    condition = or_(beyond, and_(column == value, after_id))
+    if descending and column.nullable:
+        condition = or_(condition, column.is_(None))
+    return condition
+
+
+def _encode_task_cursor(task, field):
+    """
+    Encode the keyset position of a task for the given sort field.
+    """
+    if field == 'id':
+        return encode_cursor([task.id])
+    value = getattr(task, field)
+    return encode_cursor([field, value.isoformat() if value else None, task.id])
+
+
+def _decode_task_cursor(cursor, field):
+    """
+    Decode a cursor into the sort value and task ID it points after.
+
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed or was
+            issued for a different sort field
+    """
+    try:
+        values = decode_cursor(cursor)
+        if field == 'id':
+            (last_id,) = values
+            value = None
+        else:
+            cursor_field, value, last_id = values
+            if cursor_field != field:
+                raise ValueError('Cursor sort field mismatch')
+            if value is not None:
+                value = datetime.fromisoformat(value)
+        if not isinstance(last_id, int):
+            raise ValueError('Invalid cursor')
+    except (TypeError, ValueError):
+        abort(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return value, last_id
+
+
+def _decode_change_cursor(cursor):
+    """
+    Decode a sync cursor into the last change sequence number it covers.
+
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed
+    """
+    try:
+        (last_seq,) = decode_cursor(cursor)
+        if not isinstance(last_seq, int):
+            raise ValueError('Invalid cursor')
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return last_seq
+
+
+def _decode_offset_cursor(cursor):
+    """
+    Decode a cursor holding the offset of the next page of search results.
+
+    Raises:
+        HTTPException: 400 Bad Request if the cursor is malformed
+    """
+    try:
+        (offset,) = decode_cursor(cursor)
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('Invalid cursor')
+    except (TypeError, ValueError):
+        abort(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return offset
+
+
 class TaskService:
     """
     Service class for task management operations.
@@ -22,21 +455,227 @@ class TaskService:
     """
     
     @staticmethod
-    def get_all_tasks(user):
+    def _tasks_query(user, filters=None):
         """
-        Get all tasks for a given user.
+        Build the base query of tasks visible to a user.
+
+        Args:
+            user (User): The user to scope the query to
+            filters (dict): Optional filters, see _task_conditions
+
+        Returns:
+            Query: Task query filtered to the user's tasks unless admin
+
+        Raises:
+            HTTPException: 400 Bad Request if a filter value is invalid
+        """
+        return Task.query.filter(*_task_conditions(user, filters))
+
+    @staticmethod
+    @read_replica
+    def get_tasks_page(user, limit, cursor=None, filters=None, sort='id'):
+        """
+        Get one page of tasks using keyset pagination.
+
+        Tasks are ordered by the sort field with the task ID as a tie-breaker,
+        so pages stay stable while tasks are created or deleted.
+
+        Args:
+            user (User): The user to get tasks for
+            limit (int): Maximum number of tasks to return
+            cursor (str): Opaque cursor returned with the previous page
+            filters (dict): Optional filters, see _tasks_query
+            sort (str): Sort field, prefixed with '-' for descending order
+
+        Returns:
+            tuple: List of task rows (see Task.row_to_dict) and the cursor of
+                the next page, or None if this is the last page
+
+        Raises:
+            HTTPException: 400 Bad Request if the cursor, sort or filters are invalid
+        """
+        field, descending = _parse_sort(sort)
+        column = getattr(Task, field)
+        query = TaskService._tasks_query(user, filters).with_entities(*Task.__table__.columns)
+        if cursor:
+            value, last_id = _decode_task_cursor(cursor, field)
+            query = query.filter(_keyset_condition(column, descending, value, last_id))
+
+        tasks = query.order_by(*_sort_order(column, descending)).limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = _encode_task_cursor(tasks[-1], field)
+        return tasks, next_cursor
+
+    @staticmethod
+    def iter_tasks(user, batch_size, filters=None, sort='id'):
+        """
+        Iterate over all tasks visible to a user without loading them at once.
 
         Args:
             user (User): The user to get tasks for
+            batch_size (int): Number of rows fetched from the database per batch
+            filters (dict): Optional filters, see _tasks_query
+            sort (str): Sort field, prefixed with '-' for descending order
 
         Returns:
-            list: List of Task objects
+            iterator: Task rows (see Task.row_to_dict), fetched in batches of
+                batch_size with a server-side cursor where the database
+                supports one, from a read replica when one is available
+
+        Raises:
+            HTTPException: 400 Bad Request if a filter or the sort is
+                invalid, before any row is fetched
         """
-        if user.role == 'admin':
-            return Task.query.all()
-        return Task.query.filter_by(user_id=user.id).all()
+        field, descending = _parse_sort(sort)
+        query = TaskService._tasks_query(user, filters).with_entities(*Task.__table__.columns)
+        query = query.order_by(*_sort_order(getattr(Task, field), descending)).yield_per(batch_size)
+        return _iter_rows(query, replica_service.choose_replica(user))
 
     @staticmethod
+    def _search_query(user, words, query):
+        """
+        Build the ranked full-text search query of a user's tasks.
+
+        SQLite matches against the tasks_fts index with the user's owner token
+        in the MATCH expression; PostgreSQL matches the GIN-indexed tsvector.
+        Other databases fall back to the unranked LIKE scan of _like_query.
+
+        Args:
+            user (User): The user to scope the search to
+            words (list): Words of the search text
+            query (str): Search text as typed by the user
+
+        Returns:
+            Query: Query of task rows, best matches first
+        """
+        columns = Task.__table__.columns
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            owner_id = None if user.role == 'admin' else user.id
+            fts = table(search.FTS_TABLE, column('rowid'))
+            return (
+                db.session.query(*columns)
+                .select_from(fts)
+                .join(Task.__table__, Task.id == fts.c.rowid)
+                .filter(literal_column(search.FTS_TABLE).op('MATCH')(search.match_expression(query, owner_id)))
+                .order_by(text(search.SQLITE_RANK), Task.id)
+            )
+        if dialect == 'postgresql':
+            document = literal_column(search.POSTGRES_DOCUMENT)
+            tsquery = func.to_tsquery('english', search.tsquery_expression(query))
+            return (
+                TaskService._tasks_query(user).with_entities(*columns)
+                .filter(document.op('@@')(tsquery))
+                .order_by(func.ts_rank(document, tsquery).desc(), Task.id)
+            )
+        return TaskService._like_query(user, words)
+
+    @staticmethod
+    def _like_query(user, words):
+        """
+        Build a query matching every word anywhere in title or description.
+
+        Scans all of the user's tasks; used where no full-text index exists.
+        """
+        query = TaskService._tasks_query(user).with_entities(*Task.__table__.columns)
+        for word in words:
+            pattern = f'%{word}%'
+            query = query.filter(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+        return query.order_by(Task.id)
+
+    @staticmethod
+    @read_replica
+    def search_tasks(user, query, limit, cursor=None):
+        """
+        Search the tasks visible to a user by title and description.
+
+        Args:
+            user (User): The user making the request
+            query (str): Search text; every word must match and the last one
+                may be a prefix
+            limit (int): Maximum number of tasks to return
+            cursor (str): Opaque cursor returned with the previous page
+
+        Returns:
+            tuple: List of task rows (see Task.row_to_dict), best matches
+                first, and the cursor of the next page or None
+
+        Raises:
+            HTTPException: 400 Bad Request if the query has no words or the
+                cursor is invalid
+        """
+        words = search.search_words(query or '')
+        if not words:
+            abort(HTTPStatus.BAD_REQUEST, "q must contain at least one word")
+        offset = _decode_offset_cursor(cursor) if cursor else 0
+
+        tasks = TaskService._search_query(user, words, query).offset(offset).limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor([offset + limit])
+        return tasks, next_cursor
+
+    @staticmethod
+    def rebuild_search_index():
+        """
+        Create the full-text index if missing and refill it from the tasks.
+
+        Used to index an existing database after upgrading.
+        """
+        search.rebuild_index(db.session.connection())
+        db.session.commit()
+
+    @staticmethod
+    @read_replica
+    def get_changes(user, since, limit):
+        """
+        Get the tasks changed after a sync cursor.
+
+        Without a cursor only the current cursor is returned: clients take it
+        before a full listing and then sync forward from it.
+
+        Args:
+            user (User): The user to get changes for
+            since (str): Opaque cursor returned by a previous call, or None
+            limit (int): Maximum number of changes to return
+
+        Returns:
+            dict: Changed tasks, IDs of deleted tasks, the cursor to use next
+                and whether more changes are pending
+
+        Raises:
+            HTTPException: 400 Bad Request if the cursor is invalid
+        """
+        query = db.session.query(TaskChange)
+        if user.role != 'admin':
+            query = query.filter(TaskChange.user_id == user.id)
+
+        if since is None:
+            last_seq = query.with_entities(func.max(TaskChange.seq)).scalar() or 0
+            return {'tasks': [], 'deleted': [], 'cursor': encode_cursor([last_seq]), 'has_more': False}
+
+        last_seq = _decode_change_cursor(since)
+        rows = (
+            query.add_entity(Task)
+            .outerjoin(Task, Task.id == TaskChange.task_id)
+            .filter(TaskChange.seq > last_seq)
+            .order_by(TaskChange.seq)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tasks = [task.to_dict() for change, task in rows if change.operation == 'upsert' and task]
+        deleted = [change.task_id for change, task in rows if change.operation == 'delete']
+        if rows:
+            last_seq = rows[-1][0].seq
+        return {'tasks': tasks, 'deleted': deleted, 'cursor': encode_cursor([last_seq]), 'has_more': has_more}
+
+    @staticmethod
+    @read_replica
     def get_task_by_id(task_id, user):
         """
         Get a specific task by ID.
@@ -57,6 +696,126 @@ class TaskService:
             abort(HTTPStatus.FORBIDDEN, "Access denied")
         return task
 
+    @staticmethod
+    @read_replica
+    def get_task_version(task_id, user):
+        """
+        Get the last modification time of a task without loading it.
+
+        Args:
+            task_id (int): ID of the task
+            user (User): The user making the request
+
+        Returns:
+            datetime: The task's updated_at
+
+        Raises:
+            HTTPException: 404 Not Found if task doesn't exist
+            HTTPException: 403 Forbidden if user doesn't have access
+        """
+        row = db.session.query(Task.user_id, Task.updated_at).filter_by(id=task_id).first()
+        if row is None:
+            abort(HTTPStatus.NOT_FOUND)
+        if not user_can_access_task(user, row):
+            abort(HTTPStatus.FORBIDDEN, "Access denied")
+        return row.updated_at
+
+    @staticmethod
+    @read_replica
+    def get_tasks_version(user, filters=None):
+        """
+        Summarize the tasks visible to a user with one aggregate query.
+
+        The latest updated_at together with the row count changes whenever a
+        matching task is created, updated or deleted.
+
+        Args:
+            user (User): The user to get tasks for
+            filters (dict): Optional filters, see _tasks_query
+
+        Returns:
+            tuple: Latest updated_at (None if there are no tasks) and count
+        """
+        query = TaskService._tasks_query(user, filters)
+        return tuple(query.with_entities(func.max(Task.updated_at), func.count(Task.id)).one())
+
+    @staticmethod
+    @read_replica
+    def get_stats(user):
+        """
+        Count the tasks of a user by status and priority, and the overdue ones.
+
+        Args:
+            user (User): The user to get statistics for
+
+        Returns:
+            dict: Total count, counts by status and by priority, and the
+                number of overdue tasks
+        """
+        rows = (
+            db.session.query(Task.status, Task.priority, func.count(Task.id))
+            .filter(Task.user_id == user.id)
+            .group_by(Task.status, Task.priority)
+            .all()
+        )
+        stats = _stats_summary(rows)
+        stats['overdue'] = _overdue_query().filter(Task.user_id == user.id).scalar()
+        return stats
+
+    @staticmethod
+    @read_replica
+    def get_global_stats():
+        """
+        Count all tasks by status and priority, overall and per user.
+
+        The counts are read from the task_stats counters, so their cost does
+        not depend on the number of tasks. The overdue count uses the
+        (due_date, status) index.
+
+        Returns:
+            dict: Overall counts as returned by get_stats, and the counts of
+                each user in 'users'
+        """
+        rows = (
+            db.session.query(TaskStat.user_id, TaskStat.status, TaskStat.priority, TaskStat.count)
+            .filter(TaskStat.count != 0)
+            .order_by(TaskStat.user_id)
+            .all()
+        )
+        per_user = {}
+        for row in rows:
+            per_user.setdefault(row.user_id, []).append((row.status, row.priority, row.count))
+
+        stats = _stats_summary((row.status, row.priority, row.count) for row in rows)
+        stats['overdue'] = _overdue_query().scalar()
+        stats['users'] = [
+            {'user_id': user_id, **_stats_summary(user_rows)}
+            for user_id, user_rows in per_user.items()
+        ]
+        return stats
+
+    @staticmethod
+    def rebuild_stats():
+        """
+        Recompute the task_stats counters from the tasks table.
+
+        Used to initialize the counters of an existing database or to repair
+        them after tasks were changed outside TaskService.
+
+        Returns:
+            int: Number of counter rows written
+        """
+        table = TaskStat.__table__
+        counts = db.session.query(
+            Task.user_id, Task.status, Task.priority, func.count(Task.id)
+        ).group_by(Task.user_id, Task.status, Task.priority)
+        db.session.execute(table.delete())
+        result = db.session.execute(table.insert().from_select(
+            ['user_id', 'status', 'priority', 'count'], counts.statement
+        ))
+        db.session.commit()
+        return result.rowcount
+
     @staticmethod
     def create_task(data, user):
         """
@@ -68,52 +827,99 @@ class TaskService:
 
         Returns:
             Task: The newly created Task object
+
+        Raises:
+            HTTPException: 400 Bad Request if the status or priority is not allowed
         """
-        from datetime import datetime
-        
+        error = _choice_error(data)
+        if error:
+            abort(HTTPStatus.BAD_REQUEST, error)
+
         # Convert due_date string to datetime object if it exists
-        due_date = data.get('due_date')
-        if due_date:
-            due_date = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-        
+        due_date = _parse_due_date(data.get('due_date'))
+
         task = Task(
             title=data['title'],
             description=data.get('description'),
             status=data.get('status', 'pending'),
             due_date=due_date,
-            priority=data.get('priority', 1),
+            priority=data.get('priority', 'medium'),
             user_id=user.id
         )
         db.session.add(task)
+        db.session.flush()
+        _record_changes('task.created', [(task.id, task.user_id, task.to_dict())])
+        _adjust_stats(_stat_deltas(added=[(task.user_id, task.status, task.priority)]))
         db.session.commit()
+        _after_write(user, [task.user_id])
         return task
 
     @staticmethod
-    def update_task(task_id, data, user):
+    def update_task(task_id, data, user, if_match=None):
         """
         Update an existing task.
 
+        Only the fields in UPDATABLE_FIELDS are applied; if data has none of
+        them, the task is returned unchanged.
+
         Args:
             task_id (int): ID of the task to update
             data (dict): Task data containing fields to update
             user (User): The user making the request
+            if_match (ETags): Entity tags from an If-Match header; the update
+                is only applied if the task's current ETag is among them
 
         Returns:
             Task: The updated Task object
 
         Raises:
+            HTTPException: 400 Bad Request if a field value is invalid
             HTTPException: 404 Not Found if task doesn't exist
             HTTPException: 403 Forbidden if user doesn't have access
+            HTTPException: 412 Precondition Failed if the task was modified
         """
+        error = _choice_error(data)
+        if error:
+            abort(HTTPStatus.BAD_REQUEST, error)
         task = Task.query.get_or_404(task_id)
         if not user_can_access_task(user, task):
             abort(HTTPStatus.FORBIDDEN, "Access denied")
-        
-        for key, value in data.items():
-            if hasattr(task, key):
+        if if_match and not if_match.contains(task_etag(task.id, task.updated_at)):
+            abort(HTTPStatus.PRECONDITION_FAILED, "Task has been modified")
+
+        changes = {key: data[key] for key in UPDATABLE_FIELDS if key in data}
+        if not changes:
+            return task
+        if 'due_date' in changes:
+            try:
+                changes['due_date'] = _parse_due_date(changes['due_date'])
+            except (AttributeError, ValueError):
+                abort(HTTPStatus.BAD_REQUEST, "Invalid due_date")
+        if not changes.get('title', True):
+            abort(HTTPStatus.BAD_REQUEST, "title is required")
+
+        owner_id = task.user_id
+        before = (task.user_id, task.status, task.priority)
+        if if_match:
+            # Write only if no other update committed since the task was read
+            changes['updated_at'] = utcnow()
+            updated = Task.query.filter_by(id=task.id, updated_at=task.updated_at).update(
+                changes, synchronize_session='evaluate'
+            )
+            if not updated:
+                db.session.rollback()
+                abort(HTTPStatus.PRECONDITION_FAILED, "Task has been modified")
+        else:
+            for key, value in changes.items():
                 setattr(task, key, value)
-        
+
+        db.session.flush()
+        _record_changes('task.updated', [(task.id, task.user_id, task.to_dict())])
+        _adjust_stats(_stat_deltas(
+            removed=[before], added=[(task.user_id, task.status, task.priority)]
+        ))
         db.session.commit()
+        _after_write(user, [owner_id, task.user_id])
         return task
 
     @staticmethod
@@ -134,5 +940,220 @@ class TaskService:
             abort(HTTPStatus.FORBIDDEN, "Access denied")
         
         db.session.delete(task)
+        _record_changes('task.deleted', [(task.id, task.user_id, {})])
+        _adjust_stats(_stat_deltas(removed=[(task.user_id, task.status, task.priority)]))
         db.session.commit()
+        _after_write(user, [task.user_id])
         return True
+
+    @staticmethod
+    def create_tasks(items, user, commit=True):
+        """
+        Create several tasks in a single transaction.
+
+        Invalid items are reported individually and do not prevent the
+        valid ones from being created.
+
+        Args:
+            items (list): Task data dictionaries, as accepted by create_task
+            user (User): The user creating the tasks
+            commit (bool): Whether to commit; if False the tasks are written
+                in the caller's transaction, and caches are invalidated when
+                the caller commits it
+
+        Returns:
+            list: One result per item, in order, with the HTTP status of the
+                item and the ID of the created task or an error message
+        """
+        results = [None] * len(items)
+        mappings = []
+        positions = []
+        now = utcnow()
+        for index, data in enumerate(items):
+            if not isinstance(data, dict) or not data.get('title'):
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, "title is required")
+                continue
+            error = _choice_error(data)
+            if error:
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, error)
+                continue
+            try:
+                due_date = _parse_due_date(data.get('due_date'))
+            except (AttributeError, ValueError):
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, "Invalid due_date")
+                continue
+            mappings.append({
+                'title': data['title'],
+                'description': data.get('description'),
+                'status': data.get('status', 'pending'),
+                'priority': data.get('priority', 'medium'),
+                'due_date': due_date,
+                'created_at': now,
+                'updated_at': now,
+                'user_id': user.id
+            })
+            positions.append(index)
+
+        if mappings:
+            insert_rows(Task.__table__, mappings)
+            _record_changes('task.created', [(mapping['id'], user.id, mapping) for mapping in mappings])
+            _adjust_stats(_stat_deltas(
+                added=[(user.id, mapping['status'], mapping['priority']) for mapping in mappings]
+            ))
+            if commit:
+                db.session.commit()
+                _after_write(user, [user.id])
+            else:
+                db.session.info.setdefault('task_writes', []).append((user, [user.id]))
+        for index, mapping in zip(positions, mappings):
+            results[index] = {'status': int(HTTPStatus.CREATED), 'id': mapping['id']}
+        return results
+
+    @staticmethod
+    def import_tasks(records, user, batch_size):
+        """
+        Create tasks from a stream of records in batches.
+
+        Each batch is created with create_tasks in its own transaction, so
+        only one batch is held in memory and the batches imported before an
+        error are kept.
+
+        Args:
+            records (iterable): Task data dictionaries, or InvalidRecord
+                errors of records that could not be decoded
+            user (User): The user creating the tasks
+            batch_size (int): Number of records per transaction
+
+        Yields:
+            dict: Progress after each batch: the numbers of processed,
+                created and failed records, and the errors of the batch with
+                the zero-based index of their record
+        """
+        progress = {'processed': 0, 'created': 0, 'failed': 0}
+        batch = []
+        for record in chain(records, [None]):
+            if record is not None:
+                batch.append(record)
+                if len(batch) < batch_size:
+                    continue
+            if not batch:
+                break
+
+            valid = [item for item in batch if not isinstance(item, InvalidRecord)]
+            created = iter(TaskService.create_tasks(valid, user) if valid else ())
+            errors = []
+            for index, item in enumerate(batch, progress['processed']):
+                if isinstance(item, InvalidRecord):
+                    result = item_error(HTTPStatus.BAD_REQUEST, str(item))
+                else:
+                    result = next(created)
+                if result['status'] == HTTPStatus.CREATED:
+                    progress['created'] += 1
+                else:
+                    progress['failed'] += 1
+                    errors.append({'index': index, **result})
+            progress['processed'] += len(batch)
+            batch = []
+            yield {**progress, 'errors': errors}
+
+    @staticmethod
+    def update_tasks(items, user):
+        """
+        Update several tasks in a single transaction.
+
+        Permissions for all items are checked with one query. Only the fields
+        in UPDATABLE_FIELDS are applied.
+
+        Args:
+            items (list): Task data dictionaries, each with the 'id' of the
+                task to update and the fields to change
+            user (User): The user making the request
+
+        Returns:
+            list: One result per item, in order, with the HTTP status of the
+                item and the task ID or an error message
+        """
+        results = [None] * len(items)
+        states = _task_states(
+            data.get('id') for data in items if isinstance(data, dict)
+        )
+        mappings = []
+        positions = []
+        now = utcnow()
+        for index, data in enumerate(items):
+            task_id = data.get('id') if isinstance(data, dict) else None
+            error = _access_error(task_id, states, user)
+            if error:
+                results[index] = error
+                continue
+            values = {key: data[key] for key in UPDATABLE_FIELDS if key in data}
+            error = _choice_error(values)
+            if error:
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, error, id=task_id)
+                continue
+            if 'due_date' in values:
+                try:
+                    values['due_date'] = _parse_due_date(values['due_date'])
+                except (AttributeError, ValueError):
+                    results[index] = item_error(HTTPStatus.BAD_REQUEST, "Invalid due_date", id=task_id)
+                    continue
+            if not values.get('title', True):
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, "title is required", id=task_id)
+                continue
+            mappings.append({'id': task_id, 'updated_at': now, **values})
+            positions.append(index)
+
+        if mappings:
+            removed = []
+            added = []
+            for mapping in mappings:
+                # Items may repeat an ID; each one starts from the previous state
+                owner_id, status, priority = states[mapping['id']]
+                removed.append((owner_id, status, priority))
+                states[mapping['id']] = (
+                    owner_id, mapping.get('status', status), mapping.get('priority', priority)
+                )
+                added.append(states[mapping['id']])
+
+            db.session.bulk_update_mappings(Task, mappings)
+            _record_changes('task.updated', [
+                (mapping['id'], states[mapping['id']][0], mapping) for mapping in mappings
+            ])
+            _adjust_stats(_stat_deltas(removed, added))
+            db.session.commit()
+            _after_write(user, {states[mapping['id']][0] for mapping in mappings})
+        for index, mapping in zip(positions, mappings):
+            results[index] = {'status': int(HTTPStatus.OK), 'id': mapping['id']}
+        return results
+
+    @staticmethod
+    def delete_tasks(task_ids, user):
+        """
+        Delete several tasks in a single transaction.
+
+        Args:
+            task_ids (list): IDs of the tasks to delete
+            user (User): The user making the request
+
+        Returns:
+            list: One result per ID, in order, with the HTTP status of the
+                item and the task ID or an error message
+        """
+        states = _task_states(task_ids)
+        results = []
+        deleted = set()
+        for task_id in task_ids:
+            error = _access_error(task_id, states, user)
+            if error:
+                results.append(error)
+                continue
+            deleted.add(task_id)
+            results.append({'status': int(HTTPStatus.NO_CONTENT), 'id': task_id})
+
+        if deleted:
+            Task.query.filter(Task.id.in_(deleted)).delete(synchronize_session=False)
+            _record_changes('task.deleted', [(task_id, states[task_id][0], {}) for task_id in deleted])
+            _adjust_stats(_stat_deltas(removed=[states[task_id] for task_id in deleted]))
+            db.session.commit()
+            _after_write(user, {states[task_id][0] for task_id in deleted})
+        return results
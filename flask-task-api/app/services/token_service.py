@@ -0,0 +1,202 @@
+"""
+Token revocation service module for the Task Management API.
+
+Revoked access tokens are stored in the revoked_tokens table and checked by
+Flask-JWT-Extended's blocklist loader on every authenticated request. Each
+process keeps the ``jti`` of the unexpired revoked tokens in memory and
+syncs it with the table every TOKEN_BLOCKLIST_SYNC_INTERVAL seconds, so a
+check is a set lookup; a token revoked by another process is rejected here
+within one interval and a sync, and at once by the process that revoked it.
+Only the first sync is waited for; later ones run in a background thread,
+so checks on the ASGI event loop never wait for the database once the
+first sync is done (TaskAsgiApp runs it at startup).
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from .. import jwt
+from ..models.revoked_token import RevokedToken, db
+from ..utils.token_cache import get_claims_cache
+from ..utils.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+# Rows revoked this long before the previous sync are read again, which
+# covers transactions committing late and clock differences between servers
+SYNC_OVERLAP = timedelta(seconds=60)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class TokenBlocklist:
+    """
+    In-memory copy of the unexpired revoked tokens of an application.
+    """
+
+    def __init__(self, app, sync_interval):
+        """
+        Args:
+            app (Flask): The application whose revoked tokens are held
+            sync_interval (float): Seconds between syncs with the table
+        """
+        self.app = app
+        self.sync_interval = sync_interval
+        self._tokens = {}  # jti -> expiry as UNIX time
+        self._synced_from = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        if time.monotonic() >= self._next_sync:
+            if self._synced_from is None:
+                # Checks wait for the first sync
+                self.prime()
+            elif self._lock.acquire(blocking=False):
+                # Later syncs run in a thread; checks meanwhile use the
+                # current tokens
+                threading.Thread(target=self._sync_in_background, name='token-blocklist-sync', daemon=True).start()
+        return jti in self._tokens
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def add(self, jti, expires_at):
+        """
+        Add a revoked token.
+
+        Args:
+            jti (str): ID of the token
+            expires_at (datetime): Expiry of the token in UTC
+        """
+        with self._lock:
+            self._tokens[jti] = _timestamp(expires_at)
+
+    def prime(self):
+        """
+        Run the first sync unless it has been done, waiting for it to end.
+        """
+        with self._lock:
+            if self._synced_from is None and time.monotonic() >= self._next_sync:
+                self.sync()
+
+    def _sync_in_background(self):
+        # Started with the lock held
+        try:
+            with self.app.app_context():
+                if time.monotonic() >= self._next_sync:
+                    self.sync()
+        finally:
+            self._lock.release()
+
+    def sync(self):
+        """
+        Add the tokens revoked since the previous sync and drop the expired
+        ones. Called with the lock held; failures are logged and retried
+        after the next interval.
+        """
+        self._next_sync = time.monotonic() + self.sync_interval
+        started = utcnow()
+        query = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > started)
+        if self._synced_from is not None:
+            query = query.where(RevokedToken.revoked_at >= self._synced_from - SYNC_OVERLAP)
+        try:
+            with db.engine.connect() as connection:
+                rows = connection.execute(query).all()
+        except Exception:
+            logger.warning('Failed to sync revoked tokens', exc_info=True)
+            return
+        tokens = dict(self._tokens)
+        tokens.update((row.jti, _timestamp(row.expires_at)) for row in rows)
+        now = time.time()
+        self._tokens = {jti: expires for jti, expires in tokens.items() if expires > now}
+        self._synced_from = started
+
+
+def _timestamp(value):
+    return (value - EPOCH).total_seconds()
+
+
+def init_app(app):
+    """
+    Create the revoked token list of an application and register the
+    blocklist loader.
+
+    Args:
+        app (Flask): The application to set up
+    """
+    app.extensions['token_blocklist'] = TokenBlocklist(app, app.config['TOKEN_BLOCKLIST_SYNC_INTERVAL'])
+    jwt.token_in_blocklist_loader(is_token_revoked)
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    Check whether a token was revoked; the blocklist loader of the JWTManager.
+
+    Args:
+        jwt_header (dict): Header of the token
+        jwt_payload (dict): Claims of the token
+
+    Returns:
+        bool: True if the token was revoked
+    """
+    jti = jwt_payload.get('jti')
+    return jti is not None and jti in current_app.extensions['token_blocklist']
+
+
+def revoke_token(jwt_payload):
+    """
+    Revoke a token until it expires.
+
+    Args:
+        jwt_payload (dict): Claims of the token to revoke
+    """
+    if 'exp' in jwt_payload:
+        expires_at = EPOCH + timedelta(seconds=jwt_payload['exp'])
+    else:
+        # Tokens without expiry are kept on the list for a year
+        expires_at = utcnow() + timedelta(days=365)
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'], user_id=int(jwt_payload[current_app.config['JWT_IDENTITY_CLAIM']]),
+        expires_at=expires_at
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Revoked concurrently by another request
+        db.session.rollback()
+    current_app.extensions['token_blocklist'].add(jwt_payload['jti'], expires_at)
+
+
+def prune_revoked_tokens():
+    """
+    Delete the revoked tokens that have expired.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= utcnow()).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return deleted
+
+
+def get_stats():
+    """
+    Get the verified token cache counters and revoked token count of this
+    process.
+
+    Returns:
+        dict: Claims cache counters, or None if disabled, and the number of
+            revoked tokens held in memory
+    """
+    cache = get_claims_cache()
+    return {
+        'claims_cache': cache.get_stats() if cache else None,
+        'revoked_tokens': len(current_app.extensions['token_blocklist'])
+    }
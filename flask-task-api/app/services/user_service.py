@@ -0,0 +1,180 @@
+"""
+User service module for the Task Management API.
+
+This module provides the registration and bulk provisioning of users.
+Usernames and emails are checked with one query before any password is
+hashed, and the unique indexes of the users table settle the races between
+concurrent registrations.
+"""
+
+from http import HTTPStatus
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from ..models.user import User, db
+from ..utils.bulk import insert_rows, item_error
+from . import password_service
+from ..utils.timestamps import utcnow
+
+ROLES = ('user', 'admin')
+REQUIRED_FIELDS = ('username', 'email', 'password')
+
+USERNAME_EXISTS = 'Username already exists'
+EMAIL_EXISTS = 'Email already exists'
+
+
+def _existing(usernames, emails):
+    """
+    Fetch the usernames and emails already taken among the given ones with
+    one query.
+
+    Returns:
+        tuple: Sets of the taken usernames and of the taken emails
+    """
+    rows = db.session.query(User.username, User.email).filter(
+        or_(User.username.in_(usernames), User.email.in_(emails))
+    )
+    taken_usernames, taken_emails = set(), set()
+    for row in rows:
+        taken_usernames.add(row.username)
+        taken_emails.add(row.email)
+    return taken_usernames & set(usernames), taken_emails & set(emails)
+
+
+class UserService:
+    """
+    Service class for creating users.
+    """
+
+    @staticmethod
+    def find_conflict(username, email):
+        """
+        Check whether a username or email is already taken, with one query.
+
+        Args:
+            username (str): Username to check
+            email (str): Email to check
+
+        Returns:
+            str: Error message naming the taken field, or None if both are free
+        """
+        taken_usernames, taken_emails = _existing([username], [email])
+        if taken_usernames:
+            return USERNAME_EXISTS
+        if taken_emails:
+            return EMAIL_EXISTS
+        return None
+
+    @staticmethod
+    def register(username, email, password, role='user'):
+        """
+        Create a user whose username and email are free.
+
+        The password is hashed only after the uniqueness check passed. A
+        concurrent registration of the same username or email that wins the
+        race is detected by the unique indexes when committing.
+
+        Args:
+            username (str): Username of the user
+            email (str): Email of the user
+            password (str): Plain text password
+            role (str): 'user' or 'admin'
+
+        Returns:
+            tuple: The created user, or None, and the error message if the
+                username or email is taken
+        """
+        conflict = UserService.find_conflict(username, email)
+        if conflict:
+            return None, conflict
+        user = User(username=username, email=email, password=password, role=role)
+        db.session.add(user)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None, UserService.find_conflict(username, email) or USERNAME_EXISTS
+        return user, None
+
+    @staticmethod
+    def create_users(items):
+        """
+        Create several users in a single transaction.
+
+        Invalid items and items whose username or email is taken, by an
+        existing user or an earlier item, are reported individually and do
+        not prevent the others from being created. Taken names are found
+        with one query and the passwords of the remaining items are hashed
+        in parallel before the rows are inserted together.
+
+        Args:
+            items (list): User data dictionaries with username, email,
+                password and an optional role
+
+        Returns:
+            list: One result per item, in order, with the HTTP status of the
+                item and the ID of the created user or an error message
+        """
+        results = [None] * len(items)
+        valid = []
+        for index, data in enumerate(items):
+            if not isinstance(data, dict) or not all(
+                isinstance(data.get(field), str) and data[field] for field in REQUIRED_FIELDS
+            ):
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, "username, email and password are required")
+            elif data.get('role', 'user') not in ROLES:
+                results[index] = item_error(HTTPStatus.BAD_REQUEST, "role must be 'user' or 'admin'")
+            else:
+                valid.append(index)
+
+        hashes = {}
+        failed = None
+        pending = valid
+        while pending:
+            taken_usernames, taken_emails = _existing(
+                [items[index]['username'] for index in pending], [items[index]['email'] for index in pending]
+            )
+            accepted = []
+            for index in pending:
+                data = items[index]
+                if data['username'] in taken_usernames:
+                    results[index] = item_error(HTTPStatus.BAD_REQUEST, USERNAME_EXISTS)
+                elif data['email'] in taken_emails:
+                    results[index] = item_error(HTTPStatus.BAD_REQUEST, EMAIL_EXISTS)
+                else:
+                    # Later items with the same names conflict with this one
+                    taken_usernames.add(data['username'])
+                    taken_emails.add(data['email'])
+                    accepted.append(index)
+            if not accepted:
+                break
+
+            unhashed = [index for index in accepted if index not in hashes]
+            hashes.update(zip(unhashed, password_service.hash_passwords(
+                [items[index]['password'] for index in unhashed]
+            )))
+            now = utcnow()
+            mappings = [
+                {
+                    'username': items[index]['username'],
+                    'email': items[index]['email'],
+                    'password_hash': hashes[index],
+                    'role': items[index].get('role', 'user'),
+                    'created_at': now,
+                    'updated_at': now
+                }
+                for index in accepted
+            ]
+            try:
+                insert_rows(User.__table__, mappings)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                if accepted == failed:
+                    raise
+                # Names taken concurrently since the check: check again
+                failed = pending = accepted
+                continue
+            for index, mapping in zip(accepted, mappings):
+                results[index] = {'status': int(HTTPStatus.CREATED), 'id': mapping['id']}
+            break
+        return results
@@ -0,0 +1,72 @@
+"""
+Bulk write helpers shared by the batch endpoints of the Task Management API.
+
+This module inserts many rows with few statements and builds the per-item
+results that batch endpoints report for the items they could not process.
+"""
+
+from functools import lru_cache
+from sqlalchemy import bindparam, cast, func, select, text
+from sqlalchemy.dialects import postgresql
+from .. import db
+
+# Rows per multi-row INSERT on PostgreSQL
+INSERT_CHUNK_SIZE = 1000
+
+
+def item_error(status, message, **extra):
+    """
+    Build the result entry of a batch item that could not be processed.
+    """
+    return {'status': int(status), 'message': message, **extra}
+
+
+def insert_rows(table, mappings):
+    """
+    Insert rows in the caller's transaction and set the 'id' of each mapping.
+
+    SQLite inserts the rows with one executemany statement: rows inserted in
+    a write transaction without explicit IDs take consecutive rowids, so
+    their IDs follow from last_insert_rowid(). PostgreSQL inserts up to
+    INSERT_CHUNK_SIZE rows per multi-row INSERT ... RETURNING id, which
+    passes each column as one array and returns the IDs in row order. Other
+    databases return the ID of each row from its own INSERT.
+
+    Args:
+        table (Table): Table with an integer ``id`` primary key
+        mappings (list): Column values of the rows to insert, all with the
+            same keys
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        statement = _unnest_insert(table, tuple(mappings[0]))
+        for start in range(0, len(mappings), INSERT_CHUNK_SIZE):
+            chunk = mappings[start:start + INSERT_CHUNK_SIZE]
+            ids = db.session.execute(statement, {key: [mapping[key] for mapping in chunk] for key in chunk[0]})
+            for mapping, row_id in zip(chunk, ids.scalars()):
+                mapping['id'] = row_id
+        return
+    if dialect != 'sqlite':
+        for mapping in mappings:
+            mapping['id'] = db.session.execute(table.insert(), mapping).inserted_primary_key[0]
+        return
+    db.session.execute(table.insert(), mappings)
+    last_id = db.session.execute(text('SELECT last_insert_rowid()')).scalar()
+    for row_id, mapping in enumerate(mappings, last_id - len(mappings) + 1):
+        mapping['id'] = row_id
+
+
+@lru_cache(maxsize=None)
+def _unnest_insert(table, keys):
+    """
+    Build ``INSERT INTO table (keys) SELECT unnest(:key), ... RETURNING id``.
+
+    A list of values is bound to each key. Unlike a VALUES list, the
+    statement has one parameter per column whatever the number of rows, so
+    SQLAlchemy compiles it once and the driver sends it in one round trip.
+    """
+    arrays = [
+        func.unnest(cast(bindparam(key), postgresql.ARRAY(table.c[key].type)))
+        for key in keys
+    ]
+    return table.insert().from_select(keys, select(*arrays)).returning(table.c.id)
@@ -0,0 +1,87 @@
+"""
+Conditional request helpers for the Task Management API.
+
+This module computes entity tags and evaluates If-None-Match and
+If-Modified-Since headers so that unchanged resources can be answered with
+304 Not Modified before any row is loaded or serialized.
+"""
+
+import hashlib
+from datetime import timezone
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """
+    Build a strong entity tag from the parts identifying a representation.
+
+    Returns:
+        str: Hex digest of the parts
+    """
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def task_etag(task_id, updated_at):
+    """
+    Build the entity tag of a single task.
+
+    Args:
+        task_id (int): ID of the task
+        updated_at (datetime): Last modification time of the task
+
+    Returns:
+        str: Entity tag of the task
+    """
+    return make_etag('task', task_id, updated_at.isoformat())
+
+
+def _http_datetime(value):
+    """
+    Convert a naive UTC datetime to the one-second precision of HTTP dates.
+    """
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Check whether the client's cached copy is still current.
+
+    If-Modified-Since is only considered when If-None-Match is absent.
+
+    Args:
+        etag (str): Current entity tag of the resource
+        last_modified (datetime): Current modification time, naive UTC
+
+    Returns:
+        bool: True if the request can be answered with 304 Not Modified
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return _http_datetime(last_modified) <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Attach ETag and Last-Modified headers to a response.
+
+    Args:
+        response (Response): Response to update
+        etag (str): Entity tag of the representation
+        last_modified (datetime): Modification time, naive UTC
+
+    Returns:
+        Response: The updated response
+    """
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = _http_datetime(last_modified)
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    """
+    Build a 304 Not Modified response carrying the current validators.
+    """
+    return set_validators(Response(status=304), etag, last_modified)
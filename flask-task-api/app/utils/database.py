@@ -0,0 +1,208 @@
+"""
+Database extension module for the Task Management API.
+
+This module extends Flask-SQLAlchemy with the engine configuration of the
+application: connection pool sizing for server databases, a connection pool
+plus per-connection PRAGMA settings for SQLite, routing of SELECT
+statements to a read replica bind, and the asyncio engine of the ASGI mode.
+Engines drop their pooled connections in forked children, so that an
+application preloaded by a gunicorn master is safe to use in its workers.
+"""
+
+import os
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event, orm
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Asyncio drivers used by the ASGI mode, by database backend
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+# Bind key that SELECT statements are routed to, set by Database.reading_from
+_read_bind = ContextVar('read_bind', default=None)
+
+
+def _is_memory_database(sa_url):
+    return sa_url.get_backend_name() == 'sqlite' and sa_url.database in (None, '', ':memory:')
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending SELECT statements to the bind chosen with
+    Database.reading_from. Flushes and every other statement use the
+    primary database, and once the session has written it reads from the
+    primary as well until it is closed, so that it sees its own writes.
+    """
+
+    def __init__(self, db, **options):
+        self._db = db
+        self._wrote = False
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self._wrote = True
+        bind_key = _read_bind.get()
+        if bind_key and not self._wrote and getattr(clause, 'is_select', False):
+            return self._db.get_engine(self.app, bind=bind_key)
+        return super().get_bind(mapper, clause)
+
+    def close(self):
+        self._wrote = False
+        super().close()
+
+
+class Database(SQLAlchemy):
+    """
+    Flask-SQLAlchemy extension applying the DB_* and SQLITE_PRAGMAS settings.
+
+    Options given explicitly in SQLALCHEMY_ENGINE_OPTIONS take precedence;
+    pool sizing is skipped when they select a pool class other than QueuePool.
+    """
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        """
+        Add pool settings before Flask-SQLAlchemy applies its own defaults.
+        """
+        config = app.config
+        poolclass = config['SQLALCHEMY_ENGINE_OPTIONS'].get('poolclass', QueuePool)
+        if not issubclass(poolclass, QueuePool) or _is_memory_database(sa_url):
+            return super().apply_driver_hacks(app, sa_url, options)
+
+        options.setdefault('pool_size', config['DB_POOL_SIZE'])
+        options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+        if sa_url.get_backend_name() == 'sqlite':
+            # Keep connections (and their page cache) instead of reopening
+            # the file for every session
+            options.setdefault('poolclass', QueuePool)
+            options.setdefault('connect_args', {}).setdefault('check_same_thread', False)
+        else:
+            options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+            options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+            options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+        return super().apply_driver_hacks(app, sa_url, options)
+
+    def create_session(self, options):
+        """
+        Create the session factory, using RoutingSession.
+        """
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    @contextmanager
+    def reading_from(self, bind_key):
+        """
+        Route SELECT statements executed in this block to another bind.
+
+        Args:
+            bind_key (str): Key of the bind in SQLALCHEMY_BINDS
+        """
+        token = _read_bind.set(bind_key)
+        try:
+            yield
+        finally:
+            _read_bind.reset(token)
+
+    def create_engine(self, sa_url, engine_opts):
+        """
+        Create the engine and register the SQLite PRAGMAs run on each new connection.
+        """
+        engine = super().create_engine(sa_url, engine_opts)
+        pragmas = self.get_app().config.get('SQLITE_PRAGMAS')
+        if engine.dialect.name == 'sqlite' and pragmas:
+            event.listen(engine, 'connect', _pragma_setter(pragmas))
+        _dispose_after_fork(engine)
+        return engine
+
+    def create_async_engine(self, app=None):
+        """
+        Create an asyncio engine for the primary database of the application.
+
+        The engine uses the asyncio driver of the database (aiosqlite or
+        asyncpg) with the same DB_* pool settings and SQLite PRAGMAs as the
+        synchronous engine. Its pool is separate, so DB_POOL_SIZE applies to
+        each engine.
+
+        Args:
+            app (Flask): The application, defaults to the current one
+
+        Returns:
+            AsyncEngine: Engine for AsyncSession
+
+        Raises:
+            ValueError: If the database has no asyncio driver or is in memory,
+                where the engines would not share the data
+        """
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+        config = self.get_app(app).config
+        sa_url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+        backend = sa_url.get_backend_name()
+        if backend not in ASYNC_DRIVERS or _is_memory_database(sa_url):
+            raise ValueError(f'No asyncio engine available for {sa_url.render_as_string()}')
+
+        options = {
+            'poolclass': AsyncAdaptedQueuePool,
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+        }
+        if backend != 'sqlite':
+            options.update(
+                pool_timeout=config['DB_POOL_TIMEOUT'],
+                pool_recycle=config['DB_POOL_RECYCLE'],
+                pool_pre_ping=config['DB_POOL_PRE_PING'],
+            )
+        engine = create_async_engine(sa_url.set(drivername=ASYNC_DRIVERS[backend]), **options)
+        pragmas = config.get('SQLITE_PRAGMAS')
+        if backend == 'sqlite' and pragmas:
+            event.listen(engine.sync_engine, 'connect', _pragma_setter(pragmas))
+        _dispose_after_fork(engine.sync_engine)
+        return engine
+
+
+def _dispose_after_fork(engine):
+    """
+    Give a forked child process an empty connection pool.
+
+    Connections opened before the fork, e.g. while gunicorn --preload
+    imports the application in the master, must not be shared with the
+    workers. The child replaces the pool without closing the connections,
+    which still belong to the parent.
+
+    Args:
+        engine (Engine): Engine to reset in children; not kept alive by the hook
+    """
+    engine_ref = weakref.ref(engine)
+
+    def dispose():
+        engine = engine_ref()
+        if engine is not None:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=dispose)
+
+
+def _pragma_setter(pragmas):
+    """
+    Build a connect event listener applying PRAGMA statements.
+
+    Args:
+        pragmas (dict): PRAGMA names and values, applied in order
+
+    Returns:
+        callable: Listener for the engine 'connect' event
+    """
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return set_pragmas
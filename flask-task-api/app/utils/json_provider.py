@@ -0,0 +1,71 @@
+"""
+JSON provider module for the Task Management API.
+
+This module provides a Flask JSON provider that encodes with orjson when it
+is installed and falls back to the standard library json module otherwise.
+Output matches the default provider: keys are sorted and datetimes are
+passed to the default hook.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, with a standard library fallback.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON to a string.
+
+        Falls back to the standard library for arguments orjson does not
+        support and for values it cannot encode.
+        """
+        if orjson is None or not set(kwargs) <= {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(
+                obj, default=self.default, option=self._options(bool(kwargs.get('indent')))
+            ).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON.
+        """
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the given arguments as a JSON response without an
+        intermediate str copy.
+        """
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(
+                obj, default=self.default,
+                option=self._options(indent) | orjson.OPT_APPEND_NEWLINE
+            )
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
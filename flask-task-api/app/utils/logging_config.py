@@ -0,0 +1,43 @@
+"""
+Logging setup for the Task Management API.
+
+This module configures the root logger from LOG_LEVEL and LOG_FORMAT. JSON
+output uses python-json-logger when it is installed, and falls back to text
+otherwise; values passed in ``extra``, such as the duration of a slow query,
+become fields of the JSON record.
+"""
+
+import logging
+
+try:
+    from pythonjsonlogger import jsonlogger
+except ImportError:  # pragma: no cover - python-json-logger is optional
+    jsonlogger = None
+
+LOG_FIELDS = '%(asctime)s %(levelname)s %(name)s %(message)s'
+
+
+def _formatter(log_format):
+    if log_format == 'json' and jsonlogger is not None:
+        return jsonlogger.JsonFormatter(LOG_FIELDS)
+    return logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+
+def configure_logging(app):
+    """
+    Send log records to stderr in the configured format and level.
+
+    The handler is installed on the root logger once per process, so that
+    creating several applications does not duplicate log lines.
+
+    Args:
+        app (Flask): The application whose LOG_LEVEL and LOG_FORMAT are used
+    """
+    root = logging.getLogger()
+    root.setLevel(app.config['LOG_LEVEL'].upper())
+    handler = next((h for h in root.handlers if getattr(h, '_task_api', False)), None)
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler._task_api = True
+        root.addHandler(handler)
+    handler.setFormatter(_formatter(app.config['LOG_FORMAT']))
@@ -0,0 +1,267 @@
+"""
+Request and SQL metrics for the Task Management API.
+
+This module times every request and every SQL statement, counts the
+statements run by each request, logs slow queries and repeated SELECTs (the
+N+1 pattern), and renders the collected histograms in the Prometheus text
+format. Metrics are kept in memory per process; recording one request costs
+a few dictionary updates under a lock.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Prometheus histogram with one series per label set.
+    """
+
+    def __init__(self, name, description, buckets, labels=()):
+        """
+        Args:
+            name (str): Metric name
+            description (str): HELP text
+            buckets (tuple): Upper bounds of the buckets, in increasing order
+            labels (tuple): Label names of the series
+        """
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels = labels
+        # Label values -> [count per bucket (the last one is +Inf), sum]
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        """
+        Record one value. Must be called with the registry lock held.
+        """
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        """
+        Render the histogram in the Prometheus text format.
+
+        Returns:
+            list: Lines of the metric
+        """
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ''.join(f'{name}="{_escape(value)}",' for name, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+            labels = _braces(labels.rstrip(','))
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Counter:
+    """
+    Prometheus counter with one series per label set.
+    """
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, *label_values, amount=1):
+        """
+        Increment a series. Must be called with the registry lock held.
+        """
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self._series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            lines.append(f'{self.name}{_braces(labels)} {value}')
+        return lines
+
+
+def _braces(labels):
+    return f'{{{labels}}}' if labels else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_lock = threading.Lock()
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to handle a request, including streamed bodies.',
+    LATENCY_BUCKETS, ('method', 'endpoint', 'status')
+)
+REQUEST_STATEMENTS = Histogram(
+    'http_request_sql_statements', 'SQL statements run by a request.',
+    STATEMENT_COUNT_BUCKETS, ('endpoint',)
+)
+REQUEST_SQL_TIME = Histogram(
+    'http_request_sql_duration_seconds', 'Time a request spent running SQL statements.',
+    LATENCY_BUCKETS, ('endpoint',)
+)
+SQL_LATENCY = Histogram(
+    'sql_statement_duration_seconds', 'Time to run one SQL statement, in and outside requests.',
+    SQL_LATENCY_BUCKETS
+)
+SLOW_QUERIES = Counter('sql_slow_queries_total', 'SQL statements slower than SQL_SLOW_QUERY_MS.', ('endpoint',))
+N_PLUS_ONE = Counter(
+    'http_request_repeated_selects_total',
+    'Requests running one SELECT at least METRICS_N_PLUS_ONE_THRESHOLD times.', ('endpoint',)
+)
+METRICS = (REQUEST_LATENCY, REQUEST_STATEMENTS, REQUEST_SQL_TIME, SQL_LATENCY, SLOW_QUERIES, N_PLUS_ONE)
+
+
+class _RequestStats:
+    """
+    SQL statements of the current request.
+    """
+    __slots__ = ('started', 'endpoint', 'status', 'statements', 'sql_seconds', 'selects')
+
+    def __init__(self, endpoint):
+        self.started = time.perf_counter()
+        self.endpoint = endpoint
+        self.status = 500
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.selects = {}
+
+
+_current = ContextVar('request_metrics', default=None)
+
+# Engine events are registered once per process, for every engine
+_settings = {'slow_query_seconds': None, 'n_plus_one_threshold': 0}
+_listening = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+        if not executemany and statement.lstrip()[:6].upper() == 'SELECT':
+            stats.selects[statement] = stats.selects.get(statement, 0) + 1
+
+    slow = _settings['slow_query_seconds']
+    is_slow = slow is not None and elapsed >= slow
+    with _lock:
+        SQL_LATENCY.observe(elapsed)
+        if is_slow:
+            SLOW_QUERIES.inc(stats.endpoint if stats else '')
+    if is_slow:
+        # Values are never logged: they include password hashes, token IDs and task contents
+        params = f'{len(parameters)} sets' if executemany else str(len(parameters or ()))
+        logger.warning(
+            'Slow query (%.1f ms, %s): %s; parameters: %s', elapsed * 1000,
+            stats.endpoint if stats else 'outside requests', statement, params,
+            extra={'duration_ms': elapsed * 1000, 'endpoint': stats.endpoint if stats else None}
+        )
+
+
+def _start_request():
+    _current.set(_RequestStats(request.endpoint or 'unmatched'))
+
+
+def _record_status(response):
+    stats = _current.get()
+    if stats is not None:
+        stats.status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    """
+    Record the metrics of a request once its response, including a streamed
+    body, is complete.
+    """
+    stats = _current.get()
+    if stats is None:
+        return
+    _current.set(None)
+    elapsed = time.perf_counter() - stats.started
+    threshold = _settings['n_plus_one_threshold']
+    repeated = [
+        (count, statement) for statement, count in stats.selects.items() if threshold and count >= threshold
+    ]
+    with _lock:
+        REQUEST_LATENCY.observe(elapsed, request.method, stats.endpoint, stats.status)
+        REQUEST_STATEMENTS.observe(stats.statements, stats.endpoint)
+        REQUEST_SQL_TIME.observe(stats.sql_seconds, stats.endpoint)
+        if repeated:
+            N_PLUS_ONE.inc(stats.endpoint)
+    for count, statement in repeated:
+        logger.warning(
+            'Possible N+1 query: %s ran the same SELECT %d times: %s', stats.endpoint, count, statement,
+            extra={'endpoint': stats.endpoint, 'count': count}
+        )
+
+
+def init_app(app):
+    """
+    Record the metrics of the application's requests and SQL statements.
+
+    Does nothing unless METRICS_ENABLED is set.
+
+    Args:
+        app (Flask): The application to instrument
+    """
+    global _listening
+    if not app.config['METRICS_ENABLED']:
+        return
+    slow_ms = app.config['SQL_SLOW_QUERY_MS']
+    _settings['slow_query_seconds'] = slow_ms / 1000 if slow_ms > 0 else None
+    _settings['n_plus_one_threshold'] = app.config['METRICS_N_PLUS_ONE_THRESHOLD']
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+def render(extra=()):
+    """
+    Render the metrics of this process in the Prometheus text format.
+
+    Args:
+        extra (iterable): Additional (name, type, description, value) samples
+
+    Returns:
+        str: Prometheus exposition text
+    """
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.render()]
+    for name, kind, description, value in extra:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
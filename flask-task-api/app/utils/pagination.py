@@ -0,0 +1,46 @@
+"""
+Pagination helpers for the Task Management API.
+
+This module provides the opaque cursor encoding used by keyset pagination.
+"""
+
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values):
+    """
+    Encode keyset values into an opaque, URL-safe cursor.
+
+    Args:
+        values (list): JSON-serializable values of the last row on a page
+
+    Returns:
+        str: Opaque cursor string
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Opaque cursor string
+
+    Returns:
+        list: Keyset values encoded in the cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (UnicodeError, binascii.Error, ValueError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
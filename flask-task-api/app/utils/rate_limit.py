@@ -0,0 +1,76 @@
+"""
+Rate limiting helpers for the Task Management API.
+
+This module provides the key function of the application's limiter, the
+per-route limits read from the RATELIMITS setting and the response of the
+requests that exceed them.
+"""
+
+import math
+import time
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt_identity
+from flask_limiter.util import get_remote_address
+
+
+def rate_limit_key():
+    """
+    Identify the client of a request for rate limiting.
+
+    Authenticated requests are counted per user, so users behind one address
+    don't share a budget and a user can't multiply it by switching
+    addresses. The token is the one already verified by ``jwt_required``,
+    which runs before the limit check; other requests are counted per
+    remote address.
+
+    Returns:
+        str: Rate limit key of the request
+    """
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    if identity is not None:
+        return f'user:{identity}'
+    return f'ip:{get_remote_address()}'
+
+
+def configured_limit(name):
+    """
+    Build a limit provider reading a route's limit from the configuration.
+
+    Args:
+        name (str): Key of the limit in the RATELIMITS setting
+
+    Returns:
+        callable: Function returning the limit string, e.g. '100/hour'
+    """
+    def limit():
+        return current_app.config['RATELIMITS'][name]
+    return limit
+
+
+def rate_limit_exceeded(limiter):
+    """
+    Build the error handler rejecting requests over their rate limit.
+
+    The response tells the client how long to wait before retrying. The
+    limiter adds the Retry-After header itself only when
+    RATELIMIT_HEADERS_ENABLED is set; otherwise it is computed here from the
+    window of the exceeded limit, which costs a storage round trip on
+    rejected requests only.
+
+    Args:
+        limiter (Limiter): The application's limiter
+
+    Returns:
+        callable: Handler of RateLimitExceeded returning a 429 response with
+            a Retry-After header
+    """
+    def handler(error):
+        response = jsonify({'message': f'Rate limit exceeded: {error.description}'})
+        current_limit = limiter.current_limit
+        if current_limit is not None:
+            response.headers['Retry-After'] = str(max(1, math.ceil(current_limit.reset_at - time.time())))
+        return response, 429
+    return handler
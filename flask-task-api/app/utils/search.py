@@ -0,0 +1,161 @@
+"""
+Full-text search index of the Task Management API.
+
+On SQLite, task titles and descriptions are indexed in the contentless FTS5
+table ``tasks_fts``, kept in sync with ``tasks`` by triggers so that bulk
+and Core writes are indexed as well. Each row also indexes its owner as an
+``u<user_id>`` token in the ``owner`` column, so searches of a user are
+scoped by the index itself instead of filtering matches afterwards.
+
+On PostgreSQL, a GIN index over a tsvector expression of the same columns
+is used instead and needs no triggers.
+"""
+
+import re
+from sqlalchemy import text
+
+FTS_TABLE = 'tasks_fts'
+
+# Column weights of bm25(): title, description, owner
+SQLITE_RANK = f'bm25({FTS_TABLE}, 2.0, 1.0, 0.0)'
+
+SQLITE_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+        USING fts5(title, description, owner, content='')""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, coalesce(new.description, ''), 'u' || new.user_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, coalesce(old.description, ''), 'u' || old.user_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+        AFTER UPDATE OF title, description, user_id ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, owner)
+        VALUES ('delete', old.id, old.title, coalesce(old.description, ''), 'u' || old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        VALUES (new.id, new.title, coalesce(new.description, ''), 'u' || new.user_id);
+    END""",
+)
+
+SQLITE_REBUILD = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"""INSERT INTO {FTS_TABLE}(rowid, title, description, owner)
+        SELECT id, title, coalesce(description, ''), 'u' || user_id FROM tasks""",
+)
+
+# Must match the expression of the index for PostgreSQL to use it
+POSTGRES_DOCUMENT = (
+    "to_tsvector('english', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))"
+)
+
+POSTGRES_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN ({POSTGRES_DOCUMENT})",
+)
+
+
+def create_index(target, connection, **kw):
+    """
+    Create the full-text index of the tasks table.
+
+    Registered as an ``after_create`` listener of the tasks table and safe to
+    run against a database that already has the index.
+
+    Args:
+        target (Table): The tasks table
+        connection (Connection): Connection creating the table
+    """
+    statements = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}
+    for statement in statements.get(connection.dialect.name, ()):
+        connection.execute(text(statement))
+
+
+def drop_index(target, connection, **kw):
+    """
+    Drop the SQLite FTS table; registered as a ``before_drop`` listener.
+
+    The triggers and the PostgreSQL index are dropped with the tasks table.
+    """
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+
+
+def suspend_index(connection):
+    """
+    Stop indexing inserted tasks until rebuild_index is called.
+
+    Used by bulk loads, for which one rebuild after the load is faster than
+    indexing each row from the insert trigger.
+
+    Args:
+        connection (Connection): Connection to the database
+    """
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text('DROP TRIGGER IF EXISTS tasks_fts_insert'))
+
+
+def rebuild_index(connection):
+    """
+    Create the full-text index if missing and fill it from the tasks table.
+
+    Args:
+        connection (Connection): Connection to the database
+    """
+    create_index(None, connection)
+    if connection.dialect.name == 'sqlite':
+        for statement in SQLITE_REBUILD:
+            connection.execute(text(statement))
+
+
+def match_expression(query, owner_id=None):
+    """
+    Build an FTS5 MATCH expression from a user's search text.
+
+    Words are quoted so that FTS5 operators in the text are matched
+    literally; all words must occur and the last one may be a prefix.
+
+    Args:
+        query (str): Search text as typed by the user
+        owner_id (int): Restrict matches to the tasks of this user
+
+    Returns:
+        str: MATCH expression, or None if the text contains no words
+    """
+    words = search_words(query)
+    if not words:
+        return None
+    terms = '{title description} : (' + ' '.join(f'"{word}"' for word in words) + '*)'
+    if owner_id is None:
+        return terms
+    return f'owner : u{int(owner_id)} AND {terms}'
+
+
+def tsquery_expression(query):
+    """
+    Build a PostgreSQL to_tsquery expression from a user's search text.
+
+    Words are quoted as lexemes so that tsquery operators in the text are
+    matched literally; all words must occur and the last one may be a
+    prefix, as with match_expression.
+
+    Args:
+        query (str): Search text as typed by the user
+
+    Returns:
+        str: tsquery expression, or None if the text contains no words
+    """
+    words = search_words(query)
+    if not words:
+        return None
+    return ' & '.join(f"'{word}'" for word in words) + ':*'
+
+
+def search_words(query):
+    """
+    Extract the words of a user's search text for tsquery and LIKE matching.
+
+    Returns:
+        list: Words in the order they appear
+    """
+    return re.findall(r'\w+', query)
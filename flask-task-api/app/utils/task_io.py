@@ -0,0 +1,184 @@
+"""
+Task import and export formats for the Task Management API.
+
+This module encodes task rows as CSV or NDJSON and decodes uploaded CSV or
+NDJSON streams into task data dictionaries, one record at a time, so that
+files of any size are processed in bounded memory.
+"""
+
+import csv
+import io
+import json
+from ..models.task import Task
+
+CSV_MIMETYPE = 'text/csv'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+FORMATS = {'csv': CSV_MIMETYPE, 'ndjson': NDJSON_MIMETYPE}
+
+# Columns of CSV exports, in the order of Task.to_dict
+CSV_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at', 'user_id'
+)
+
+# Encoded rows are joined into chunks of about this many characters, so
+# that the server writes to the socket once per chunk instead of per row
+CHUNK_SIZE = 64 * 1024
+
+
+class InvalidRecord(ValueError):
+    """
+    A record of an uploaded stream that could not be decoded.
+
+    Decoders yield instead of raise it, so that one bad line does not stop
+    the rest of the import.
+    """
+
+
+class _LineWriter:
+    """
+    File-like object returning what is written, so that csv.writer encodes
+    a row into a string without buffering.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _chunks(lines):
+    """
+    Join encoded lines into chunks of about CHUNK_SIZE characters.
+    """
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def encode_tasks(rows, format, dumps=json.dumps):
+    """
+    Encode task rows for a streamed response or an export file.
+
+    Args:
+        rows (iterable): Task instances or rows (see Task.row_to_dict)
+        format (str): 'csv' or 'ndjson'
+        dumps (callable): JSON encoder of NDJSON lines
+
+    Yields:
+        str: Chunks of encoded rows; CSV output starts with a header line
+    """
+    if format == 'csv':
+        writer = csv.writer(_LineWriter())
+
+        def lines():
+            yield writer.writerow(CSV_FIELDS)
+            for row in rows:
+                task = Task.row_to_dict(row)
+                yield writer.writerow([task[field] for field in CSV_FIELDS])
+    else:
+        def lines():
+            for row in rows:
+                yield dumps(Task.row_to_dict(row)) + '\n'
+
+    return _chunks(lines())
+
+
+def _ndjson_records(text):
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield InvalidRecord(f"Line {number} is not valid JSON")
+            continue
+        if not isinstance(record, dict):
+            yield InvalidRecord(f"Line {number} is not a JSON object")
+            continue
+        yield record
+
+
+def _csv_records(text):
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield InvalidRecord(f"Line {reader.line_num}: {e}")
+            continue
+        # Empty cells fall back to the defaults of POST /tasks
+        yield {key: value for key, value in row.items() if key is not None and value not in ('', None)}
+
+
+class _StreamReader(io.RawIOBase):
+    """
+    Adapt a file-like object with only read(), such as the wsgi.input of
+    gunicorn, to the io interface that TextIOWrapper requires.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def decode_tasks(stream, format):
+    """
+    Decode an uploaded CSV or NDJSON stream into task data dictionaries.
+
+    The stream is read incrementally. CSV input must start with a header
+    line naming the columns, as written by encode_tasks; unknown columns,
+    such as the id and timestamps of an export, are ignored on import.
+
+    Args:
+        stream (file): Binary stream of UTF-8 text, such as request.stream.
+            Objects providing only read(size), like the request body of
+            gunicorn that Werkzeug passes through, are adapted
+        format (str): 'csv' or 'ndjson'
+
+    Yields:
+        dict: Task data as accepted by TaskService.create_tasks, or an
+            InvalidRecord for a record that could not be decoded
+    """
+    if not isinstance(stream, io.IOBase):
+        # Werkzeug passes the server's input stream through when it marks
+        # the end of the body itself
+        stream = io.BufferedReader(_StreamReader(stream))
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    if format == 'csv':
+        return _csv_records(text)
+    return _ndjson_records(text)
+
+
+def request_format(value, mimetype):
+    """
+    Choose the import or export format from a ``format`` query parameter,
+    falling back to a Content-Type or Accept mimetype.
+
+    Args:
+        value (str): Value of the format query parameter, or None
+        mimetype (str): Mimetype of the request body or preferred response
+
+    Returns:
+        str: 'csv' or 'ndjson', or None if neither is recognized
+    """
+    if value:
+        return value if value in FORMATS else None
+    for format, format_mimetype in FORMATS.items():
+        if mimetype == format_mimetype:
+            return format
+    return None
@@ -0,0 +1,19 @@
+"""
+Timestamp helpers of the Task Management API.
+
+The DateTime columns store naive UTC times; this module provides the
+current time in that form without the datetime.utcnow() call deprecated
+since Python 3.12.
+"""
+
+from datetime import datetime, timezone
+
+
+def utcnow():
+    """
+    Get the current UTC time as a naive datetime.
+
+    Returns:
+        datetime: Current time in UTC, without tzinfo
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
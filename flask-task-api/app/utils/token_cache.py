@@ -0,0 +1,135 @@
+"""
+Verified token cache of the Task Management API.
+
+Clients send the same access token with every request until it expires, so
+its signature is verified once per process: the claims of verified tokens
+are kept in a bounded LRU cache keyed by a SHA-256 digest of the token and
+served until the token's ``exp``. Only the decoding is cached; the token
+type, the revocation list and the other checks of ``jwt_required`` still
+run on every request.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from flask import current_app
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config as jwt_config
+
+
+class ClaimsCache:
+    """
+    Bounded LRU cache of verified token claims.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, now):
+        """
+        Get the claims of a token, or None if missing or expired.
+
+        Args:
+            key (bytes): Digest of the token
+            now (float): Current UNIX time
+
+        Returns:
+            dict: A copy of the claims, which callers may modify
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires = entry
+            if expires is not None and now > expires:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(claims)
+
+    def put(self, key, claims, expires):
+        """
+        Add the claims of a verified token, evicting the least recently used.
+
+        Args:
+            key (bytes): Digest of the token
+            claims (dict): Decoded claims
+            expires (float): UNIX time after which the token is rejected,
+                or None if it does not expire
+        """
+        with self._lock:
+            self._entries[key] = (dict(claims), expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Get the size and hit counters of the cache.
+
+        Returns:
+            dict: Entries, hits, misses and hit ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager serving the claims of already verified tokens from a
+    ClaimsCache of TOKEN_CLAIMS_CACHE_SIZE entries per application.
+
+    Tokens with a CSRF value or decoded with ``allow_expired`` bypass the
+    cache, as do all tokens when the size is 0.
+    """
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        size = app.config.get('TOKEN_CLAIMS_CACHE_SIZE', 0)
+        app.extensions['token_claims_cache'] = ClaimsCache(size) if size > 0 else None
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = current_app.extensions.get('token_claims_cache')
+        if cache is None or csrf_value or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode()).digest()
+        claims = cache.get(key, time.time())
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            # PyJWT rejects a token once the time passes exp + leeway
+            leeway = jwt_config.leeway
+            if isinstance(leeway, timedelta):
+                leeway = leeway.total_seconds()
+            expires = claims['exp'] + leeway if 'exp' in claims else None
+            cache.put(key, claims, expires)
+        return claims
+
+
+def get_claims_cache():
+    """
+    Get the verified token cache of the current application.
+
+    Returns:
+        ClaimsCache: The cache, or None if disabled
+    """
+    return current_app.extensions.get('token_claims_cache')
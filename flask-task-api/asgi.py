@@ -0,0 +1,15 @@
+"""
+ASGI entry point of the Flask Task Management API.
+
+Serve the API with an ASGI server, for example::
+
+    uvicorn asgi:app --workers 4
+
+The configuration is chosen with FLASK_CONFIG (default: development).
+"""
+
+import os
+from app import create_app
+from app.asgi import TaskAsgiApp
+
+app = TaskAsgiApp(create_app(os.getenv('FLASK_CONFIG', 'default'), cli=False))
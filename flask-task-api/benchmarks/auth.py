@@ -0,0 +1,106 @@
+"""
+Benchmark the per-request cost of access token verification.
+
+Times the token check of ``jwt_required`` (decoding, signature and expiry
+verification, and the revocation check) and a whole authenticated request
+with the verified token cache disabled and enabled. Requests cycle through
+the tokens of several users, as a server sees them. Usage::
+
+    python -m benchmarks.auth --users 100 --repeat 20000
+"""
+
+import argparse
+import sys
+
+from flask_jwt_extended import create_access_token, get_jwt, verify_jwt_in_request
+
+from app import db
+from app.services import token_service
+from config import config
+from .common import create_benchmark_app, measure, seed
+
+
+def create(cache_size, db_path=None):
+    settings = config['production']
+    settings.TOKEN_CLAIMS_CACHE_SIZE = cache_size
+    settings.RATELIMIT_ENABLED = False
+    settings.METRICS_ENABLED = False
+    settings.JOB_WORKERS_IN_PROCESS = 0
+    return create_benchmark_app(db_path, config_name='production')
+
+
+def run(app, users, repeat):
+    """
+    Time token verification and requests of an application.
+
+    Returns:
+        dict: Mean latency in microseconds of each measurement
+    """
+    with app.app_context():
+        tokens = [create_access_token(identity=str(user_id)) for user_id in range(1, users + 1)]
+        from app.models.task import Task
+        task_id = db.session.query(Task.id).filter_by(user_id=1).first().id
+    headers = [{'Authorization': 'Bearer ' + token} for token in tokens]
+    counter = iter(range(sys.maxsize))
+    results = {}
+
+    def verify():
+        with app.test_request_context(headers=headers[next(counter) % users]):
+            verify_jwt_in_request()
+
+    def context_only():
+        with app.test_request_context(headers=headers[next(counter) % users]):
+            pass
+
+    # The request context is created by every request anyway, so it is
+    # subtracted from the token check
+    context = measure(context_only, repeat=repeat, warmup=users)['mean_ms']
+    results['token check'] = (measure(verify, repeat=repeat, warmup=users)['mean_ms'] - context) * 1000
+
+    with app.test_request_context(headers=headers[0]):
+        verify_jwt_in_request()
+        claims = get_jwt()
+        results['revocation check'] = measure(
+            lambda: token_service.is_token_revoked({}, claims), repeat=repeat, warmup=100
+        )['mean_ms'] * 1000
+
+    client = app.test_client()
+    path = f'/api/v1/tasks/{task_id}'
+
+    def request():
+        response = client.get(path, headers=headers[0])
+        assert response.status_code in (200, 404), response.status_code
+
+    results['GET /tasks/<id>'] = measure(request, repeat=max(repeat // 10, 100), warmup=100)['mean_ms'] * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100, help='Users whose tokens requests cycle through')
+    parser.add_argument('--repeat', type=int, default=20000)
+    args = parser.parse_args()
+
+    uncached = create(0)
+    db_path = uncached.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    with uncached.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=args.users * 10)
+    cached = create(10000, db_path)
+
+    before = run(uncached, args.users, args.repeat)
+    after = run(cached, args.users, args.repeat)
+    revocation = after.pop('revocation check')
+    before.pop('revocation check')
+    for name in before:
+        print('{:<20} uncached {:>8.1f} us  cached {:>8.1f} us  saved {:>8.1f} us ({:.1%})'.format(
+            name, before[name], after[name], before[name] - after[name],
+            (before[name] - after[name]) / before[name] if before[name] else 0
+        ))
+    print(f'{"revocation check":<20} {revocation:>8.1f} us (in-memory lookup, no query)')
+    with cached.app_context():
+        print('Verified token cache:', token_service.get_stats()['claims_cache'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark batch task endpoints against the single-item endpoints.
+
+Creates, updates and deletes the same number of tasks through the Flask
+test client, one request per task and then in batches. Usage::
+
+    python -m benchmarks.batch_writes --tasks 2000 --batch-size 500
+    python -m benchmarks.batch_writes --database-url postgresql://localhost/tasks_bench
+
+A --database-url database is emptied first.
+"""
+
+import argparse
+import time
+
+from app import db
+from .common import create_benchmark_app, seed
+
+
+def login(client, username):
+    """
+    Log in as a seeded user and return the authorization header.
+    """
+    response = client.post('/api/v1/auth/login', json={'username': username, 'password': 'password'})
+    return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+
+
+def report(name, count, elapsed):
+    print('{:<28} {:>8} tasks {:>9.2f}s {:>12.0f} tasks/s'.format(name, count, elapsed, count / elapsed))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--database-url', help='Database to use instead of a temporary SQLite file')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(database_url=args.database_url)
+    with app.app_context():
+        if args.database_url:
+            db.drop_all()
+        db.create_all()
+        seed(users=2, tasks=0)
+    client = app.test_client()
+    headers = login(client, 'user2')
+    n, size = args.tasks, args.batch_size
+    chunks = [range(start, min(start + size, n)) for start in range(0, n, size)]
+
+    def single_create():
+        for i in range(n):
+            client.post('/api/v1/tasks', json={'title': f'Task {i}'}, headers=headers)
+
+    def batch_create():
+        for chunk in chunks:
+            client.post('/api/v1/tasks:batch', json={'tasks': [{'title': f'Task {i}'} for i in chunk]},
+                        headers=headers)
+
+    report('create single', n, timed(single_create))
+    report(f'create batch ({size})', n, timed(batch_create))
+
+    def single_update(offset):
+        for i in range(n):
+            client.put(f'/api/v1/tasks/{offset + i + 1}', json={'status': 'completed'}, headers=headers)
+
+    def batch_update(offset):
+        for chunk in chunks:
+            items = [{'id': offset + i + 1, 'status': 'completed'} for i in chunk]
+            client.patch('/api/v1/tasks:batch', json={'tasks': items}, headers=headers)
+
+    report('update single', n, timed(lambda: single_update(0)))
+    report(f'update batch ({size})', n, timed(lambda: batch_update(n)))
+
+    def single_delete(offset):
+        for i in range(n):
+            client.delete(f'/api/v1/tasks/{offset + i + 1}', headers=headers)
+
+    def batch_delete(offset):
+        for chunk in chunks:
+            client.delete('/api/v1/tasks:batch', json={'ids': [offset + i + 1 for i in chunk]},
+                          headers=headers)
+
+    report('delete single', n, timed(lambda: single_delete(0)))
+    report(f'delete batch ({size})', n, timed(lambda: batch_delete(n)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Shared helpers for the Task Management API benchmarks.
+
+Benchmarks are run from the flask-task-api directory, e.g.
+``python -m benchmarks.task_queries --tasks 1000000``.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from app import create_app
+from app.services.fixture_service import FixtureService
+from config import config
+
+BENCHMARK_PASSWORD_HASH = '$2b$04$HbwaMHKBmBLcLxuC/A3lA.ovVzRGwwMAlvL25Q.j0ZXyzB2JLTrsu'
+
+
+def create_benchmark_app(db_path=None, config_name='testing', database_url=None):
+    """
+    Create an application bound to an on-disk SQLite database.
+
+    Args:
+        db_path (str): Database file path; a temporary file is used if omitted
+        config_name (str): Configuration name passed to create_app
+        database_url (str): Database URL used instead of SQLite, e.g.
+            postgresql://localhost/tasks_bench
+
+    Returns:
+        Flask: Configured Flask application instance
+    """
+    if database_url:
+        app = create_app(config_name)
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+        return app
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='task-api-bench-'), 'bench.db')
+    app = create_app(config_name)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.abspath(db_path)
+    app.config['SQLITE_PRAGMAS'] = config['production'].SQLITE_PRAGMAS
+    return app
+
+
+def seed(users, tasks, seed_value=42, chunk_size=10000):
+    """
+    Fill an empty database with synthetic users and tasks.
+
+    Must be called inside an application context. Every user shares one
+    precomputed password hash for the password 'password'.
+
+    Args:
+        users (int): Number of users to create
+        tasks (int): Number of tasks spread across the users
+        seed_value (int): Random seed for reproducible data
+        chunk_size (int): Rows per executemany batch
+    """
+    FixtureService.generate(
+        users, tasks, seed=seed_value, chunk_size=chunk_size, password_hash=BENCHMARK_PASSWORD_HASH
+    )
+
+
+def as_user(user_id, role='user'):
+    """
+    Build a lightweight stand-in for an authenticated user.
+    """
+    return SimpleNamespace(id=user_id, role=role)
+
+
+def measure(fn, repeat=20, warmup=2):
+    """
+    Time repeated calls of fn.
+
+    Args:
+        fn (callable): Function to benchmark
+        repeat (int): Number of timed calls
+        warmup (int): Number of untimed calls made first
+
+    Returns:
+        dict: p50/p95/p99/mean latency in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples):
+    """
+    Summarize latency samples in milliseconds.
+    """
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99)
+    }
+
+
+def format_summary(name, summary):
+    """
+    Format a latency summary as one report line.
+    """
+    return '{:<40} p50 {:>9.3f} ms  p95 {:>9.3f} ms  p99 {:>9.3f} ms'.format(
+        name, summary['p50_ms'], summary['p95_ms'], summary['p99_ms']
+    )
@@ -0,0 +1,75 @@
+"""
+Benchmark concurrent reads and writes on SQLite with and without engine tuning.
+
+Threads issue a mix of task list reads and task creations through the Flask
+test client for a fixed duration. The untuned run uses the previous
+defaults: a new connection per session and no PRAGMAs. Usage::
+
+    python -m benchmarks.engine_concurrency --threads 16 --seconds 10
+    python -m benchmarks.engine_concurrency --threads 16 --seconds 10 --untuned
+"""
+
+import argparse
+import threading
+import time
+
+from sqlalchemy.pool import NullPool
+
+from app import db
+from .common import create_benchmark_app, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--untuned', action='store_true')
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    if args.untuned:
+        app.config['SQLITE_PRAGMAS'] = {}
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': NullPool}
+    with app.app_context():
+        db.create_all()
+        seed(users=args.threads, tasks=args.threads * 200)
+
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def worker(index):
+        client = app.test_client()
+        response = client.post('/api/v1/auth/login', json={
+            'username': f'user{index + 1}', 'password': 'password'
+        })
+        headers = {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+        writes_every = round(1 / args.write_ratio) if args.write_ratio else 0
+        n = 0
+        while time.monotonic() < deadline:
+            n += 1
+            if writes_every and n % writes_every == 0:
+                response = client.post('/api/v1/tasks', json={'title': f'Task {n}'}, headers=headers)
+                kind = 'writes'
+            else:
+                response = client.get(f'/api/v1/tasks?limit=50&sort=-updated_at&n={n}', headers=headers)
+                kind = 'reads'
+            with lock:
+                counts[kind if response.status_code < 500 else 'errors'] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    label = 'untuned' if args.untuned else 'tuned'
+    print(f'{label}: {args.threads} threads, {args.seconds:.0f}s')
+    print('  reads  {:>8.1f}/s'.format(counts['reads'] / args.seconds))
+    print('  writes {:>8.1f}/s'.format(counts['writes'] / args.seconds))
+    print('  errors {:>8}'.format(counts['errors']))
+
+
+if __name__ == '__main__':
+    main()
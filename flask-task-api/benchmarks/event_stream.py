@@ -0,0 +1,238 @@
+"""
+Measure the cost of idle task event streams and their delivery latency.
+
+Starts the API under uvicorn on a seeded SQLite database and opens
+--subscribers event streams spread over --users users. It reports the
+server's CPU use and memory while the streams are idle, then writes
+--events tasks at --rate per second and reports the time from each write to
+its delivery to the owner's streams. For comparison it measures the server
+CPU used by the same number of clients polling ``GET /tasks/changes`` every
+--poll-interval seconds. Linux only: server CPU and memory are read from
+/proc. Usage::
+
+    python -m benchmarks.event_stream --subscribers 1000 2000 --events 200 --rate 50
+    python -m benchmarks.event_stream --subscribers 1000 --poll-interval 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.utils.timestamps import utcnow
+from .common import create_benchmark_app, format_summary, seed, summarize
+from .serving import free_port, wait_for_port
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def server_usage(pid):
+    """
+    Read the CPU seconds used by a process and its resident memory.
+
+    Returns:
+        tuple: CPU seconds and resident memory in MB
+    """
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    with open(f'/proc/{pid}/status') as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+    return cpu, rss / 1024
+
+
+async def read_head(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1])
+
+
+async def subscribe(port, request, latencies, connected):
+    """
+    Open an event stream and record the delivery latency of its events.
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        status = await read_head(reader)
+        assert status == 200, status
+        connected.append(True)
+        buffer = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            if not size:
+                return
+            buffer += (await reader.readexactly(size + 2))[:-2]
+            *frames, buffer = buffer.split(b'\n\n')
+            received = utcnow()
+            for frame in frames:
+                for line in frame.split(b'\n'):
+                    if line.startswith(b'data: '):
+                        created = datetime.fromisoformat(json.loads(line[6:])['created_at'])
+                        latencies.append((received - created).total_seconds() * 1000)
+    finally:
+        writer.close()
+
+
+async def poll(port, request, interval, duration, latencies):
+    """
+    Request the changes of a user every interval, like a polling client.
+
+    Each request opens a connection: servers close idle keep-alive
+    connections within seconds.
+    """
+    await asyncio.sleep(random.uniform(0, interval))
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status = await read_head(reader)
+            assert status == 200, status
+            await reader.read()
+        finally:
+            writer.close()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+def write_tasks(app, users, count, rate):
+    """
+    Create tasks of random users at a steady rate.
+    """
+    from app.models.user import User
+    from app.services.task_service import TaskService
+
+    with app.app_context():
+        owners = [db.session.get(User, user_id) for user_id in range(2, users + 1)]
+        started = time.monotonic()
+        for index in range(count):
+            TaskService.create_task({'title': f'event {index}'}, random.choice(owners))
+            time.sleep(max(started + (index + 1) / rate - time.monotonic(), 0))
+        db.session.remove()
+
+
+async def measure_streams(app, pid, port, tokens, args, subscribers):
+    """
+    Open streams, measure them idle and while tasks are written, and close them.
+    """
+    requests = [
+        (f'GET /api/v1/tasks/events HTTP/1.1\r\nHost: localhost\r\n'
+         f'Authorization: Bearer {tokens[index % len(tokens)]}\r\n\r\n').encode('latin-1')
+        for index in range(subscribers)
+    ]
+    _, rss_before = server_usage(pid)
+    latencies, connected = [], []
+    started = time.monotonic()
+    streams = []
+    for request in requests:
+        streams.append(asyncio.ensure_future(subscribe(port, request, latencies, connected)))
+        await asyncio.sleep(0)
+    while len(connected) < subscribers:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.monotonic() - started
+
+    cpu, _ = server_usage(pid)
+    await asyncio.sleep(args.idle)
+    idle_cpu, rss_idle = server_usage(pid)
+    await asyncio.to_thread(write_tasks, app, args.users, args.events, args.rate)
+    await asyncio.sleep(1)
+    busy_cpu, _ = server_usage(pid)
+    for stream in streams:
+        stream.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+    return {
+        'connect_seconds': connect_seconds,
+        'rss_mb': rss_idle - rss_before,
+        'idle_cpu': (idle_cpu - cpu) / args.idle,
+        'busy_cpu': busy_cpu - idle_cpu,
+        'latencies': latencies,
+    }
+
+
+async def measure_polling(pid, port, tokens, args, clients):
+    """
+    Run clients polling the changes feed and measure the server's CPU use.
+    """
+    requests = [
+        (f'GET /api/v1/tasks/changes?since={args.cursor} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+         f'Authorization: Bearer {tokens[index % len(tokens)]}\r\n\r\n').encode('latin-1')
+        for index in range(clients)
+    ]
+    latencies = []
+    cpu, _ = server_usage(pid)
+    started = time.monotonic()
+    await asyncio.gather(*(
+        poll(port, request, args.poll_interval, args.idle, latencies) for request in requests
+    ))
+    elapsed = time.monotonic() - started
+    used, _ = server_usage(pid)
+    return {'cpu': (used - cpu) / elapsed, 'rps': len(latencies) / elapsed, 'latencies': latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1000, 2000])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=200, help='Tasks written while the streams are open')
+    parser.add_argument('--rate', type=float, default=50, help='Tasks written per second')
+    parser.add_argument('--idle', type=float, default=10, help='Seconds of each idle measurement')
+    parser.add_argument('--poll-interval', type=float, default=5, help='Seconds between requests of a polling client')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(config_name='production')
+    db_url = app.config['SQLALCHEMY_DATABASE_URI']
+    with app.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=args.tasks)
+        # User 1 is an admin, whose streams receive every event
+        tokens = [create_access_token(identity=str(user_id)) for user_id in range(2, args.users + 1)]
+        from app.services.task_service import TaskService
+        from app.models.user import User
+        args.cursor = TaskService.get_changes(db.session.get(User, 2), None, 1)['cursor']
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=db_url,
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        RATELIMIT_TASK_READS='1000000000/hour',
+        JOB_WORKERS_IN_PROCESS='0',
+        LOG_LEVEL='WARNING',
+    )
+    server = subprocess.Popen(
+        f'uvicorn asgi:app --port {port} --no-access-log --backlog 4096'.split(),
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        for subscribers in args.subscribers:
+            streams = asyncio.run(measure_streams(app, server.pid, port, tokens, args, subscribers))
+            expected = args.events * subscribers / len(tokens)
+            print(f"{subscribers} streams: connected in {streams['connect_seconds']:.1f}s, "
+                  f"+{streams['rss_mb']:.0f} MB server memory, idle server CPU {streams['idle_cpu']:.1%}, "
+                  f"{args.events} writes in {streams['busy_cpu']:.2f} CPU s, "
+                  f"~{len(streams['latencies']) / expected:.0%} of deliveries received")
+            print(format_summary('  write to delivery', summarize(streams['latencies'])))
+            polling = asyncio.run(measure_polling(server.pid, port, tokens, args, subscribers))
+            print(f"{subscribers} clients polling every {args.poll_interval:g}s: "
+                  f"server CPU {polling['cpu']:.1%}, {polling['rps']:.0f} req/s")
+            print(format_summary('  poll request', summarize(polling['latencies'])))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
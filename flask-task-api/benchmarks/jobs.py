@@ -0,0 +1,95 @@
+"""
+Benchmark background job throughput and worker utilization.
+
+Queues export and import jobs, runs them with workers of increasing
+concurrency and reports jobs per second, thread utilization and run time.
+It also checks that every job ran exactly once. Usage::
+
+    python -m benchmarks.jobs --jobs 200 --concurrency 1 2 4 8
+    python -m benchmarks.jobs --kind export_tasks --tasks 100000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+from app import db
+from app.models.job import Job
+from app.services.job_service import JobService
+from app.services.job_worker import JobWorker
+from .common import as_user, create_benchmark_app, format_summary, seed, summarize
+
+KINDS = ('export_tasks', 'import_tasks')
+
+
+def run_case(app, kind, jobs, concurrency, import_size):
+    """
+    Queue jobs and run them with a worker of the given concurrency.
+
+    Returns:
+        tuple: Wall time, worker statistics, run time summary and the IDs
+            of jobs that did not succeed on their first attempt
+    """
+    with app.test_request_context():
+        Job.query.delete()
+        db.session.commit()
+        for index in range(jobs):
+            user = as_user(index % 10 + 1)
+            if kind == 'export_tasks':
+                JobService.submit_job(kind, {'filters': {}, 'sort': 'id'}, user)
+            else:
+                items = [{'title': f'Imported {index}-{item}'} for item in range(import_size)]
+                JobService.submit_job(kind, {'tasks': items}, user, total=import_size)
+
+    worker = JobWorker(app, concurrency, poll_interval=0.05)
+    start = time.perf_counter()
+    worker.start()
+    with app.app_context():
+        while Job.query.filter(Job.status.in_(('queued', 'running'))).count():
+            db.session.remove()
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        worker.stop()
+        finished = Job.query.all()
+        bad = [job.id for job in finished if job.status != 'succeeded' or job.attempts != 1]
+        run_times = [(job.finished_at - job.started_at).total_seconds() * 1000 for job in finished]
+    stats = worker.get_stats()
+    return elapsed, stats, summarize(run_times), bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--kind', action='append', choices=KINDS,
+                        help='Job kind to run; repeat for several (default: all)')
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=20000, help='Tasks in the database, exported by export jobs')
+    parser.add_argument('--import-size', type=int, default=500, help='Tasks created by each import job')
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    app.config.update(
+        JOB_EXPORT_DIR=tempfile.mkdtemp(prefix='task-api-exports-'),
+        JOB_WORKERS_IN_PROCESS=0
+    )
+    with app.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=args.tasks)
+
+    failures = []
+    for kind in args.kind or KINDS:
+        print(f'\n{kind}: {args.jobs} jobs')
+        for concurrency in args.concurrency:
+            elapsed, stats, run_times, bad = run_case(app, kind, args.jobs, concurrency, args.import_size)
+            failures.extend(bad)
+            print(format_summary(f'{concurrency} threads, run time', run_times) +
+                  '  {:>7.1f} jobs/s  {:>4.0%} utilization'.format(args.jobs / elapsed, stats['utilization']))
+
+    if failures:
+        sys.exit(f'Jobs not run exactly once: {failures}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark login latency under concurrency, with and without the hashing pool.
+
+Runs a storm of concurrent logins while another thread keeps reading the
+task list, and reports login and task-read latency plus shed requests.
+Usage::
+
+    python -m benchmarks.login_concurrency --workers 0 --concurrency 32
+    python -m benchmarks.login_concurrency --workers 4 --concurrency 32
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app import db
+from app.models.user import User
+from .common import create_benchmark_app, format_summary, seed, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=0, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--max-pending', type=int, default=16, help='PASSWORD_HASH_MAX_PENDING')
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_ROUNDS')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--logins', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    app.config.update(
+        BCRYPT_ROUNDS=args.rounds,
+        PASSWORD_HASH_WORKERS=args.workers,
+        PASSWORD_HASH_MAX_PENDING=args.max_pending
+    )
+    with app.app_context():
+        db.create_all()
+        seed(users=args.concurrency, tasks=args.concurrency * 10)
+        password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt(args.rounds)).decode('utf-8')
+        User.query.update({'password_hash': password_hash})
+        db.session.commit()
+
+    reader = app.test_client()
+    token = reader.post('/api/v1/auth/login', json={'username': 'user1', 'password': 'password'})
+    headers = {'Authorization': 'Bearer ' + token.get_json()['access_token']}
+
+    statuses = {}
+    login_samples = []
+    read_samples = []
+    done = threading.Event()
+
+    def login(i):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/api/v1/auth/login', json={
+            'username': f'user{i % args.concurrency + 1}', 'password': 'password'
+        })
+        elapsed = (time.perf_counter() - start) * 1000
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            login_samples.append(elapsed)
+
+    def read_tasks():
+        while not done.is_set():
+            start = time.perf_counter()
+            reader.get('/api/v1/tasks', headers=headers)
+            read_samples.append((time.perf_counter() - start) * 1000)
+
+    read_thread = threading.Thread(target=read_tasks)
+    read_thread.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    read_thread.join()
+
+    print(f'workers={args.workers} rounds={args.rounds} concurrency={args.concurrency}')
+    print(f'{args.logins} logins in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), statuses {statuses}')
+    if login_samples:
+        print(format_summary('login', summarize(login_samples)))
+    if read_samples:
+        print(format_summary('GET /tasks during storm', summarize(read_samples)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark the overhead of the request and SQL metrics.
+
+Times the same requests through the Flask test client with metrics
+disabled and enabled. Each run is a separate process, since the engine
+listeners stay registered once enabled; runs alternate between the two
+modes and the median of each mode is reported. Usage::
+
+    python -m benchmarks.metrics --tasks 10000 --repeat 2000 --rounds 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from app import db
+from config import config
+from .batch_writes import login
+from .common import create_benchmark_app, measure, seed
+
+REQUESTS = (
+    ('GET /tasks/<id>', '/api/v1/tasks/{task_id}'),
+    ('GET /tasks?limit=100', '/api/v1/tasks?limit=100'),
+    ('GET /tasks/stats', '/api/v1/tasks/stats'),
+)
+
+
+def run(enabled, repeat, db_path):
+    """
+    Time each request of REQUESTS with metrics enabled or disabled.
+
+    Returns:
+        dict: Mean latency in milliseconds of each request
+    """
+    settings = config['production']
+    settings.METRICS_ENABLED = enabled
+    # Slow query logs, rate limits and job polling would blur the timings
+    settings.SQL_SLOW_QUERY_MS = 0
+    settings.RATELIMIT_ENABLED = False
+    settings.JOB_WORKERS_IN_PROCESS = 0
+    app = create_benchmark_app(db_path, config_name='production')
+    client = app.test_client()
+    headers = login(client, 'user2')
+    with app.app_context():
+        from app.models.task import Task
+        task_id = db.session.query(Task.id).filter_by(user_id=2).first().id
+    results = {}
+    for name, url in REQUESTS:
+        path = url.format(task_id=task_id)
+        results[name] = measure(lambda: client.get(path, headers=headers), repeat=repeat, warmup=50)['mean_ms']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--run', choices=('on', 'off'), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run == 'on', args.repeat, args.db)))
+        return
+
+    app = create_benchmark_app(config_name='production')
+    db_path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    with app.app_context():
+        db.create_all()
+        seed(users=10, tasks=args.tasks)
+
+    samples = {'off': [], 'on': []}
+    for _ in range(args.rounds):
+        for mode in samples:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.metrics', '--run', mode, '--db', db_path,
+                 '--repeat', str(args.repeat)],
+                check=True, capture_output=True, text=True, cwd=os.getcwd()
+            ).stdout
+            samples[mode].append(json.loads(output.splitlines()[-1]))
+
+    for name, _ in REQUESTS:
+        off = statistics.median(run[name] for run in samples['off'])
+        on = statistics.median(run[name] for run in samples['on'])
+        print('{:<24} off {:>7.3f} ms  on {:>7.3f} ms  overhead {:>+7.1f} us ({:+.1%})'.format(
+            name, off, on, (on - off) * 1000, (on - off) / off
+        ))
+
+
+if __name__ == '__main__':
+    main()
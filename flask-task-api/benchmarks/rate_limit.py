@@ -0,0 +1,135 @@
+"""
+Benchmark the per-request overhead of the rate limiter and its storage.
+
+Times the same authenticated request with the limiter disabled and enabled
+for each strategy, and fails if the added p50 latency exceeds the budget.
+Without --storage-uri a fakeredis TCP server (``pip install fakeredis
+lupa``) is started as a local Redis stand-in. Usage::
+
+    python -m benchmarks.rate_limit --requests 2000 --budget-ms 1.0
+    python -m benchmarks.rate_limit --storage-uri redis://localhost:6379/0
+    python -m benchmarks.rate_limit --storage-uri memory://
+"""
+
+import argparse
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask_jwt_extended import create_access_token
+
+from app import db, limiter
+from .common import create_benchmark_app, format_summary, measure, seed
+
+STRATEGIES = ('fixed-window', 'sliding-window-counter', 'moving-window')
+
+
+def start_fake_redis():
+    """
+    Start fakeredis' TCP server in a background thread.
+
+    Returns:
+        str: Storage URI of the server
+    """
+    try:
+        from fakeredis import TcpFakeServer
+    except ImportError:
+        sys.exit('No --storage-uri given and fakeredis is not installed: pip install fakeredis lupa')
+    server = TcpFakeServer(('127.0.0.1', 0), server_type='redis')
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return 'redis://{}:{}/0'.format(*server.server_address)
+
+
+def preload_scripts(storage_uri):
+    """
+    Load the limits Lua scripts into Redis before the first request.
+
+    fakeredis drops the connection on EVALSHA of an unknown script instead
+    of answering NOSCRIPT, so the scripts must be cached up front.
+    """
+    import redis
+    from limits.storage import RedisStorage
+
+    client = redis.Redis.from_url(storage_uri)
+    for name in dir(RedisStorage):
+        if name.startswith('SCRIPT_'):
+            client.script_load(getattr(RedisStorage, name))
+
+
+def run_case(storage_uri, strategy, users, requests, headers_enabled):
+    """
+    Time requests in a fresh process with the limiter off and on.
+
+    Returns:
+        tuple: Latency summaries without and with the limiter
+    """
+    def time_requests(app):
+        with app.app_context():
+            db.create_all()
+            seed(users=users, tasks=users * 10)
+            tokens = [create_access_token(identity=str(user_id)) for user_id in range(1, users + 1)]
+        client = app.test_client()
+        headers = [{'Authorization': 'Bearer ' + token} for token in tokens]
+        counter = iter(range(sys.maxsize))
+
+        def request():
+            response = client.get('/api/v1/tasks/stats', headers=headers[next(counter) % users])
+            assert response.status_code == 200, response.status_code
+
+        return measure(request, repeat=requests, warmup=100)
+
+    baseline = time_requests(create_benchmark_app())
+
+    # The limiter registers its hooks on init_app, before the app serves requests
+    app = create_benchmark_app()
+    app.config.update(
+        RATELIMIT_ENABLED=True,
+        RATELIMIT_STORAGE_URI=storage_uri,
+        RATELIMIT_STRATEGY=strategy,
+        RATELIMIT_HEADERS_ENABLED=headers_enabled,
+        RATELIMIT_SWALLOW_ERRORS=False,
+        RATELIMITS={**app.config['RATELIMITS'], 'task_reads': '1000000/hour'}
+    )
+    limiter.init_app(app)
+    return baseline, time_requests(app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--storage-uri', help='Limiter storage; defaults to a fakeredis server')
+    parser.add_argument('--strategy', action='append', choices=STRATEGIES,
+                        help='Strategy to measure; repeat for several (default: all)')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--headers', action='store_true',
+                        help='Enable X-RateLimit-* headers, which read the window again')
+    parser.add_argument('--budget-ms', type=float, default=1.0,
+                        help='Maximum p50 overhead per request')
+    args = parser.parse_args()
+
+    storage_uri = args.storage_uri or start_fake_redis()
+    if storage_uri.startswith('redis'):
+        preload_scripts(storage_uri)
+
+    over_budget = False
+    print(f'storage {storage_uri}, headers {"on" if args.headers else "off"}')
+    for strategy in args.strategy or STRATEGIES:
+        # Flask-Limiter keeps its strategy once set, so each case gets its own process
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            baseline, limited = executor.submit(
+                run_case, storage_uri, strategy, args.users, args.requests, args.headers
+            ).result()
+        overhead = limited['p50_ms'] - baseline['p50_ms']
+        over_budget = over_budget or overhead > args.budget_ms
+        print(f'\n{strategy}')
+        print(format_summary('limiter off', baseline))
+        print(format_summary('limiter on', limited))
+        print(f'p50 overhead {overhead:.3f} ms (budget {args.budget_ms:.3f} ms)')
+
+    if over_budget:
+        sys.exit('Rate limiter overhead exceeds the budget')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark the per-tick latency of the due date scheduler.
+
+For each table size, generates synthetic tasks (due dates spread over the
+past year and the next two months), then runs scheduler ticks on a
+simulated clock advancing by --interval seconds per tick, and reports the
+tick latency and the tasks reported per tick. For comparison it times the
+query a scheduler without a high-water mark would run every tick: all open
+tasks due before the reminder horizon. Usage::
+
+    python -m benchmarks.scheduler --tasks 10000 100000 1000000 --ticks 200
+    python -m benchmarks.scheduler --tasks 1000000 --interval 3600 --sink log
+"""
+
+import argparse
+import logging
+from datetime import timedelta
+
+from app import db
+from app.utils.timestamps import utcnow
+from config import config
+from .common import create_benchmark_app, format_summary, measure, seed
+
+
+def run(tasks, args):
+    """
+    Generate tasks and time scheduler ticks and the full scan query.
+
+    Returns:
+        tuple: Tick latency summary, tasks reported per tick, and the full
+            scan latency summary
+    """
+    from app.models.task import Task
+    from app.services.event_sinks import configured_sinks
+    from app.services.scheduler_service import SchedulerService
+
+    app = create_benchmark_app(config_name='production')
+    with app.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=tasks)
+        sinks = configured_sinks() if args.sink != 'none' else []
+        now = utcnow()
+        SchedulerService.tick(now=now, sinks=sinks)
+
+        reported = []
+        clock = iter(now + timedelta(seconds=args.interval * tick) for tick in range(1, args.ticks + 1))
+
+        def tick():
+            reported.append(sum(SchedulerService.tick(now=next(clock), sinks=sinks).values()))
+
+        ticks = measure(tick, repeat=args.ticks, warmup=0)
+
+        horizon = now + timedelta(seconds=app.config['SCHEDULER_REMINDER_LEAD'])
+
+        def full_scan():
+            db.session.query(Task.id, Task.user_id, Task.title, Task.status, Task.priority, Task.due_date).filter(
+                Task.due_date <= horizon, Task.status != 'completed'
+            ).all()
+            db.session.rollback()
+
+        scan = measure(full_scan, repeat=args.scan_repeat, warmup=1)
+    return ticks, sum(reported) / len(reported), scan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--ticks', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=60, help='Simulated seconds between ticks')
+    parser.add_argument('--sink', default='outbox', help="SCHEDULER_SINKS value, or 'none'")
+    parser.add_argument('--scan-repeat', type=int, default=5, help='Runs of the full scan query')
+    args = parser.parse_args()
+
+    settings = config['production']
+    settings.SCHEDULER_SINKS = args.sink
+    settings.SQL_SLOW_QUERY_MS = 0
+    settings.JOB_WORKERS_IN_PROCESS = 0
+    settings.LOG_LEVEL = 'WARNING'
+    logging.getLogger('app.services.event_sinks').setLevel(logging.WARNING)
+
+    for tasks in args.tasks:
+        ticks, per_tick, scan = run(tasks, args)
+        print(f'{tasks} tasks, {args.interval:g}s per tick, {per_tick:.1f} tasks reported per tick')
+        print(format_summary('  tick', ticks))
+        print(format_summary('  full scan', scan))
+
+
+if __name__ == '__main__':
+    main()
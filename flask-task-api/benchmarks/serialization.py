@@ -0,0 +1,56 @@
+"""
+Microbenchmark task list serialization.
+
+Compares loading ORM instances with to_dict() and the standard library JSON
+provider against selecting task columns as rows with Task.row_to_dict() and
+the orjson provider. Usage::
+
+    python -m benchmarks.serialization --tasks 10000 100000
+"""
+
+import argparse
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import db
+from app.models.task import Task
+from app.utils.json_provider import OrjsonProvider
+from .common import create_benchmark_app, format_summary, measure, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app)
+    with app.app_context():
+        db.create_all()
+        seed(users=1, tasks=max(args.tasks))
+
+        for count in args.tasks:
+            def orm_stdlib():
+                tasks = Task.query.order_by(Task.id).limit(count).all()
+                stdlib.response([task.to_dict() for task in tasks])
+                db.session.expunge_all()
+
+            def rows_stdlib():
+                rows = db.session.query(*Task.__table__.columns).order_by(Task.id).limit(count)
+                stdlib.response([Task.row_to_dict(row) for row in rows])
+
+            def rows_orjson():
+                rows = db.session.query(*Task.__table__.columns).order_by(Task.id).limit(count)
+                fast.response([Task.row_to_dict(row) for row in rows])
+
+            print(f'\n{count} tasks')
+            for name, fn in [('ORM + to_dict + stdlib json', orm_stdlib),
+                             ('rows + row_to_dict + stdlib json', rows_stdlib),
+                             ('rows + row_to_dict + orjson', rows_orjson)]:
+                print(format_summary(name, measure(fn, repeat=args.repeat, warmup=1)))
+
+
+if __name__ == '__main__':
+    main()
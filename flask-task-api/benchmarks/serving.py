@@ -0,0 +1,201 @@
+"""
+Compare request throughput of the WSGI and ASGI serving modes under load.
+
+Starts the API in each mode on a seeded SQLite database and drives it with
+many concurrent keep-alive connections. With --slow-ms every client sends
+its request headers in two parts with a pause in between, like clients on
+slow networks, which holds a synchronous worker for the whole pause.
+Usage::
+
+    python -m benchmarks.serving --concurrency 200 --duration 10
+    python -m benchmarks.serving --mode gunicorn --mode uvicorn --slow-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from .common import create_benchmark_app, format_summary, seed, summarize
+
+# Server command of each mode; {workers}, {threads} and {port} are filled in
+MODES = {
+    'gunicorn': 'gunicorn -w {workers} -b 127.0.0.1:{port} app:create_app("production")',
+    'gthread': 'gunicorn -w {workers} --threads {threads} -b 127.0.0.1:{port} app:create_app("production")',
+    'uvicorn-wsgi': 'uvicorn asgi:app --workers {workers} --port {port} --no-access-log',
+    'uvicorn': 'uvicorn asgi:app --workers {workers} --port {port} --no-access-log',
+}
+
+
+async def _request(reader, writer, request, slow_ms):
+    """
+    Send one request on a keep-alive connection and read the whole response.
+
+    Returns:
+        tuple: HTTP status code and whether the server keeps the connection open
+    """
+    if slow_ms:
+        split = request.index(b'\r\n') + 2
+        writer.write(request[:split])
+        await writer.drain()
+        await asyncio.sleep(slow_ms / 1000)
+        request = request[split:]
+    writer.write(request)
+    await writer.drain()
+
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:] if line)
+    headers = {name.lower(): value for name, value in headers.items()}
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        # Streamed responses: read chunks until the empty last one
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(lines[0].split(' ', 2)[1]), headers.get('connection', '').lower() != 'close'
+
+
+async def run_load(port, requests, concurrency, duration, slow_ms=0, once=False):
+    """
+    Drive a server with concurrent keep-alive connections for a duration.
+
+    Args:
+        port (int): Port of the server on localhost
+        requests (list): Raw HTTP/1.1 requests, sent round-robin
+        concurrency (int): Number of simultaneous connections
+        duration (float): Seconds to run
+        slow_ms (int): Pause in the middle of each request's headers
+        once (bool): Send each request at most once, for requests that
+            cannot be repeated such as deletes; stops early when all are sent
+
+    Returns:
+        dict: Latency summary (see summarize) plus 'rps' and status counts
+    """
+    samples = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+    # Next request to send in once mode, shared by all connections
+    shared = iter(requests)
+
+    async def client(index):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            sent = index
+            request = next(shared, None) if once else requests[sent % len(requests)]
+            while request is not None and time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    status, keep_alive = await _request(reader, writer, request, slow_ms)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    status, keep_alive = 'error', False
+                else:
+                    samples.append((time.perf_counter() - start) * 1000)
+                    sent += 1
+                    request = next(shared, None) if once else requests[sent % len(requests)]
+                statuses[status] = statuses.get(status, 0) + 1
+                if not keep_alive:
+                    # gunicorn's sync workers close the connection after each response
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = summarize(samples) if samples else {'count': 0}
+    summary.update(rps=len(samples) / elapsed, statuses=statuses)
+    return summary
+
+
+def wait_for_port(port, timeout=30):
+    """
+    Wait until a server accepts connections on a local port.
+
+    Raises:
+        TimeoutError: If the server does not start in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f'Server did not start on port {port}')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        help='Serving mode to measure; repeat for several (default: all)')
+    parser.add_argument('--workers', type=int, default=2, help='Server processes')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per gthread worker')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--slow-ms', type=int, default=0,
+                        help='Pause in the middle of each request, simulating slow clients')
+    parser.add_argument('--path', default='/api/v1/tasks?limit=20')
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    db_url = app.config['SQLALCHEMY_DATABASE_URI']
+    with app.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=args.tasks)
+        tokens = [create_access_token(identity=str(user_id)) for user_id in range(1, args.users + 1)]
+    requests = [
+        (f'GET {args.path} HTTP/1.1\r\nHost: localhost\r\n'
+         f'Authorization: Bearer {token}\r\n\r\n').encode('latin-1')
+        for token in tokens
+    ]
+
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=db_url,
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        RATELIMIT_TASK_READS='1000000000/hour',
+    )
+    print(f'{args.tasks} tasks, {args.concurrency} connections, '
+          f'{args.workers} workers, slow clients {args.slow_ms} ms')
+    for mode in args.mode or MODES:
+        port = free_port()
+        command = MODES[mode].format(workers=args.workers, threads=args.threads, port=port)
+        server = subprocess.Popen(
+            command.split(),
+            env=dict(env, ASGI_NATIVE_VIEWS=str(mode == 'uvicorn').lower()),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_port(port)
+            summary = asyncio.run(run_load(port, requests, args.concurrency, args.duration, args.slow_ms))
+        finally:
+            server.terminate()
+            server.wait()
+        if not summary['count']:
+            sys.exit(f'{mode}: no successful requests {summary["statuses"]}')
+        print(format_summary(mode, summary) + '  {:>8.0f} req/s  {}'.format(summary['rps'], summary['statuses']))
+
+
+if __name__ == '__main__':
+    main()
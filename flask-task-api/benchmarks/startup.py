@@ -0,0 +1,180 @@
+"""
+Benchmark application import time and gunicorn startup.
+
+Imports the server entry point (wsgi.py) and the development one (app.py,
+which creates the tables), and creates the application with and without the
+``flask`` commands, each in a fresh interpreter. It also times
+gunicorn from launch to its first response with and without --preload.
+The -X importtime output of the entry point is summed per top-level
+package to show where import time goes. Results can be saved as JSON and
+compared with a previous run, failing when startup got slower. Usage::
+
+    python -m benchmarks.startup --runs 5 --output before.json
+    python -m benchmarks.startup --baseline before.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+
+from .serving import free_port
+
+# Name -> statement timed in a fresh interpreter
+IMPORTS = {
+    'app.py (development)': "import runpy; runpy.run_path('app.py')",
+    'import wsgi': 'import wsgi',
+    'create_app (cli)': "from app import create_app; create_app('production')",
+    'create_app (server)': "from app import create_app; create_app('production', cli=False)",
+}
+
+TIMER = 'import time; start = time.perf_counter(); {}; print((time.perf_counter() - start) * 1000)'
+
+
+def import_breakdown(stderr):
+    """
+    Sum the self time of -X importtime lines per top-level package.
+
+    Returns:
+        Counter: Package name -> milliseconds
+    """
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1000
+    return packages
+
+
+def time_import(statement, env, importtime=False):
+    """
+    Time a statement in a fresh interpreter.
+
+    Args:
+        statement (str): Python statement to run
+        env (dict): Environment of the interpreter
+        importtime (bool): Run with -X importtime, which slows imports down
+
+    Returns:
+        tuple: Milliseconds, and the per-package import breakdown
+    """
+    options = ['-X', 'importtime'] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *options, '-c', TIMER.format(statement)],
+        env=env, check=True, capture_output=True, text=True
+    )
+    return float(result.stdout.splitlines()[-1]), import_breakdown(result.stderr)
+
+
+def time_gunicorn(env, workers, preload, timeout=30):
+    """
+    Time gunicorn from launch until it answers /api/health.
+
+    Returns:
+        float: Milliseconds
+    """
+    port = free_port()
+    command = [
+        'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'wsgi:app'
+    ]
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        command, env=dict(env, GUNICORN_PRELOAD=str(preload).lower()),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                # Accepted connections wait in the backlog until a worker is ready
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=timeout):
+                    return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError('gunicorn did not answer in time')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare the median times of two runs.
+
+    Returns:
+        list: Descriptions of the measurements slower than the baseline by
+            more than threshold
+    """
+    regressions = []
+    for name, value in current['results'].items():
+        old = baseline['results'].get(name)
+        if old and value > old * (1 + threshold):
+            regressions.append(f'{name}: {old:.1f} -> {value:.1f} ms')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help='Runs of each measurement; medians are reported')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--top', type=int, default=15, help='Packages shown in the import breakdown')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that fails the comparison (default: 0.2)')
+    args = parser.parse_args()
+
+    database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='task-api-bench-'), 'startup.db')
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=database_url,
+        DEV_DATABASE_URL=database_url,
+        JOB_WORKERS_IN_PROCESS='0',
+        LOG_LEVEL='WARNING',
+    )
+    samples = {name: [] for name in IMPORTS}
+    samples.update({'gunicorn': [], 'gunicorn --preload': []})
+    breakdowns = []
+    for _ in range(args.runs):
+        for name, statement in IMPORTS.items():
+            samples[name].append(time_import(statement, env)[0])
+        breakdowns.append(time_import(IMPORTS['import wsgi'], env, importtime=True)[1])
+        samples['gunicorn'].append(time_gunicorn(env, args.workers, preload=False))
+        samples['gunicorn --preload'].append(time_gunicorn(env, args.workers, preload=True))
+
+    results = {name: statistics.median(values) for name, values in samples.items()}
+    packages = {
+        package: statistics.median(breakdown[package] for breakdown in breakdowns)
+        for package in breakdowns[0]
+    }
+    print(f'Import time of wsgi by top-level package (-X importtime self time, median of {args.runs}):')
+    for package, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'  {package:<28} {elapsed:>8.1f} ms')
+    print(f'  {"total":<28} {sum(packages.values()):>8.1f} ms')
+    for name, elapsed in results.items():
+        print(f'{name:<28} {elapsed:>10.1f} ms')
+
+    current = {'results': results, 'imports': packages}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(current, output, indent=2)
+        print(f'Results written to {args.output}')
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(current, json.load(baseline_file), args.threshold)
+        print(f'Compared with {args.baseline}: {len(regressions)} regressions')
+        for regression in regressions:
+            print('  ' + regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
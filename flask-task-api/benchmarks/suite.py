@@ -0,0 +1,521 @@
+"""
+Benchmark every auth and task endpoint and compare the results across commits.
+
+Seeds users and tasks through the models, then measures each endpoint of
+auth_routes and task_routes through the Flask test client and through a
+gunicorn server, reporting throughput, p50/p95/p99 latency and the SQL
+statements run per request (read from /api/metrics). Results can be saved
+as JSON and compared with a previous run; the run fails when an endpoint
+got slower or runs more statements than the baseline allows. Usage::
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --baseline before.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from config import config
+from .common import as_user, create_benchmark_app, format_summary, seed, summarize
+from .serving import MODES, free_port, run_load, wait_for_port
+
+DRIVERS = ('client', 'gunicorn')
+
+# Regular user whose tasks are read and changed; user1 is the admin
+USER_ID = 2
+# Owner of the tasks created for deletes, kept apart so that they do not
+# change the reads of USER_ID
+POOL_USER_ID = 3
+
+# build(context, index, fresh) returns the request to send as a dict with
+# 'path' and optional 'headers', 'json', or 'data' and 'content_type'.
+# fresh holds the IDs of `pool` tasks created for this request alone, and
+# unique requests are never sent twice.
+Scenario = namedtuple('Scenario', 'name method pool unique build')
+
+
+def _import_body(context, index):
+    lines = (
+        json.dumps({'title': f'Imported {index}-{item}', 'priority': 'low'})
+        for item in range(context.batch_size)
+    )
+    return {
+        'path': '/api/v1/tasks/import', 'headers': context.user,
+        'data': '\n'.join(lines).encode(), 'content_type': 'application/x-ndjson'
+    }
+
+
+def _task_id(context, index):
+    return context.task_ids[index % len(context.task_ids)]
+
+
+SCENARIOS = (
+    Scenario('POST /auth/register', 'POST', 0, True, lambda context, index, fresh: {
+        'path': '/api/v1/auth/register',
+        'json': {
+            'username': f'bench-{context.run_id}-{index}',
+            'email': f'bench-{context.run_id}-{index}@example.com',
+            'password': 'password'
+        }
+    }),
+    Scenario('POST /auth/login', 'POST', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/auth/login',
+        'json': {'username': f'user{2 + index % (context.users - 1)}', 'password': 'password'}
+    }),
+    Scenario('POST /auth/logout', 'POST', 0, True, lambda context, index, fresh: {
+        'path': '/api/v1/auth/logout', 'headers': {'Authorization': f'Bearer {context.logout_tokens[index]}'}
+    }),
+    Scenario('GET /tasks', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks?limit=20', 'headers': context.user
+    }),
+    Scenario('GET /tasks (filtered)', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks?limit=20&status=pending,in_progress&sort=-due_date', 'headers': context.user
+    }),
+    Scenario('GET /tasks (ndjson)', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks?limit=100', 'headers': dict(context.user, Accept='application/x-ndjson')
+    }),
+    Scenario('GET /tasks/changes', 'GET', 0, False, lambda context, index, fresh: {
+        'path': f'/api/v1/tasks/changes?limit=100&since={context.changes_cursor}', 'headers': context.user
+    }),
+    Scenario('GET /tasks/search', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks/search?q=report&limit=20', 'headers': context.user
+    }),
+    Scenario('GET /tasks/stats', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks/stats', 'headers': context.user
+    }),
+    Scenario('GET /tasks/<id>', 'GET', 0, False, lambda context, index, fresh: {
+        'path': f'/api/v1/tasks/{_task_id(context, index)}', 'headers': context.user
+    }),
+    Scenario('GET /tasks/export', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks/export?format=csv', 'headers': context.user
+    }),
+    Scenario('POST /tasks', 'POST', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks', 'headers': context.user,
+        'json': {'title': f'Benchmark task {index}', 'priority': 'high', 'due_date': '2030-01-01T00:00:00'}
+    }),
+    Scenario('PUT /tasks/<id>', 'PUT', 0, False, lambda context, index, fresh: {
+        'path': f'/api/v1/tasks/{_task_id(context, index)}', 'headers': context.user,
+        'json': {'status': ('pending', 'in_progress', 'completed')[index % 3]}
+    }),
+    Scenario('DELETE /tasks/<id>', 'DELETE', 1, True, lambda context, index, fresh: {
+        'path': f'/api/v1/tasks/{fresh[0]}', 'headers': context.pool_user
+    }),
+    Scenario('POST /tasks:batch', 'POST', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks:batch', 'headers': context.user,
+        'json': {'tasks': [{'title': f'Batch task {index}-{item}'} for item in range(context.batch_size)]}
+    }),
+    Scenario('PATCH /tasks:batch', 'PATCH', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/tasks:batch', 'headers': context.user,
+        'json': {'tasks': [
+            {'id': _task_id(context, index * context.batch_size + item), 'priority': ('low', 'high')[index % 2]}
+            for item in range(context.batch_size)
+        ]}
+    }),
+    Scenario('DELETE /tasks:batch', 'DELETE', None, True, lambda context, index, fresh: {
+        'path': '/api/v1/tasks:batch', 'headers': context.pool_user, 'json': {'ids': fresh}
+    }),
+    Scenario('POST /tasks/import', 'POST', 0, False, lambda context, index, fresh: _import_body(context, index)),
+    Scenario('GET /admin/tasks', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/admin/tasks?limit=20', 'headers': context.admin
+    }),
+    Scenario('GET /admin/tasks/stats', 'GET', 0, False, lambda context, index, fresh: {
+        'path': '/api/v1/admin/tasks/stats', 'headers': context.admin
+    }),
+    Scenario('POST /admin/users:batch', 'POST', 0, True, lambda context, index, fresh: {
+        'path': '/api/v1/admin/users:batch', 'headers': context.admin,
+        'json': {'users': [
+            {
+                'username': f'bench-{context.run_id}-{index}-{item}',
+                'email': f'bench-{context.run_id}-{index}-{item}@example.com',
+                'password': 'password'
+            }
+            for item in range(context.batch_size)
+        ]}
+    }),
+)
+
+# Distinct requests built for scenarios that can repeat their requests
+REQUEST_VARIANTS = 100
+
+STATEMENTS_LINE = re.compile(r'^http_request_sql_statements_(sum|count)\{endpoint="([^"]*)"\} (\S+)$')
+
+
+class Context:
+    """
+    Seeded data and credentials shared by the requests of one driver.
+    """
+
+    def __init__(self, args, tokens, logout_tokens, task_ids, changes_cursor, pools):
+        self.run_id = int(time.time() * 1000)
+        self.users = args.users
+        self.batch_size = args.batch_size
+        self.user, self.pool_user, self.admin = (
+            {'Authorization': f'Bearer {tokens[user_id]}'} for user_id in (USER_ID, POOL_USER_ID, 1)
+        )
+        # Tokens revoked by the logout requests, one each
+        self.logout_tokens = logout_tokens
+        self.task_ids = task_ids
+        self.changes_cursor = changes_cursor
+        # Scenario name -> IDs of the fresh tasks of each request
+        self.pools = pools
+
+    def requests(self, scenario, total):
+        """
+        Build the requests of a scenario.
+
+        Args:
+            scenario (Scenario): Scenario to build
+            total (int): Requests the driver will send
+
+        Returns:
+            list: Request dicts; fewer than total for repeatable scenarios
+        """
+        size = total if scenario.unique else min(total, REQUEST_VARIANTS)
+        pool = self.pools.get(scenario.name, [[]] * size)
+        return [scenario.build(self, index, pool[index]) for index in range(size)]
+
+
+def pool_size(scenario, batch_size):
+    return batch_size if scenario.pool is None else scenario.pool
+
+
+def configure(args):
+    """
+    Set the production settings shared by both drivers.
+
+    Rate limits, job polling and the slow query log are disabled, and
+    passwords are hashed with --bcrypt-rounds so that logins match the
+    seeded hashes and measure the API rather than bcrypt.
+    """
+    settings = config['production']
+    settings.RATELIMIT_ENABLED = False
+    settings.JOB_WORKERS_IN_PROCESS = 0
+    settings.SQL_SLOW_QUERY_MS = 0
+    settings.METRICS_ENABLED = True
+    settings.BCRYPT_ROUNDS = args.bcrypt_rounds
+    settings.LOG_LEVEL = 'WARNING'
+
+
+def prepare(app, args, total):
+    """
+    Seed the database of an application and create the fresh tasks and
+    tokens of every scenario.
+
+    Args:
+        app (Flask): Application bound to an empty database
+        args (Namespace): Command line arguments
+        total (int): Requests each unique scenario will send
+
+    Returns:
+        Context: Data used to build the requests
+    """
+    from app.models.task import Task
+    from app.services.task_service import TaskService
+
+    with app.app_context():
+        db.create_all()
+        seed(users=args.users, tasks=args.tasks)
+        changes_cursor = TaskService.get_changes(as_user(USER_ID), None, 1)['cursor']
+        task_ids = [
+            task_id for task_id, in db.session.query(Task.id).filter_by(user_id=USER_ID).order_by(Task.id)
+        ]
+        pools = {}
+        for scenario in SCENARIOS:
+            per_request = pool_size(scenario, args.batch_size)
+            if not per_request:
+                continue
+            results = TaskService.create_tasks(
+                [{'title': f'Fresh task {item}'} for item in range(total * per_request)], as_user(POOL_USER_ID)
+            )
+            ids = [result['id'] for result in results]
+            pools[scenario.name] = [ids[start:start + per_request] for start in range(0, len(ids), per_request)]
+        tokens = {user_id: create_access_token(identity=str(user_id)) for user_id in (1, USER_ID, POOL_USER_ID)}
+        logout_tokens = [create_access_token(identity=str(POOL_USER_ID)) for _ in range(total)]
+    return Context(args, tokens, logout_tokens, task_ids, changes_cursor, pools)
+
+
+def statement_counts(text):
+    """
+    Read the SQL statement histograms from a /api/metrics response.
+
+    Returns:
+        dict: Endpoint -> [statements, requests], without the metrics endpoint
+    """
+    counts = {}
+    for line in text.splitlines():
+        match = STATEMENTS_LINE.match(line)
+        if match and match.group(2) != 'health.get_metrics':
+            counts.setdefault(match.group(2), [0, 0])[match.group(1) == 'count'] = float(match.group(3))
+    return counts
+
+
+def statements_per_request(before, after):
+    statements = sum(after[name][0] - before.get(name, [0, 0])[0] for name in after)
+    requests = sum(after[name][1] - before.get(name, [0, 0])[1] for name in after)
+    return statements / requests if requests else None
+
+
+def result(summary, statuses, before, after):
+    errors = sum(number for status, number in statuses.items() if status == 'error' or status >= 400)
+    summary = {name: value for name, value in summary.items() if name != 'statuses'}
+    summary.update(
+        errors=errors,
+        statuses={str(status): number for status, number in statuses.items()},
+        queries_per_request=statements_per_request(before, after)
+    )
+    return summary
+
+
+def run_client(args, scenarios):
+    """
+    Send the requests of each scenario one at a time through the test client.
+
+    Returns:
+        dict: Scenario name -> result
+    """
+    app = create_benchmark_app(config_name='production')
+    context = prepare(app, args, args.warmup + args.repeat)
+    client = app.test_client()
+
+    def scrape():
+        return statement_counts(client.get('/api/metrics').get_data(as_text=True))
+
+    results = {}
+    for scenario in scenarios:
+        requests = context.requests(scenario, args.warmup + args.repeat)
+        statuses = {}
+        samples = []
+        before = None
+        for index in range(args.warmup + args.repeat):
+            if index == args.warmup:
+                before = scrape()
+            spec = requests[index % len(requests)]
+            start = time.perf_counter()
+            response = client.open(
+                spec['path'], method=scenario.method, headers=spec.get('headers'), json=spec.get('json'),
+                data=spec.get('data'), content_type=spec.get('content_type')
+            )
+            # Reads streamed bodies to the end
+            response.get_data()
+            response.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            if index >= args.warmup:
+                samples.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        summary = summarize(samples)
+        summary['rps'] = len(samples) / (sum(samples) / 1000)
+        results[scenario.name] = result(summary, statuses, before, scrape())
+        report('client', scenario.name, results[scenario.name])
+    return results
+
+
+def raw_request(method, spec):
+    """
+    Encode a request dict as a raw HTTP/1.1 request.
+    """
+    headers = dict(spec.get('headers') or {}, Host='localhost')
+    body = b''
+    if spec.get('json') is not None:
+        body = json.dumps(spec['json']).encode()
+        headers['Content-Type'] = 'application/json'
+    elif spec.get('data') is not None:
+        body = spec['data']
+        headers['Content-Type'] = spec['content_type']
+    if body or method != 'GET':
+        headers['Content-Length'] = str(len(body))
+    head = f'{method} {spec["path"]} HTTP/1.1\r\n' + ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+    return (head + '\r\n').encode('latin-1') + body
+
+
+def run_gunicorn(args, scenarios):
+    """
+    Drive each scenario with concurrent connections against a gunicorn server.
+
+    Statements per request are only exact with one worker, since the
+    metrics of the worker answering the scrape are read.
+
+    Returns:
+        dict: Scenario name -> result
+    """
+    app = create_benchmark_app(config_name='production')
+    context = prepare(app, args, args.unique_requests)
+    port = free_port()
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'],
+        JWT_SECRET_KEY=app.config['JWT_SECRET_KEY'],
+        JOB_WORKERS_IN_PROCESS='0',
+        SQL_SLOW_QUERY_MS='0',
+        METRICS_ENABLED='true',
+        BCRYPT_ROUNDS=str(args.bcrypt_rounds),
+        LOG_LEVEL='WARNING',
+        **{f'RATELIMIT_{group.upper()}': '1000000000/hour' for group in config['production'].RATELIMITS}
+    )
+    server = subprocess.Popen(
+        MODES['gunicorn'].format(workers=args.workers, port=port).split(),
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    def scrape():
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/metrics') as response:
+            return statement_counts(response.read().decode())
+
+    results = {}
+    try:
+        wait_for_port(port)
+        for scenario in scenarios:
+            requests = [
+                raw_request(scenario.method, spec) for spec in context.requests(scenario, args.unique_requests)
+            ]
+            if not scenario.unique:
+                # Unique requests are all kept for the measurement
+                asyncio.run(run_load(port, requests, args.concurrency, args.warmup_seconds))
+            before = scrape() if args.workers == 1 else {}
+            summary = asyncio.run(run_load(port, requests, args.concurrency, args.duration, once=scenario.unique))
+            after = scrape() if args.workers == 1 else {}
+            statuses = summary.pop('statuses')
+            if not summary['count']:
+                summary.update(mean_ms=None, p50_ms=None, p95_ms=None, p99_ms=None)
+            results[scenario.name] = result(summary, statuses, before, after)
+            report('gunicorn', scenario.name, results[scenario.name])
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def report(driver, name, result):
+    if not result['count']:
+        print(f'{driver:<9} {name:<32} no successful requests {result["statuses"]}')
+        return
+    queries = result['queries_per_request']
+    print('{:<9} {}  {:>8.0f} req/s  {:>6} queries/req{}'.format(
+        driver, format_summary(name, result), result['rps'],
+        '-' if queries is None else f'{queries:.1f}',
+        f'  {result["errors"]} errors' if result['errors'] else ''
+    ))
+
+
+def commit():
+    """
+    Return the current git commit, marked dirty when the tree has changes.
+    """
+    try:
+        head = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain'], check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ('-dirty' if dirty.strip() else '')
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare the results of two runs.
+
+    An endpoint regresses when its p95 latency grows or its throughput
+    drops by more than threshold, when it runs more SQL statements per
+    request, or when it starts failing.
+
+    Args:
+        current (dict): Results of this run
+        baseline (dict): Results of the run to compare with
+        threshold (float): Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        list: Descriptions of the regressions
+    """
+    regressions = []
+    for driver, scenarios in current['results'].items():
+        for name, new in scenarios.items():
+            old = baseline['results'].get(driver, {}).get(name)
+            if not old or not old['count'] or not new['count']:
+                continue
+            label = f'{driver} {name}'
+            if new['p95_ms'] > old['p95_ms'] * (1 + threshold):
+                regressions.append(f'{label}: p95 {old["p95_ms"]:.3f} -> {new["p95_ms"]:.3f} ms')
+            if new['rps'] < old['rps'] * (1 - threshold):
+                regressions.append(f'{label}: throughput {old["rps"]:.0f} -> {new["rps"]:.0f} req/s')
+            old_queries, new_queries = old['queries_per_request'], new['queries_per_request']
+            # Statement counts are deterministic up to cache hits
+            if old_queries is not None and new_queries is not None and new_queries > old_queries + 0.5:
+                regressions.append(f'{label}: queries/request {old_queries:.1f} -> {new_queries:.1f}')
+            if new['errors'] and not old['errors']:
+                regressions.append(f'{label}: {new["errors"]} failed requests {new["statuses"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--driver', action='append', choices=DRIVERS,
+                        help='Driver to run; repeat for several (default: all)')
+    parser.add_argument('--endpoint', action='append', metavar='PATTERN',
+                        help='Only run scenarios whose name contains PATTERN; repeatable')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=50, help='Items per batch and import request')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=200, help='Timed requests per endpoint (client)')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint (client)')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn workers')
+    parser.add_argument('--concurrency', type=int, default=8, help='Connections (gunicorn)')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per endpoint (gunicorn)')
+    parser.add_argument('--warmup-seconds', type=float, default=0.5, help='Untimed seconds per endpoint (gunicorn)')
+    parser.add_argument('--unique-requests', type=int, default=2000,
+                        help='Requests prepared for endpoints that cannot repeat one (gunicorn)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that fails the comparison (default: 0.2)')
+    args = parser.parse_args()
+    if args.users < POOL_USER_ID:
+        parser.error(f'--users must be at least {POOL_USER_ID}')
+
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if not args.endpoint or any(pattern in scenario.name for pattern in args.endpoint)
+    ]
+    configure(args)
+    drivers = {'client': run_client, 'gunicorn': run_gunicorn}
+    current = {
+        'commit': commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'settings': {name: value for name, value in vars(args).items() if name not in ('output', 'baseline')},
+        'results': {driver: drivers[driver](args, scenarios) for driver in args.driver or DRIVERS},
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(current, output, indent=2)
+        print(f'Results written to {args.output}')
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('settings', {}).get('tasks') != args.tasks:
+            print('Warning: the baseline was seeded with different settings', file=sys.stderr)
+        regressions = compare(current, baseline, args.threshold)
+        print(f'Compared with {baseline.get("commit") or args.baseline}: {len(regressions)} regressions')
+        for regression in regressions:
+            print('  ' + regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
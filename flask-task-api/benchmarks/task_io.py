@@ -0,0 +1,92 @@
+"""
+Benchmark the streaming task export and import endpoints.
+
+Exports the seeded tasks as CSV and NDJSON through the Flask test client,
+then imports each file back, and reports rows per second. With --memory
+the peak Python memory of each run is traced too, showing that it does not
+grow with the number of rows. Usage::
+
+    python -m benchmarks.task_io --tasks 200000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app import db
+from .batch_writes import login
+from .common import create_benchmark_app, seed
+
+
+def export(client, headers, format):
+    """
+    Stream an export into a temporary file without buffering the response.
+    """
+    response = client.get(f'/api/v1/tasks/export?format={format}', headers=headers, buffered=False)
+    output = tempfile.TemporaryFile()
+    for chunk in response.response:
+        output.write(chunk)
+    response.close()
+    output.seek(0)
+    return output
+
+
+def import_(client, headers, format, file):
+    """
+    Upload a file as a stream and return the import summary.
+    """
+    # Passed as input_stream, the file is read by the view instead of the client
+    response = client.post(
+        f'/api/v1/tasks/import?format={format}', input_stream=file,
+        content_length=os.fstat(file.fileno()).st_size,
+        content_type='application/octet-stream', headers=headers
+    )
+    return response.get_json()
+
+
+def run(name, rows, fn, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = ''
+    if memory:
+        peak = '  peak {:>7.1f} MiB'.format(tracemalloc.get_traced_memory()[1] / 2 ** 20)
+        tracemalloc.stop()
+    print('{:<16} {:>9} rows {:>8.2f}s {:>10.0f} rows/s{}'.format(name, rows, elapsed, rows / elapsed, peak))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=None, help='TASKS_IMPORT_BATCH_SIZE')
+    parser.add_argument('--memory', action='store_true', help='trace peak memory (slower)')
+    args = parser.parse_args()
+
+    # The testing configuration records every statement of a request
+    app = create_benchmark_app(config_name='production')
+    if args.batch_size:
+        app.config['TASKS_IMPORT_BATCH_SIZE'] = args.batch_size
+    with app.app_context():
+        db.create_all()
+        seed(users=2, tasks=args.tasks)
+    client = app.test_client()
+    # user1 is the admin and exports every task
+    headers = login(client, 'user1')
+
+    files = {
+        format: run(f'export {format}', args.tasks, lambda: export(client, headers, format), args.memory)
+        for format in ('csv', 'ndjson')
+    }
+    for format, file in files.items():
+        summary = run(f'import {format}', args.tasks, lambda: import_(client, headers, format, file), args.memory)
+        if summary['created'] != args.tasks:
+            raise SystemExit(f'{format} import created {summary["created"]} of {args.tasks} tasks')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark task list filtering and sorting with and without composite indexes.
+
+Prints the SQLite query plan and latency of each list query built by
+TaskService. Usage::
+
+    python -m benchmarks.task_queries --users 1000 --tasks 1000000
+    python -m benchmarks.task_queries --tasks 1000000 --drop-indexes
+"""
+
+import argparse
+import time
+
+from werkzeug.datastructures import MultiDict
+
+from app import db
+from app.models.task import Task
+from app.services.task_service import TaskService, _parse_sort, _sort_order
+from .common import as_user, create_benchmark_app, format_summary, measure, seed
+
+CASES = [
+    ('default page', {}, 'id'),
+    ('status=pending', {'status': 'pending'}, 'id'),
+    ('status + due range', {
+        'status': 'pending,in_progress',
+        'due_after': '2000-01-01T00:00:00',
+        'due_before': '2100-01-01T00:00:00'
+    }, 'due_date'),
+    ('updated_since', {'updated_since': '2000-01-01T00:00:00'}, '-updated_at'),
+    ('sort -created_at', {}, '-created_at'),
+]
+
+
+def query_plan(query):
+    """
+    Return the SQLite query plan of a query as text.
+    """
+    statement = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}
+    )
+    rows = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + str(statement)))
+    return '\n'.join('    ' + row[-1] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='Reuse an existing benchmark database file')
+    parser.add_argument('--drop-indexes', action='store_true',
+                        help='Measure without the composite task indexes')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.db)
+    with app.app_context():
+        if not db.engine.dialect.has_table(db.engine.connect(), 'tasks'):
+            db.create_all()
+            start = time.perf_counter()
+            seed(args.users, args.tasks)
+            print(f'Seeded {args.tasks} tasks in {time.perf_counter() - start:.1f}s')
+        for index in Task.__table__.indexes:
+            if args.drop_indexes:
+                index.drop(db.engine, checkfirst=True)
+            else:
+                index.create(db.engine, checkfirst=True)
+        db.session.execute(db.text('ANALYZE'))
+
+        user = as_user(args.users // 2)
+        for name, filters, sort in CASES:
+            filters = MultiDict(filters)
+            field, descending = _parse_sort(sort)
+            query = TaskService._tasks_query(user, filters).order_by(
+                *_sort_order(getattr(Task, field), descending)
+            )
+            print(f'\n{name} (sort={sort})')
+            print(query_plan(query.limit(args.limit)))
+            summary = measure(
+                lambda: TaskService.get_tasks_page(user, args.limit, filters=filters, sort=sort),
+                repeat=args.repeat
+            )
+            print(format_summary(name, summary))
+
+
+if __name__ == '__main__':
+    main()
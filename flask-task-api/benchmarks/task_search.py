@@ -0,0 +1,62 @@
+"""
+Benchmark full-text task search against LIKE '%q%' scans.
+
+Compares TaskService.search_tasks, which uses the FTS5 index, with the
+unindexed LIKE query over title and description, for one user and for an
+admin searching every task. LIKE can stop at the first page of matches for
+very common words but returns them unranked, and scans every row for rare
+ones; FTS ranks all matches. Usage::
+
+    python -m benchmarks.task_search --users 1000 --tasks 1000000
+"""
+
+import argparse
+import time
+
+from app import db
+from app.services.task_service import TaskService
+from .common import as_user, create_benchmark_app, format_summary, measure, seed
+
+# Common words, a rare reference number, a prefix and a word that never matches
+QUERIES = ('budget', 'quarterly report', 'invoice payment urgent', 'ref 4242', 'migr', 'zebra')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db', help='Reuse an existing benchmark database file')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.db)
+    with app.app_context():
+        if not db.engine.dialect.has_table(db.engine.connect(), 'tasks'):
+            db.create_all()
+            start = time.perf_counter()
+            seed(args.users, args.tasks)
+            print(f'Seeded {args.tasks} tasks in {time.perf_counter() - start:.1f}s')
+        else:
+            start = time.perf_counter()
+            TaskService.rebuild_search_index()
+            print(f'Rebuilt search index in {time.perf_counter() - start:.1f}s')
+        db.session.execute(db.text('ANALYZE'))
+
+        viewers = (('user', as_user(args.users // 2)), ('admin', as_user(1, 'admin')))
+        for viewer, user in viewers:
+            print(f'\n{viewer}')
+            for query in QUERIES:
+                # LIKE has no prefix semantics, so it matches the last word anywhere
+                words = query.split()
+                fts = measure(lambda: TaskService.search_tasks(user, query, args.limit), repeat=args.repeat)
+                like = measure(
+                    lambda: TaskService._like_query(user, words).limit(args.limit).all(),
+                    repeat=args.repeat
+                )
+                print(format_summary(f'fts  {query!r}', fts))
+                print(format_summary(f'like {query!r}', like))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark user registration and bulk provisioning throughput.
+
+Creates users one at a time through ``POST /auth/register`` and in batches
+through ``POST /admin/users:batch``, and reports users per second and SQL
+statements per user. Passwords are hashed with --bcrypt-rounds in
+--hash-workers processes, so low rounds measure the API and the database,
+and the configured rounds the throughput of real onboarding. Usage::
+
+    python -m benchmarks.user_provisioning --users 500 --batch-size 1 10 100
+    python -m benchmarks.user_provisioning --users 100 --bcrypt-rounds 12 --hash-workers 4
+"""
+
+import argparse
+import time
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import db
+from config import config
+from .common import create_benchmark_app, seed
+
+
+class StatementCounter:
+    """
+    Count the SQL statements run by an engine.
+    """
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def timed(counter, fn):
+    """
+    Run fn and measure it.
+
+    Returns:
+        tuple: Seconds and SQL statements
+    """
+    statements = counter.count
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, counter.count - statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=500, help='Users created by each measurement')
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--bcrypt-rounds', type=int, default=4)
+    parser.add_argument('--hash-workers', type=int, default=0, help='Password hashing processes (0 hashes inline)')
+    args = parser.parse_args()
+
+    settings = config['production']
+    settings.BCRYPT_ROUNDS = args.bcrypt_rounds
+    settings.PASSWORD_HASH_WORKERS = args.hash_workers
+    settings.PASSWORD_HASH_MAX_PENDING = max(args.hash_workers, 1) * 4
+    settings.USERS_BATCH_MAX_ITEMS = max(args.batch_size)
+    settings.RATELIMIT_ENABLED = False
+    settings.METRICS_ENABLED = False
+    settings.JOB_WORKERS_IN_PROCESS = 0
+    app = create_benchmark_app(config_name='production')
+    with app.app_context():
+        db.create_all()
+        seed(users=1, tasks=0)
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity='1')}
+        counter = StatementCounter(db.engine)
+    client = app.test_client()
+
+    def register(prefix):
+        for index in range(args.users):
+            response = client.post('/api/v1/auth/register', json={
+                'username': f'{prefix}{index}', 'email': f'{prefix}{index}@example.com', 'password': 'password'
+            })
+            assert response.status_code == 201, response.status_code
+
+    def provision(prefix, batch_size):
+        for start in range(0, args.users, batch_size):
+            users = [
+                {'username': f'{prefix}{index}', 'email': f'{prefix}{index}@example.com', 'password': 'password'}
+                for index in range(start, min(start + batch_size, args.users))
+            ]
+            response = client.post('/api/v1/admin/users:batch', json={'users': users}, headers=headers)
+            assert response.status_code == 200, response.status_code
+
+    def duplicates():
+        for index in range(args.users):
+            response = client.post('/api/v1/auth/register', json={
+                'username': f'register{index}', 'email': f'new{index}@example.com', 'password': 'password'
+            })
+            assert response.status_code == 400, response.status_code
+
+    cases = [('POST /auth/register', lambda: register('register'))]
+    cases += [
+        (f'POST /admin/users:batch ({size})', lambda size=size: provision(f'batch{size}-', size))
+        for size in args.batch_size
+    ]
+    cases.append(('POST /auth/register (taken)', duplicates))
+    print(f'{args.users} users per measurement, bcrypt rounds {args.bcrypt_rounds}, '
+          f'{args.hash_workers} hashing processes')
+    for name, fn in cases:
+        elapsed, statements = timed(counter, fn)
+        print(f'{name:<32} {args.users / elapsed:>10.1f} users/s  {statements / args.users:>6.2f} statements/user')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,33 +5,173 @@ load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# Comma-separated database URLs of read replicas
+read_replica_urls = [url for url in os.getenv('READ_REPLICA_URLS', '').split(',') if url]
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "app.db")}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    CACHE_TYPE = "simple"
-    CACHE_DEFAULT_TIMEOUT = 300
-    RATELIMIT_STORAGE_URL = "memory://"
-    RATELIMIT_STRATEGY = "fixed-window"
+
+    # Read replicas, registered as binds 'replica_0', 'replica_1', ...
+    SQLALCHEMY_BINDS = {f'replica_{index}': url for index, url in enumerate(read_replica_urls)}
+    READ_REPLICA_BINDS = list(SQLALCHEMY_BINDS)
+    READ_REPLICA_STICKY_SECONDS = int(os.getenv('READ_REPLICA_STICKY_SECONDS', 5))
+    READ_REPLICA_HEALTH_INTERVAL = int(os.getenv('READ_REPLICA_HEALTH_INTERVAL', 10))
+
+    # Engine pool (server databases and file-based SQLite)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # PRAGMAs run on every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64000)),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),
+        'temp_store': 'MEMORY'
+    }
+
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')  # 'SimpleCache', 'FileSystemCache' or 'RedisCache'
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'task-api:')
+    CACHE_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(basedir, 'instance', 'cache'))
+    # Task responses: 'auto' caches only with a backend shared by every worker
+    # (Redis or Memcached); 'true' also caches per process, for a single worker
+    TASK_CACHE_ENABLED = os.getenv('TASK_CACHE_ENABLED', 'auto').lower()
+
+    # Rate limiting: counters in Redis (redis://...) are shared by every
+    # worker and node; memory:// counts per process
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', os.getenv('RATELIMIT_STORAGE_URL', 'memory://'))
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_KEY_PREFIX = os.getenv('RATELIMIT_KEY_PREFIX', 'task-api')
+    # X-RateLimit-* headers cost another storage round trip per request
+    RATELIMIT_HEADERS_ENABLED = os.getenv('RATELIMIT_HEADERS_ENABLED', 'false').lower() == 'true'
+    # Keep serving with per-process counters while the storage is unreachable
+    RATELIMIT_SWALLOW_ERRORS = True
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True
+    RATELIMITS = {
+        'task_reads': os.getenv('RATELIMIT_TASK_READS', '100/hour'),
+        'task_search': os.getenv('RATELIMIT_TASK_SEARCH', '100/hour'),
+        'task_writes': os.getenv('RATELIMIT_TASK_WRITES', '100/hour'),
+        'task_batches': os.getenv('RATELIMIT_TASK_BATCHES', '100/hour'),
+        'task_transfers': os.getenv('RATELIMIT_TASK_TRANSFERS', '100/hour'),
+        'admin': os.getenv('RATELIMIT_ADMIN', '100/hour'),
+        'jobs': os.getenv('RATELIMIT_JOBS', '100/hour')
+    }
+
+    # ASGI mode (asgi.py): threads running requests without a native async
+    # handler, and whether task reads use the native handlers
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 16))
+    ASGI_NATIVE_VIEWS = os.getenv('ASGI_NATIVE_VIEWS', 'true').lower() == 'true'
+
+    # Background jobs: worker threads in each server process (by default 0:
+    # jobs run in `flask jobs worker` processes, so that exports and imports
+    # don't take CPU from requests), retries with exponential backoff, and
+    # the seconds without progress after which a running job is considered
+    # abandoned. Export files are served from JOB_EXPORT_DIR, which must be
+    # shared storage when several nodes run the API or its workers
+    JOB_WORKERS_IN_PROCESS = int(os.getenv('JOB_WORKERS_IN_PROCESS', 0))
+    JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', 10))
+    JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', 3600))
+    JOB_EXPORT_DIR = os.getenv('JOB_EXPORT_DIR', os.path.join(basedir, 'instance', 'exports'))
+    JOB_IMPORT_MAX_ITEMS = int(os.getenv('JOB_IMPORT_MAX_ITEMS', 100000))
+
+    # Due date scheduler (`flask scheduler run`): seconds between ticks,
+    # seconds before the due date that a task is reported as due soon, tasks
+    # per scan batch, and the comma-separated sinks receiving the events
+    # ('log', 'outbox' and 'webhook', which posts to SCHEDULER_WEBHOOK_URL)
+    SCHEDULER_INTERVAL = float(os.getenv('SCHEDULER_INTERVAL', 60))
+    SCHEDULER_REMINDER_LEAD = int(os.getenv('SCHEDULER_REMINDER_LEAD', 3600))
+    SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', 1000))
+    SCHEDULER_SINKS = os.getenv('SCHEDULER_SINKS', 'log')
+    SCHEDULER_WEBHOOK_URL = os.getenv('SCHEDULER_WEBHOOK_URL', '')
+    SCHEDULER_WEBHOOK_TIMEOUT = float(os.getenv('SCHEDULER_WEBHOOK_TIMEOUT', 5))
+
+    # Task event stream (GET /api/v1/tasks/events): seconds between reads
+    # of the task_events outbox by each process and events per read,
+    # seconds between heartbeats, events queued for a client before it is
+    # disconnected, missed events sent on reconnect before asking the
+    # client to resync, days of events kept by `flask events prune`, and
+    # streams served at once by each process through WSGI, where each
+    # holds a server thread (keep it below GUNICORN_THREADS)
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 0.5))
+    EVENTS_BATCH_SIZE = int(os.getenv('EVENTS_BATCH_SIZE', 1000))
+    EVENTS_HEARTBEAT_INTERVAL = float(os.getenv('EVENTS_HEARTBEAT_INTERVAL', 15))
+    EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 1000))
+    EVENTS_BACKLOG_LIMIT = int(os.getenv('EVENTS_BACKLOG_LIMIT', 1000))
+    EVENTS_RETENTION_DAYS = float(os.getenv('EVENTS_RETENTION_DAYS', 7))
+    EVENTS_WSGI_MAX_STREAMS = int(os.getenv('EVENTS_WSGI_MAX_STREAMS', 4))
+
+    # Logging: LOG_FORMAT is 'json' or 'text'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+
+    # Request and SQL metrics served at /api/metrics; statements slower than
+    # SQL_SLOW_QUERY_MS are logged with their parameter count (0 to disable), and
+    # requests running one SELECT METRICS_N_PLUS_ONE_THRESHOLD times or more
+    # are logged as possible N+1 queries (0 to disable)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SQL_SLOW_QUERY_MS = float(os.getenv('SQL_SLOW_QUERY_MS', 100))
+    METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv('METRICS_N_PLUS_ONE_THRESHOLD', 10))
+
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 16))
+    PASSWORD_HASH_RETRY_AFTER = int(os.getenv('PASSWORD_HASH_RETRY_AFTER', 1))
+    # Seconds authenticated users (ID and role) are cached per process, and
+    # users kept at most; used only when task responses are cached, since
+    # account changes reach the other workers through the shared backend
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))
+    USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', 10000))
+    # Verified access tokens whose claims are reused until they expire (0
+    # verifies every request), and seconds between syncs of the revoked
+    # token list with the database
+    TOKEN_CLAIMS_CACHE_SIZE = int(os.getenv('TOKEN_CLAIMS_CACHE_SIZE', 10000))
+    TOKEN_BLOCKLIST_SYNC_INTERVAL = float(os.getenv('TOKEN_BLOCKLIST_SYNC_INTERVAL', 5))
+    TASKS_PAGE_SIZE = int(os.getenv('TASKS_PAGE_SIZE', 100))
+    TASKS_MAX_PAGE_SIZE = int(os.getenv('TASKS_MAX_PAGE_SIZE', 1000))
+    TASKS_STREAM_BATCH_SIZE = int(os.getenv('TASKS_STREAM_BATCH_SIZE', 500))
+    TASKS_BATCH_MAX_ITEMS = int(os.getenv('TASKS_BATCH_MAX_ITEMS', 1000))
+    TASKS_IMPORT_BATCH_SIZE = int(os.getenv('TASKS_IMPORT_BATCH_SIZE', 1000))
+    # Users per provisioning batch; each password is hashed with BCRYPT_ROUNDS
+    USERS_BATCH_MAX_ITEMS = int(os.getenv('USERS_BATCH_MAX_ITEMS', 100))
     
     @staticmethod
     def init_app(app):
         pass
 
+
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "app.db")}')
 
+
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
     WTF_CSRF_ENABLED = False
+    SQLITE_PRAGMAS = {'busy_timeout': 5000}
     RATELIMIT_ENABLED = False
+    BCRYPT_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    JOB_WORKERS_IN_PROCESS = 0
+
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "app.db")}')
 
+
 config = {
     'development': DevelopmentConfig,
     'testing': TestingConfig,
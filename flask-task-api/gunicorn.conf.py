@@ -0,0 +1,30 @@
+"""
+gunicorn settings of the Flask Task Management API.
+
+Used with ``gunicorn -c gunicorn.conf.py wsgi:app``. Each setting can be
+overridden on the command line or with GUNICORN_CMD_ARGS.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Threaded workers: event streams and streamed exports and imports hold a
+# thread for their whole duration, not a worker. The gthread worker reports
+# to the master from its main loop, so ``timeout`` restarts only workers that
+# stopped responding and never cuts off a long response; a sync worker would
+# be killed after ``timeout`` seconds of any one request.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+# Open streams are closed this long after a restart is requested; event
+# stream clients reconnect with Last-Event-ID
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Import the application once in the master, so that workers are forked
+# ready to serve and share its memory. Database engines discard pooled
+# connections in forked workers (see app.utils.database), so connections
+# are never shared between processes.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
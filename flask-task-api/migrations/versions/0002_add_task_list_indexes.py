@@ -0,0 +1,40 @@
+"""add task list indexes
+
+Adds the indexes of the filtered and sorted task listings: the owner, the
+owner with status and due date, and the owner with the last update time.
+Indexes that ``flask create-tables`` already created are kept.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 06:18:10.503121
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+TASK_INDEXES = {
+    'ix_tasks_user_id': ['user_id'],
+    'ix_tasks_user_id_status_due_date': ['user_id', 'status', 'due_date'],
+    'ix_tasks_user_id_updated_at': ['user_id', 'updated_at'],
+}
+
+
+def upgrade():
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('tasks')}
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        for name, columns in TASK_INDEXES.items():
+            if name not in existing:
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        for name in reversed(list(TASK_INDEXES)):
+            batch_op.drop_index(name)
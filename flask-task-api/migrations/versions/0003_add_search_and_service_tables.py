@@ -0,0 +1,179 @@
+"""add full-text search and service tables
+
+Adds the (due_date, status) index of the statistics and the scheduler, the
+full-text search index (the FTS5 table and its triggers on SQLite, a GIN
+index on PostgreSQL), and the tables of the changes feed, task statistics,
+background jobs, revoked tokens, the due date scheduler and the event
+outbox. Tables that ``flask create-tables`` already created are kept, so
+databases it upgraded in place can be stamped at 0001 and upgraded as well.
+The statistics counters are filled from the existing tasks.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 06:18:13.076695
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils import search
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TASK_INDEXES = {
+    'ix_tasks_due_date_status': ['due_date', 'status'],
+}
+
+SQLITE_TRIGGERS = ('tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update')
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'scheduler_state' not in tables:
+        op.create_table(
+            'scheduler_state',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('due_mark', sa.DateTime(), nullable=False),
+            sa.Column('id_mark', sa.Integer(), nullable=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+    if 'task_changes' not in tables:
+        op.create_table(
+            'task_changes',
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('operation', sa.String(length=10), nullable=False),
+            sa.Column('changed_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('seq'),
+            sa.UniqueConstraint('task_id'),
+            sqlite_autoincrement=True
+        )
+        with op.batch_alter_table('task_changes', schema=None) as batch_op:
+            batch_op.create_index('ix_task_changes_user_id_seq', ['user_id', 'seq'], unique=False)
+
+    if 'task_events' not in tables:
+        op.create_table(
+            'task_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('type', sa.String(length=30), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sqlite_autoincrement=True
+        )
+        with op.batch_alter_table('task_events', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_task_events_created_at'), ['created_at'], unique=False)
+            batch_op.create_index('ix_task_events_user_id_id', ['user_id', 'id'], unique=False)
+
+    if 'task_stats' not in tables:
+        op.create_table(
+            'task_stats',
+            sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('priority', sa.String(length=20), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('user_id', 'status', 'priority')
+        )
+    if 'jobs' not in tables:
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('payload', sa.JSON(), nullable=False),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('progress', sa.Integer(), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('run_at', sa.DateTime(), nullable=False),
+            sa.Column('locked_by', sa.String(length=100), nullable=True),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('jobs', schema=None) as batch_op:
+            batch_op.create_index('ix_jobs_status_run_at', ['status', 'run_at'], unique=False)
+
+    if 'revoked_tokens' not in tables:
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('jti', sa.String(length=36), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('revoked_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('jti')
+        )
+        with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_revoked_tokens_expires_at'), ['expires_at'], unique=False)
+            batch_op.create_index(batch_op.f('ix_revoked_tokens_revoked_at'), ['revoked_at'], unique=False)
+
+    existing = {index['name'] for index in inspector.get_indexes('tasks')}
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        for name, columns in TASK_INDEXES.items():
+            if name not in existing:
+                batch_op.create_index(name, columns, unique=False)
+
+    # Creates the FTS5 table and triggers, or the GIN index, if missing and
+    # indexes the existing tasks
+    search.rebuild_index(op.get_bind())
+
+    op.execute('DELETE FROM task_stats')
+    op.execute(
+        'INSERT INTO task_stats (user_id, status, priority, count) '
+        'SELECT user_id, status, priority, count(id) FROM tasks GROUP BY user_id, status, priority'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute(f'DROP TABLE IF EXISTS {search.FTS_TABLE}')
+    elif op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_tasks_search')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        for name in reversed(list(TASK_INDEXES)):
+            batch_op.drop_index(name)
+
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_revoked_at'))
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_expires_at'))
+
+    op.drop_table('revoked_tokens')
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_status_run_at')
+
+    op.drop_table('jobs')
+    op.drop_table('task_stats')
+    with op.batch_alter_table('task_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_events_user_id_id')
+        batch_op.drop_index(batch_op.f('ix_task_events_created_at'))
+
+    op.drop_table('task_events')
+    with op.batch_alter_table('task_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_changes_user_id_seq')
+
+    op.drop_table('task_changes')
+    op.drop_table('scheduler_state')
@@ -0,0 +1,107 @@
+"""
+Shared fixtures of the Task Management API tests.
+
+Each test gets a fresh SQLite database file, so that several applications
+(standing in for server workers) can share it.
+"""
+
+import itertools
+
+import fakeredis
+import pytest
+import redis
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models.user import User
+from config import config
+
+_config_names = itertools.count()
+
+
+def make_app(database_uri, **settings):
+    """
+    Create a testing application with extra configuration.
+
+    Settings are applied before the extensions are initialized, so they can
+    select backends such as CACHE_TYPE.
+
+    Args:
+        database_uri (str): Database of the application
+        **settings: Configuration values overriding the testing configuration
+
+    Returns:
+        Flask: Configured Flask application instance
+    """
+    name = f'test-{next(_config_names)}'
+    config[name] = type('TestConfig', (config['testing'],), {'SQLALCHEMY_DATABASE_URI': database_uri, **settings})
+    try:
+        return create_app(name, cli=False)
+    finally:
+        del config[name]
+
+
+def auth_headers(app, user_id):
+    """
+    Build the authorization header of a user.
+    """
+    with app.app_context():
+        return {'Authorization': 'Bearer ' + create_access_token(identity=str(user_id))}
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    return 'sqlite:///' + str(tmp_path / 'test.db')
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """
+    A fake Redis server used by every RedisCache created in the test.
+    """
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis, 'from_url', lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs))
+    return server
+
+
+@pytest.fixture
+def app(database_uri):
+    app = make_app(database_uri)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    """
+    Create two users and an admin.
+
+    Returns:
+        dict: User IDs by username
+    """
+    with app.app_context():
+        accounts = [
+            User('alice', 'alice@example.com', 'password'),
+            User('bob', 'bob@example.com', 'password'),
+            User('admin', 'admin@example.com', 'password', role='admin'),
+        ]
+        db.session.add_all(accounts)
+        db.session.commit()
+        return {user.username: user.id for user in accounts}
+
+
+@pytest.fixture
+def headers(app, users):
+    """
+    Authorization headers by username.
+    """
+    return {username: auth_headers(app, user_id) for username, user_id in users.items()}
@@ -0,0 +1,58 @@
+"""
+Tests of login and access token revocation.
+"""
+
+import time
+from datetime import timedelta
+
+from app import db
+from app.models.revoked_token import RevokedToken
+from app.services import token_service
+from app.utils.timestamps import utcnow
+from .conftest import make_app
+
+
+def login(client, username):
+    response = client.post('/api/v1/auth/login', json={'username': username, 'password': 'password'})
+    assert response.status_code == 200
+    return {'Authorization': 'Bearer ' + response.get_json()['access_token']}
+
+
+def test_login_rejects_wrong_password(client, users):
+    response = client.post('/api/v1/auth/login', json={'username': 'alice', 'password': 'wrong'})
+
+    assert response.status_code == 401
+
+
+def test_logout_revokes_only_that_token(client, users):
+    revoked, other = login(client, 'alice'), login(client, 'alice')
+
+    assert client.post('/api/v1/auth/logout', headers=revoked).status_code == 200
+    assert client.get('/api/v1/tasks', headers=revoked).status_code == 401
+    assert client.post('/api/v1/auth/logout', headers=revoked).status_code == 401
+    assert client.get('/api/v1/tasks', headers=other).status_code == 200
+
+
+def test_revocation_reaches_other_workers(app, client, users, database_uri):
+    worker = make_app(database_uri, TOKEN_BLOCKLIST_SYNC_INTERVAL=0).test_client()
+    headers = login(client, 'alice')
+    assert worker.get('/api/v1/tasks', headers=headers).status_code == 200
+
+    client.post('/api/v1/auth/logout', headers=headers)
+
+    # The worker syncs in the background, so it rejects the token shortly after
+    deadline = time.monotonic() + 5
+    while worker.get('/api/v1/tasks', headers=headers).status_code == 200 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker.get('/api/v1/tasks', headers=headers).status_code == 401
+
+
+def test_only_expired_tokens_are_pruned(app, client, users):
+    client.post('/api/v1/auth/logout', headers=login(client, 'alice'))
+    with app.app_context():
+        db.session.add(RevokedToken(jti='expired', user_id=users['alice'],
+                                    expires_at=utcnow() - timedelta(minutes=1)))
+        db.session.commit()
+
+        assert token_service.prune_revoked_tokens() == 1
+        assert RevokedToken.query.count() == 1
@@ -0,0 +1,46 @@
+"""
+Tests of the batch task endpoints and their per-item results.
+"""
+
+
+def test_batch_create_reports_each_item(client, headers):
+    items = [{'title': 'ok'}, {'description': 'no title'}, {'title': 'bad date', 'due_date': 'soon'}, 'not an object']
+    response = client.post('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice'])
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == [201, 400, 400, 400]
+    assert [task['title'] for task in client.get('/api/v1/tasks', headers=headers['alice']).get_json()] == ['ok']
+
+
+def test_batch_update_reports_each_item(client, headers):
+    mine = client.post('/api/v1/tasks', json={'title': 'mine'}, headers=headers['alice']).get_json()['id']
+    theirs = client.post('/api/v1/tasks', json={'title': 'theirs'}, headers=headers['bob']).get_json()['id']
+    items = [
+        {'id': mine, 'status': 'completed'},
+        {'id': theirs, 'status': 'completed'},
+        {'id': 9999, 'status': 'completed'},
+        {'status': 'completed'},
+    ]
+    results = client.patch('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice']).get_json()['results']
+
+    assert [result['status'] for result in results] == [200, 403, 404, 400]
+    assert client.get(f'/api/v1/tasks/{mine}', headers=headers['alice']).get_json()['status'] == 'completed'
+    assert client.get(f'/api/v1/tasks/{theirs}', headers=headers['bob']).get_json()['status'] == 'pending'
+
+
+def test_batch_delete_reports_each_item(client, headers):
+    mine = client.post('/api/v1/tasks', json={'title': 'mine'}, headers=headers['alice']).get_json()['id']
+    theirs = client.post('/api/v1/tasks', json={'title': 'theirs'}, headers=headers['bob']).get_json()['id']
+    results = client.delete('/api/v1/tasks:batch', json={'ids': [mine, theirs, 9999]},
+                            headers=headers['alice']).get_json()['results']
+
+    assert [result['status'] for result in results] == [204, 403, 404]
+    assert client.get('/api/v1/tasks', headers=headers['alice']).get_json() == []
+
+
+def test_batch_size_is_limited(app, client, headers):
+    items = [{'title': str(index)} for index in range(app.config['TASKS_BATCH_MAX_ITEMS'] + 1)]
+
+    assert client.post('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice']).status_code == 400
+    assert client.post('/api/v1/tasks:batch', json={'tasks': []}, headers=headers['alice']).status_code == 400
@@ -0,0 +1,99 @@
+"""
+Tests of the task response cache.
+
+Two applications sharing a database stand in for two server workers; a
+fake Redis server stands in for the shared cache backend.
+"""
+
+import pytest
+
+from app.services import cache_service
+from .conftest import auth_headers, make_app
+
+
+@pytest.fixture
+def workers(app, users, database_uri, redis_server):
+    """
+    Two applications caching task responses in one fake Redis server.
+    """
+    return [make_app(database_uri, CACHE_TYPE='RedisCache') for _ in range(2)]
+
+
+def cache_stats(app):
+    with app.app_context():
+        return cache_service.get_stats()
+
+
+def titles(client, headers):
+    response = client.get('/api/v1/tasks', headers=headers)
+    assert response.status_code == 200
+    return [task['title'] for task in response.get_json()]
+
+
+def test_per_process_cache_is_disabled_by_default(app, client, users, headers):
+    client.post('/api/v1/tasks', json={'title': 'first'}, headers=headers['alice'])
+    before = cache_stats(app)
+
+    assert titles(client, headers['alice']) == ['first']
+    assert titles(client, headers['alice']) == ['first']
+
+    stats = cache_stats(app)
+    assert stats['enabled'] is False
+    assert (stats['hits'], stats['misses']) == (before['hits'], before['misses'])
+
+
+def test_per_process_cache_can_be_forced(database_uri):
+    app = make_app(database_uri, TASK_CACHE_ENABLED='true')
+    with app.app_context():
+        assert cache_service.enabled()
+
+
+def test_shared_cache_serves_every_worker(workers, users):
+    first, second = (worker.test_client() for worker in workers)
+    headers = auth_headers(workers[0], users['alice'])
+    first.post('/api/v1/tasks', json={'title': 'first'}, headers=headers)
+
+    before = cache_stats(workers[0])
+    assert titles(first, headers) == ['first']
+    assert titles(second, headers) == ['first']
+
+    stats = cache_stats(workers[0])
+    assert stats['misses'] - before['misses'] == 1
+    assert stats['hits'] - before['hits'] == 1
+
+
+def test_write_on_one_worker_invalidates_every_worker(workers, users):
+    first, second = (worker.test_client() for worker in workers)
+    alice = auth_headers(workers[0], users['alice'])
+    admin = auth_headers(workers[0], users['admin'])
+    task_id = first.post('/api/v1/tasks', json={'title': 'before'}, headers=alice).get_json()['id']
+    assert titles(first, alice) == ['before']
+    assert titles(first, admin) == ['before']
+    assert first.get(f'/api/v1/tasks/{task_id}', headers=alice).get_json()['title'] == 'before'
+
+    response = second.put(f'/api/v1/tasks/{task_id}', json={'title': 'after'}, headers=alice)
+    assert response.status_code == 200
+
+    assert titles(first, alice) == ['after']
+    assert titles(first, admin) == ['after']
+    assert first.get(f'/api/v1/tasks/{task_id}', headers=alice).get_json()['title'] == 'after'
+
+
+def test_unavailable_backend_falls_back_to_the_database(workers, users, redis_server):
+    client = workers[0].test_client()
+    headers = auth_headers(workers[0], users['alice'])
+    client.post('/api/v1/tasks', json={'title': 'first'}, headers=headers)
+    redis_server.connected = False
+    before = cache_stats(workers[0])
+
+    assert titles(client, headers) == ['first']
+    assert cache_stats(workers[0])['errors'] > before['errors']
+
+
+def test_cache_stats_require_an_admin(client, headers):
+    assert client.get('/api/cache/stats').status_code == 401
+    assert client.get('/api/cache/stats', headers=headers['alice']).status_code == 403
+
+    response = client.get('/api/cache/stats', headers=headers['admin'])
+    assert response.status_code == 200
+    assert set(response.get_json()) >= {'enabled', 'hits', 'misses', 'errors', 'hit_ratio'}
@@ -0,0 +1,39 @@
+"""
+Tests of the task changes feed.
+"""
+
+import pytest
+
+from app.models.task_change import TaskChange
+
+
+@pytest.fixture
+def tasks(client, headers):
+    items = [{'title': f'task {index}'} for index in range(3)]
+    response = client.post('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice'])
+    return [result['id'] for result in response.get_json()['results']]
+
+
+def test_changes_feed_reports_writes_after_the_cursor(client, headers, tasks):
+    cursor = client.get('/api/v1/tasks/changes', headers=headers['alice']).get_json()['cursor']
+    client.put(f'/api/v1/tasks/{tasks[0]}', json={'title': 'renamed'}, headers=headers['alice'])
+    client.delete(f'/api/v1/tasks/{tasks[1]}', headers=headers['alice'])
+    client.post('/api/v1/tasks', json={'title': 'other user'}, headers=headers['bob'])
+
+    changes = client.get(f'/api/v1/tasks/changes?since={cursor}&limit=1', headers=headers['alice']).get_json()
+    assert ([task['title'] for task in changes['tasks']], changes['has_more']) == (['renamed'], True)
+    changes = client.get(f"/api/v1/tasks/changes?since={changes['cursor']}", headers=headers['alice']).get_json()
+    assert (changes['tasks'], changes['deleted'], changes['has_more']) == ([], [tasks[1]], False)
+
+
+def test_update_without_updatable_fields_records_no_change(app, client, users, headers, tasks):
+    cursor = client.get('/api/v1/tasks/changes', headers=headers['alice']).get_json()['cursor']
+    response = client.put(f'/api/v1/tasks/{tasks[0]}', headers=headers['alice'], json={
+        'user_id': users['bob'], 'created_at': None, 'to_dict': 1, 'unknown': 'value',
+    })
+    assert response.status_code == 200
+
+    changes = client.get(f'/api/v1/tasks/changes?since={cursor}', headers=headers['alice']).get_json()
+    assert (changes['tasks'], changes['deleted'], changes['cursor']) == ([], [], cursor)
+    with app.app_context():
+        assert TaskChange.query.filter_by(user_id=users['bob']).count() == 0
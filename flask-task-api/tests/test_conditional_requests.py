@@ -0,0 +1,89 @@
+"""
+Tests of ETag validation and conditional task updates.
+"""
+
+from sqlalchemy import text
+
+from app import db
+from app.services import task_service
+
+
+def create_task(client, headers, title='first'):
+    return client.post('/api/v1/tasks', json={'title': title}, headers=headers).get_json()
+
+
+def test_get_task_revalidates_with_its_etag(client, headers):
+    task = create_task(client, headers['alice'])
+    response = client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice'])
+    etag = response.headers['ETag']
+
+    cached = client.get(f"/api/v1/tasks/{task['id']}", headers={**headers['alice'], 'If-None-Match': etag})
+    assert cached.status_code == 304
+
+    client.put(f"/api/v1/tasks/{task['id']}", json={'title': 'second'}, headers=headers['alice'])
+    changed = client.get(f"/api/v1/tasks/{task['id']}", headers={**headers['alice'], 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_update_with_current_etag_succeeds(client, headers):
+    task = create_task(client, headers['alice'])
+    etag = client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice']).headers['ETag']
+
+    response = client.put(f"/api/v1/tasks/{task['id']}", json={'title': 'second'},
+                          headers={**headers['alice'], 'If-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'second'
+    assert response.headers['ETag'] != etag
+
+
+def test_update_with_stale_etag_fails(client, headers):
+    task = create_task(client, headers['alice'])
+    etag = client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice']).headers['ETag']
+    client.put(f"/api/v1/tasks/{task['id']}", json={'title': 'second'}, headers=headers['alice'])
+
+    response = client.put(f"/api/v1/tasks/{task['id']}", json={'title': 'third'},
+                          headers={**headers['alice'], 'If-Match': etag})
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice']).get_json()['title'] == 'second'
+
+
+def test_update_committed_after_the_etag_check_fails(app, client, headers, monkeypatch):
+    task = create_task(client, headers['alice'])
+    etag = client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice']).headers['ETag']
+    check_etag = task_service.task_etag
+
+    def concurrent_update(task_id, updated_at):
+        # Another writer commits between the ETag check and the update
+        with db.engine.begin() as connection:
+            connection.execute(
+                text("UPDATE tasks SET title = 'concurrent', updated_at = CURRENT_TIMESTAMP WHERE id = :id"),
+                {'id': task_id}
+            )
+        return check_etag(task_id, updated_at)
+
+    monkeypatch.setattr(task_service, 'task_etag', concurrent_update)
+    response = client.put(f"/api/v1/tasks/{task['id']}", json={'title': 'mine'},
+                          headers={**headers['alice'], 'If-Match': etag})
+    monkeypatch.undo()
+
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/tasks/{task['id']}", headers=headers['alice']).get_json()['title'] == 'concurrent'
+
+
+def test_update_applies_only_updatable_fields(client, users, headers):
+    task = create_task(client, headers['alice'])
+    body = {
+        'id': task['id'] + 1, 'user_id': users['bob'], 'created_at': None, 'to_dict': 1,
+        'due_date': '2030-01-02T03:04:05Z',
+    }
+
+    response = client.put(f"/api/v1/tasks/{task['id']}", json=body, headers=headers['alice'])
+    conditional = client.put(f"/api/v1/tasks/{task['id']}", json=body,
+                             headers={**headers['alice'], 'If-Match': response.headers['ETag']})
+    for response in (response, conditional):
+        assert response.status_code == 200
+        updated = response.get_json()
+        assert (updated['id'], updated['user_id']) == (task['id'], users['alice'])
+        assert updated['created_at'] == task['created_at']
+        assert updated['due_date'].startswith('2030-01-02T03:04:05')
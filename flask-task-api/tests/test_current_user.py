@@ -0,0 +1,82 @@
+"""
+Tests of the authenticated user cache.
+
+Two applications sharing a database stand in for two server workers; a
+fake Redis server stands in for the shared cache backend.
+"""
+
+import pytest
+
+from app import db
+from app.models.user import User
+from app.services import auth_service
+from .conftest import auth_headers, make_app
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    auth_service._user_cache.clear()
+    yield
+    auth_service._user_cache.clear()
+
+
+@pytest.fixture
+def workers(app, users, database_uri, redis_server):
+    return [make_app(database_uri, CACHE_TYPE='RedisCache', USER_CACHE_MAX_SIZE=2) for _ in range(2)]
+
+
+def admin_status(client, headers):
+    return client.get('/api/v1/admin/tasks', headers=headers).status_code
+
+
+def change_in_other_process(app, change):
+    """
+    Commit a change to the users on a worker while keeping this process's
+    cached users, as another server process would.
+    """
+    cached = dict(auth_service._user_cache)
+    with app.app_context():
+        change()
+        db.session.commit()
+    auth_service._user_cache.update(cached)
+
+
+def test_role_change_reaches_every_worker(workers, users):
+    first, second = workers
+    headers = auth_headers(first, users['admin'])
+    assert admin_status(second.test_client(), headers) == 200
+    assert users['admin'] in auth_service._user_cache
+
+    change_in_other_process(first, lambda: setattr(db.session.get(User, users['admin']), 'role', 'user'))
+    assert admin_status(second.test_client(), headers) == 403
+
+    change_in_other_process(first, lambda: setattr(db.session.get(User, users['admin']), 'role', 'admin'))
+    assert admin_status(second.test_client(), headers) == 200
+    change_in_other_process(first, lambda: db.session.delete(db.session.get(User, users['admin'])))
+    assert admin_status(second.test_client(), headers) == 403
+
+
+def test_rolled_back_change_keeps_the_cached_user(workers, users):
+    first, second = workers
+    headers = auth_headers(first, users['admin'])
+    assert admin_status(second.test_client(), headers) == 200
+    cached = auth_service._user_cache[users['admin']]
+
+    with first.app_context():
+        db.session.get(User, users['admin']).role = 'user'
+        db.session.flush()
+        db.session.rollback()
+        assert auth_service._cached_user(users['admin'], auth_service._user_generation(users['admin'])) == cached[0]
+
+
+def test_users_are_not_cached_without_a_shared_backend(client, headers):
+    assert admin_status(client, headers['admin']) == 200
+    assert auth_service._user_cache == {}
+
+
+def test_least_recently_used_user_is_evicted(workers, users):
+    client = workers[0].test_client()
+    for username in ('alice', 'bob', 'alice', 'admin'):
+        client.get('/api/v1/tasks', headers=auth_headers(workers[0], users[username]))
+
+    assert list(auth_service._user_cache) == [users['alice'], users['admin']]
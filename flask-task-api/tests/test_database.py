@@ -0,0 +1,57 @@
+"""
+Tests of the engine configuration: connection pools and SQLite PRAGMAs.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app import db
+from config import config
+from .conftest import make_app
+
+
+def pragma(name):
+    return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_file_database_gets_a_sized_pool_and_the_pragmas(database_uri):
+    app = make_app(database_uri, DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2, SQLITE_PRAGMAS=config['default'].SQLITE_PRAGMAS)
+
+    with app.app_context():
+        pool = db.engine.pool
+        assert isinstance(pool, QueuePool)
+        assert (pool.size(), pool._max_overflow) == (3, 2)
+        assert pragma('journal_mode') == 'wal'
+        assert (pragma('synchronous'), pragma('busy_timeout'), pragma('temp_store')) == (1, 5000, 2)
+        assert pragma('cache_size') == -64000
+        db.engine.dispose()
+
+
+def test_pragmas_apply_to_every_pooled_connection(database_uri):
+    app = make_app(database_uri, SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -2000})
+
+    with app.app_context():
+        connections = [db.engine.connect() for _ in range(3)]
+        assert [connection.exec_driver_sql('PRAGMA busy_timeout').scalar() for connection in connections] == [1234] * 3
+        assert [connection.exec_driver_sql('PRAGMA cache_size').scalar() for connection in connections] == [-2000] * 3
+        for connection in connections:
+            connection.close()
+        db.engine.dispose()
+
+
+def test_explicit_pool_class_skips_the_pool_settings(database_uri):
+    app = make_app(database_uri, SQLALCHEMY_ENGINE_OPTIONS={'poolclass': NullPool})
+
+    with app.app_context():
+        assert isinstance(db.engine.pool, NullPool)
+        assert pragma('busy_timeout') == 5000
+
+
+def test_memory_database_keeps_a_single_shared_connection():
+    app = make_app('sqlite://')
+
+    with app.app_context():
+        db.create_all()
+        assert not isinstance(db.engine.pool, QueuePool)
+        with db.engine.connect() as first, db.engine.connect() as second:
+            assert first.connection.dbapi_connection is second.connection.dbapi_connection
@@ -0,0 +1,180 @@
+"""
+Tests of the task event stream served on the WSGI path.
+
+The test client runs the application in the test's thread, so a stream is
+read by advancing its response iterator. Streams are requested with
+``multithread=True``: the test client reports a single-threaded server
+otherwise.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from app import db
+from app.models.task_event import TaskEvent
+from .conftest import make_app
+
+
+@pytest.fixture
+def app(database_uri):
+    app = make_app(database_uri, EVENTS_POLL_INTERVAL=0.05, EVENTS_HEARTBEAT_INTERVAL=0.1, EVENTS_BACKLOG_LIMIT=3)
+    with app.app_context():
+        db.create_all()
+    yield app
+    app.extensions['event_notifier'].stop(timeout=5)
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def open_stream(client, headers, last_event_id=None):
+    if last_event_id is not None:
+        headers = {**headers, 'Last-Event-ID': str(last_event_id)}
+    response = client.get('/api/v1/tasks/events', headers=headers, multithread=True, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry: ')
+    return response, chunks
+
+
+def parse(chunk):
+    """
+    Parse the events of a chunk as (ID, type, payload) tuples, skipping comments.
+    """
+    events = []
+    for frame in chunk.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in frame.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields['id']), fields['event'], json.loads(fields.get('data', 'null'))))
+    return events
+
+
+def read_events(chunks, count, timeout=5):
+    events, deadline = [], time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events += parse(next(chunks))
+    return events
+
+
+def event_ids(app):
+    with app.app_context():
+        return [event.id for event in TaskEvent.query.order_by(TaskEvent.id)]
+
+
+def create(client, headers, title):
+    response = client.post('/api/v1/tasks', json={'title': title}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def test_live_events_reach_the_owner(client, headers):
+    response, chunks = open_stream(client, headers['alice'])
+    try:
+        create(client, headers['bob'], 'not yours')
+        task_id = create(client, headers['alice'], 'yours')
+
+        (event_id, event_type, payload), = read_events(chunks, 1)
+        assert (event_type, payload['task_id']) == ('task.created', task_id)
+    finally:
+        response.close()
+
+
+def test_reconnect_resumes_after_last_event_id(app, client, headers):
+    create(client, headers['alice'], 'first')
+    create(client, headers['bob'], 'other user')
+    second = create(client, headers['alice'], 'second')
+    client.put(f'/api/v1/tasks/{second}', json={'status': 'completed'}, headers=headers['alice'])
+    since = event_ids(app)[0]
+
+    response, chunks = open_stream(client, headers['alice'], since)
+    try:
+        events = read_events(chunks, 2)
+        assert [(event_type, payload['task_id']) for _, event_type, payload in events] == [
+            ('task.created', second), ('task.updated', second)
+        ]
+        assert all(event_id > since for event_id, _, _ in events)
+    finally:
+        response.close()
+
+
+def test_live_events_up_to_last_event_id_are_not_resent(app, client, headers, monkeypatch):
+    create(client, headers['alice'], 'first')
+    create(client, headers['alice'], 'second')
+    since = event_ids(app)[-1]
+    notifier = app.extensions['event_notifier']
+    subscribe = notifier.subscribe
+
+    def subscribe_late(subscription):
+        # The notifier delivers events the client already received elsewhere
+        subscribe(subscription)
+        subscription.push([(event_id, f'id: {event_id}\nevent: task.created\ndata: {{}}\n\n'.encode())
+                           for event_id in event_ids(app)])
+
+    monkeypatch.setattr(notifier, 'subscribe', subscribe_late)
+    response, chunks = open_stream(client, headers['alice'], since)
+    try:
+        third = create(client, headers['alice'], 'third')
+        events = read_events(chunks, 1)
+        assert [(event_type, payload['task_id']) for _, event_type, payload in events] == [('task.created', third)]
+    finally:
+        response.close()
+
+
+def test_admin_backlog_includes_every_user(app, client, headers):
+    create(client, headers['alice'], 'alice')
+    create(client, headers['bob'], 'bob')
+
+    response, chunks = open_stream(client, headers['admin'], 0)
+    try:
+        assert [event_id for event_id, _, _ in read_events(chunks, 2)] == event_ids(app)
+    finally:
+        response.close()
+
+
+def test_long_backlog_sends_reset(app, client, headers):
+    for index in range(4):
+        create(client, headers['alice'], str(index))
+
+    response, chunks = open_stream(client, headers['alice'], 0)
+    try:
+        assert read_events(chunks, 1) == [(0, 'reset', {})]
+    finally:
+        response.close()
+
+
+def test_new_client_receives_no_backlog(client, headers):
+    create(client, headers['alice'], 'before')
+
+    response, chunks = open_stream(client, headers['alice'])
+    try:
+        assert read_events(chunks, 1, timeout=0.3) == []
+    finally:
+        response.close()
+
+
+def test_single_threaded_servers_are_refused(client, headers):
+    response = client.get('/api/v1/tasks/events', headers=headers['alice'])
+
+    assert response.status_code == 503
+    assert b'threaded server' in response.data
+
+
+def test_streams_per_process_are_capped(app, client, headers):
+    app.extensions['event_stream_slots'] = threading.BoundedSemaphore(1)
+    first, _ = open_stream(client, headers['alice'])
+
+    refused = client.get('/api/v1/tasks/events', headers=headers['bob'], multithread=True)
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '30'
+
+    first.close()
+    second = client.get('/api/v1/tasks/events', headers=headers['bob'], multithread=True, buffered=False)
+    assert second.status_code == 200
+    # Closed before it was read: the slot is released all the same
+    second.close()
+    third, _ = open_stream(client, headers['bob'])
+    third.close()
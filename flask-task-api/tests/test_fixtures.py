@@ -0,0 +1,69 @@
+"""
+Tests of the synthetic dataset generator.
+"""
+
+from collections import Counter
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models.task import Task
+from app.models.task_stat import TaskStat
+from app.models.user import User
+from app.services.fixture_service import FixtureService
+from .conftest import auth_headers, make_app
+
+TASK_COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.priority, Task.due_date, Task.user_id)
+
+
+def generate(tmp_path, name, **options):
+    """
+    Generate a dataset in a new database.
+
+    Returns:
+        tuple: The application, its users and its tasks
+    """
+    app = make_app('sqlite:///' + str(tmp_path / f'{name}.db'))
+    with app.app_context():
+        db.create_all()
+        FixtureService.generate(users=4, tasks=250, chunk_size=100, **options)
+        users = db.session.query(User.id, User.username, User.role).order_by(User.id).all()
+        tasks = db.session.query(*TASK_COLUMNS).order_by(Task.id).all()
+        db.session.remove()
+        db.engine.dispose()
+    return app, users, tasks
+
+
+def test_same_seed_generates_the_same_rows(tmp_path):
+    _, users, tasks = generate(tmp_path, 'first', seed=7)
+    _, same_users, same_tasks = generate(tmp_path, 'second', seed=7, processes=2)
+    _, _, other_tasks = generate(tmp_path, 'other', seed=8)
+
+    assert users == same_users
+    assert [user.role for user in users] == ['admin', 'user', 'user', 'user']
+    assert len(tasks) == 250
+    assert tasks == same_tasks
+    assert tasks != other_tasks
+
+
+def test_generated_dataset_has_its_indexes_and_stats(tmp_path):
+    app, _, tasks = generate(tmp_path, 'dataset', seed=7)
+
+    with app.app_context():
+        indexes = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+        triggers = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        stats = {(row.user_id, row.status, row.priority): row.count for row in TaskStat.query}
+
+    assert {index.name for index in Task.__table__.indexes} <= indexes
+    assert 'tasks_fts_insert' in triggers
+    assert stats == Counter((task.user_id, task.status, task.priority) for task in tasks)
+
+    response = app.test_client().get('/api/v1/tasks/search', query_string={'q': tasks[0].title, 'limit': 100},
+                                     headers=auth_headers(app, 1))
+    assert tasks[0].id in {task['id'] for task in response.get_json()}
+
+
+def test_generate_refuses_a_database_with_data(app, users):
+    with app.app_context(), pytest.raises(ValueError, match='already contains'):
+        FixtureService.generate(users=1, tasks=1)
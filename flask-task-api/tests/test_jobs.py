@@ -0,0 +1,222 @@
+"""
+Tests of background jobs: claiming, retries, reclaiming abandoned jobs,
+and the export and import handlers.
+"""
+
+from datetime import timedelta
+
+import json
+import threading
+
+import pytest
+
+from app import db
+from app.models.job import Job
+from app.models.task import Task
+from app.models.user import User
+from app.services import job_service
+from app.services.job_service import JobService
+from app.services.task_service import TaskService
+from app.utils.timestamps import utcnow
+from .conftest import make_app
+
+
+@pytest.fixture
+def app(database_uri, tmp_path):
+    app = make_app(database_uri, JOB_EXPORT_DIR=str(tmp_path / 'exports'), TASKS_BATCH_MAX_ITEMS=2,
+                   TASKS_STREAM_BATCH_SIZE=2, JOB_RETRY_BACKOFF=0)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def alice(app, users):
+    return db.session.get(User, users['alice'])
+
+
+@pytest.fixture
+def admin(app, users):
+    return db.session.get(User, users['admin'])
+
+
+@pytest.fixture
+def failing_handler(monkeypatch):
+    calls = []
+
+    def fail(job, user):
+        calls.append(job.attempts)
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(job_service._handlers, 'fail', (fail, False))
+    return calls
+
+
+def run_next(worker_id='worker-1'):
+    job = JobService.claim_job(worker_id)
+    assert job is not None
+    return job, JobService.run_job(job)
+
+
+def claim_in_other_worker(app, worker_id):
+    """
+    Claim a job in another thread, which has its own session like another worker.
+    """
+    claimed = []
+
+    def claim():
+        with app.app_context():
+            claimed.append(JobService.claim_job(worker_id).claim)
+            db.session.remove()
+
+    thread = threading.Thread(target=claim)
+    thread.start()
+    thread.join()
+    return claimed[0]
+
+
+def abandon(job_id):
+    """
+    Age the claim of a running job past JOB_TIMEOUT.
+    """
+    Job.query.filter_by(id=job_id).update({'locked_at': utcnow() - timedelta(days=1)})
+    db.session.commit()
+
+
+def test_failed_job_is_retried_until_max_attempts(app, alice, failing_handler):
+    job_id = JobService.submit_job('fail', {}, alice).id
+
+    for attempt in range(1, app.config['JOB_MAX_ATTEMPTS'] + 1):
+        job, succeeded = run_next()
+        assert not succeeded
+        assert job.attempts == attempt
+
+    job = db.session.get(Job, job_id)
+    db.session.refresh(job)
+    assert (job.status, job.error, job.locked_by) == ('failed', 'RuntimeError: boom', None)
+    assert failing_handler == [1, 2, 3]
+    assert JobService.claim_job('worker-1') is None
+
+
+def test_abandoned_job_is_reclaimed(app, admin):
+    job_id = JobService.submit_job('rebuild_stats', {}, admin).id
+    JobService.claim_job('worker-1')
+    assert JobService.claim_job('worker-2') is None
+
+    abandon(job_id)
+    second = JobService.claim_job('worker-2')
+
+    assert (second.id, second.attempts, second.locked_by) == (job_id, 2, 'worker-2')
+
+
+def test_outcome_of_a_reclaimed_attempt_is_discarded(app, admin):
+    job_id = JobService.submit_job('rebuild_stats', {}, admin).id
+    first = JobService.claim_job('worker-1')
+    abandon(job_id)
+    assert claim_in_other_worker(app, 'worker-2') == {'locked_by': 'worker-2', 'attempts': 2}
+
+    assert JobService.run_job(first) is False
+
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.locked_by, job.attempts) == ('running', 'worker-2', 2)
+
+
+def test_import_stops_when_the_job_is_reclaimed(app, alice, monkeypatch):
+    items = [{'title': f'task {index}'} for index in range(5)]
+    job_id = JobService.submit_job('import_tasks', {'tasks': items}, alice, total=5).id
+    create_tasks = TaskService.create_tasks
+
+    def create_and_lose_claim(chunk, user, **options):
+        results = create_tasks(chunk, user, **options)
+        # Another worker reclaims the job after the first chunk
+        Job.query.filter_by(id=job_id).update({'locked_by': 'worker-2', 'attempts': Job.attempts + 1})
+        return results
+
+    monkeypatch.setattr(TaskService, 'create_tasks', staticmethod(create_and_lose_claim))
+    job, succeeded = run_next()
+
+    assert not succeeded
+    assert Task.query.count() == 2
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.locked_by, job.progress) == ('running', 'worker-2', 2)
+
+
+def test_import_refreshes_its_claim_per_chunk(app, alice, monkeypatch):
+    items = [{'title': f'task {index}'} for index in range(5)] + [{'status': 'invalid'}]
+    job_id = JobService.submit_job('import_tasks', {'tasks': items}, alice, total=6).id
+    claims = []
+    refresh_lock = JobService.refresh_lock
+
+    def recorded_refresh(job, **values):
+        refresh_lock(job, **values)
+        claims.append(job.locked_at)
+
+    monkeypatch.setattr(JobService, 'refresh_lock', staticmethod(recorded_refresh))
+    job, succeeded = run_next()
+
+    assert succeeded
+    assert len(claims) == 3 and claims == sorted(claims)
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.progress) == ('succeeded', 6)
+    assert (job.result['created'], job.result['failed'], job.result['errors'][0]['index']) == (5, 1, 5)
+
+
+def test_import_commits_its_result_with_each_chunk(app, alice, monkeypatch):
+    items = [{'title': f'task {index}'} for index in range(4)] + [{'status': 'invalid'}]
+    job_id = JobService.submit_job('import_tasks', {'tasks': items}, alice, total=5).id
+    create_tasks = TaskService.create_tasks
+    calls = []
+
+    def create_and_crash(chunk, user, **options):
+        results = create_tasks(chunk, user, **options)
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise RuntimeError('worker crashed')
+        return results
+
+    monkeypatch.setattr(TaskService, 'create_tasks', staticmethod(create_and_crash))
+    job, succeeded = run_next()
+
+    assert not succeeded
+    job = db.session.get(Job, job_id)
+    assert Task.query.count() == job.progress == job.result['created'] == 2
+
+    monkeypatch.setattr(TaskService, 'create_tasks', staticmethod(create_tasks))
+    job, succeeded = run_next()
+
+    assert succeeded
+    assert Task.query.count() == 4
+    assert (job.progress, job.result['created'], job.result['failed']) == (5, 4, 1)
+
+
+def test_export_job_round_trip(app, alice, headers):
+    client = app.test_client()
+    for index in range(5):
+        client.post('/api/v1/tasks', json={'title': f'task {index}'}, headers=headers['alice'])
+    client.post('/api/v1/tasks', json={'title': 'not exported'}, headers=headers['bob'])
+
+    response = client.post('/api/v1/tasks:export', json={'format': 'ndjson'}, headers=headers['alice'])
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+    job, succeeded = run_next()
+    assert succeeded
+
+    job = client.get(f'/api/v1/jobs/{job_id}', headers=headers['alice']).get_json()
+    assert (job['status'], job['progress'], job['result']) == ('succeeded', 4, {'count': 5})
+    result = client.get(f'/api/v1/jobs/{job_id}/result', headers=headers['alice'])
+    assert [json.loads(line)['title'] for line in result.get_data(as_text=True).splitlines()] == [
+        f'task {index}' for index in range(5)
+    ]
+    assert client.get(f'/api/v1/jobs/{job_id}/result', headers=headers['bob']).status_code == 403
+
+
+def test_missing_export_file_is_not_found(app, alice, headers):
+    client = app.test_client()
+    job_id = client.post('/api/v1/tasks:export', json={}, headers=headers['alice']).get_json()['id']
+    run_next()
+    job = db.session.get(Job, job_id)
+    job_service.job_handlers.remove_result_file(job)
+
+    assert client.get(f'/api/v1/jobs/{job_id}/result', headers=headers['alice']).status_code == 404
@@ -0,0 +1,53 @@
+"""
+Tests of the request and SQL metrics.
+"""
+
+import logging
+
+import pytest
+from flask_jwt_extended import decode_token
+
+from app.utils import metrics
+from .conftest import make_app
+
+
+@pytest.fixture
+def slow_log_app(database_uri, monkeypatch):
+    """
+    An application logging every statement as slow.
+    """
+    monkeypatch.setitem(metrics._settings, 'slow_query_seconds', None)
+    app = make_app(database_uri, SQL_SLOW_QUERY_MS=0.000001)
+    with app.app_context():
+        from app import db
+        db.create_all()
+    return app
+
+
+def test_slow_query_log_leaves_out_parameter_values(slow_log_app, caplog):
+    client = slow_log_app.test_client()
+    secret = 'correct horse battery staple'
+    with caplog.at_level(logging.WARNING, logger=metrics.__name__):
+        client.post('/api/v1/auth/register', json={
+            'username': 'carol', 'email': 'carol@example.com', 'password': secret
+        })
+        login = client.post('/api/v1/auth/login', json={'username': 'carol', 'password': secret})
+        token = login.get_json()['access_token']
+        client.post('/api/v1/auth/logout', headers={'Authorization': f'Bearer {token}'})
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+    assert any('INSERT INTO users' in message for message in slow)
+    assert any('revoked_tokens' in message for message in slow)
+    logged = '\n'.join(slow)
+    assert 'carol@example.com' not in logged
+    assert '$2b$' not in logged
+    with slow_log_app.app_context():
+        assert decode_token(token)['jti'] not in logged
+
+
+def test_metrics_report_requests(client, headers):
+    client.get('/api/v1/tasks', headers=headers['alice'])
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+
+    assert 'http_request_duration_seconds_count{method="GET",endpoint="task.get_tasks",status="200"}' in body
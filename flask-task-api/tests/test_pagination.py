@@ -0,0 +1,52 @@
+"""
+Tests of keyset pagination of task listings.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def tasks(client, headers):
+    due = datetime(2030, 1, 1)
+    items = [{'title': f'task {index}', 'due_date': (due + timedelta(days=index % 3)).isoformat()}
+             for index in range(7)]
+    response = client.post('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice'])
+    return [result['id'] for result in response.get_json()['results']]
+
+
+def read_pages(client, headers, query):
+    ids, pages, url = [], 0, f'/api/v1/tasks?{query}'
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        ids += [task['id'] for task in response.get_json()]
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/v1/tasks?{query}&cursor={cursor}' if cursor else None
+    return ids, pages
+
+
+@pytest.mark.parametrize('sort', ['id', '-id', 'due_date', '-due_date', 'updated_at'])
+def test_pages_cover_every_task_once(client, headers, tasks, sort):
+    ids, pages = read_pages(client, headers['alice'], f'limit=3&sort={sort}')
+
+    assert sorted(ids) == sorted(tasks)
+    assert pages == 3
+    expected, _ = read_pages(client, headers['alice'], f'limit=100&sort={sort}')
+    assert ids == expected
+
+
+def test_next_page_is_linked(client, headers, tasks):
+    response = client.get('/api/v1/tasks?limit=5', headers=headers['alice'])
+
+    assert 'rel="next"' in response.headers['Link']
+    assert f"cursor={response.headers['X-Next-Cursor']}" in response.headers['Link']
+
+
+def test_invalid_cursor_and_limit_are_rejected(client, headers, tasks):
+    assert client.get('/api/v1/tasks?cursor=bogus', headers=headers['alice']).status_code == 400
+    assert client.get('/api/v1/tasks?limit=0', headers=headers['alice']).status_code == 400
+    cursor = client.get('/api/v1/tasks?limit=2', headers=headers['alice']).headers['X-Next-Cursor']
+    assert client.get(f'/api/v1/tasks?sort=-due_date&cursor={cursor}', headers=headers['alice']).status_code == 400
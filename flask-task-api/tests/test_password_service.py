@@ -0,0 +1,54 @@
+"""
+Tests of password hashing in the process pool.
+"""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+import pytest
+
+from app.services import password_service
+from .conftest import make_app
+
+
+@pytest.fixture
+def pool_app(database_uri):
+    app = make_app(database_uri, PASSWORD_HASH_WORKERS=2)
+    with app.app_context():
+        yield app
+    if password_service._pool is not None:
+        password_service._pool.shutdown()
+        password_service._pool = None
+
+
+def break_pool():
+    pool, _ = password_service._get_pool(2, 16)
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    return pool
+
+
+def test_pool_processes_are_not_forked_from_the_worker(pool_app):
+    password_service.hash_password('secret')
+
+    assert password_service._pool.submit(os.getppid).result() != os.getpid()
+
+
+def test_operation_retries_in_a_new_pool(pool_app):
+    broken = break_pool()
+
+    password_hash = password_service.hash_password('secret')
+
+    assert password_service.verify_password('secret', password_hash)
+    assert password_service._pool is not broken
+
+
+def test_batch_retries_in_a_new_pool(pool_app):
+    broken = break_pool()
+
+    hashes = password_service.hash_passwords(['one', 'two', 'three'])
+
+    assert [bcrypt.checkpw(password.encode(), password_hash.encode())
+            for password, password_hash in zip(['one', 'two', 'three'], hashes)] == [True] * 3
+    assert password_service._pool is not broken
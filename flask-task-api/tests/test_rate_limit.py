@@ -0,0 +1,43 @@
+"""
+Tests of the configured rate limits and of how requests are counted.
+"""
+
+import pytest
+
+from config import config
+from .conftest import auth_headers, make_app
+
+
+@pytest.fixture
+def limited_app(database_uri, users):
+    """
+    An application allowing two task reads per minute.
+    """
+    limits = {**config['testing'].RATELIMITS, 'task_reads': '2/minute'}
+    return make_app(database_uri, RATELIMIT_ENABLED=True, RATELIMITS=limits)
+
+
+def test_requests_over_the_configured_limit_get_429_with_retry_after(limited_app, users):
+    client = limited_app.test_client()
+    headers = auth_headers(limited_app, users['alice'])
+
+    assert [client.get('/api/v1/tasks', headers=headers).status_code for _ in range(2)] == [200, 200]
+    response = client.get('/api/v1/tasks', headers=headers)
+
+    assert response.status_code == 429
+    assert 0 < int(response.headers['Retry-After']) <= 60
+    assert '2 per 1 minute' in response.get_json()['message']
+
+
+def test_authenticated_requests_are_counted_per_user(limited_app, users):
+    client = limited_app.test_client()
+    alice, bob = auth_headers(limited_app, users['alice']), auth_headers(limited_app, users['bob'])
+
+    statuses = [
+        client.get('/api/v1/tasks', headers=alice, environ_base={'REMOTE_ADDR': address}).status_code
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+    ]
+
+    # Other addresses don't reset alice's budget, and bob has a separate one
+    assert statuses == [200, 200, 429]
+    assert client.get('/api/v1/tasks', headers=bob, environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 200
@@ -0,0 +1,164 @@
+"""
+Tests of read replica routing.
+
+The primary and the replica are two SQLite files. The replica starts as a
+copy of the primary and is then changed directly, so that each response
+shows which database served it.
+"""
+
+import shutil
+import sqlite3
+
+import pytest
+
+from app import db
+from app.models.task import Task
+from app.services import replica_service
+from .conftest import auth_headers, make_app
+
+
+@pytest.fixture
+def replica_path(tmp_path):
+    return tmp_path / 'replica.db'
+
+
+@pytest.fixture
+def make_replica_app(app, database_uri, replica_path, redis_server, monkeypatch):
+    """
+    Create applications reading from a replica copied from the primary.
+
+    The response cache is off unless enabled, so that reads reach a database.
+    """
+    monkeypatch.setattr(replica_service, '_health', {})
+    with app.app_context():
+        db.engine.dispose()
+    shutil.copy(database_uri[len('sqlite:///'):], replica_path)
+    apps = []
+
+    def make(**settings):
+        settings = {
+            'CACHE_TYPE': 'RedisCache',
+            'TASK_CACHE_ENABLED': 'false',
+            'SQLALCHEMY_BINDS': {'replica_0': f'sqlite:///{replica_path}'},
+            'READ_REPLICA_BINDS': ['replica_0'],
+            **settings
+        }
+        apps.append(make_app(database_uri, **settings))
+        return apps[-1]
+
+    yield make
+    for replica_app in apps:
+        with replica_app.app_context():
+            for bind_key in (None, 'replica_0'):
+                db.get_engine(replica_app, bind=bind_key).dispose()
+
+
+@pytest.fixture
+def task_id(app, users):
+    """
+    A task of alice, created before the replica is copied.
+    """
+    response = app.test_client().post(
+        '/api/v1/tasks', json={'title': 'primary'}, headers=auth_headers(app, users['alice'])
+    )
+    return response.get_json()['id']
+
+
+def set_replica_title(replica_path, task_id, title):
+    with sqlite3.connect(replica_path) as connection:
+        connection.execute('UPDATE tasks SET title = ? WHERE id = ?', (title, task_id))
+
+
+def titles(client, headers):
+    return [task['title'] for task in client.get('/api/v1/tasks', headers=headers).get_json()]
+
+
+def test_reads_are_served_by_the_replica(task_id, make_replica_app, replica_path, headers):
+    app = make_replica_app()
+    set_replica_title(replica_path, task_id, 'replica')
+
+    client = app.test_client()
+    assert titles(client, headers['alice']) == ['replica']
+    assert client.get(f'/api/v1/tasks/{task_id}', headers=headers['alice']).get_json()['title'] == 'replica'
+
+
+def test_writer_reads_the_primary_after_a_write(task_id, make_replica_app, replica_path, headers):
+    app = make_replica_app()
+    client = app.test_client()
+    set_replica_title(replica_path, task_id, 'replica')
+    client.put(f'/api/v1/tasks/{task_id}', json={'title': 'written'}, headers=headers['alice'])
+
+    assert titles(client, headers['alice']) == ['written']
+    assert titles(client, headers['bob']) == []
+
+
+def test_stickiness_is_shared_by_workers(task_id, make_replica_app, replica_path, headers):
+    app, other_worker = make_replica_app(), make_replica_app()
+    set_replica_title(replica_path, task_id, 'replica')
+    app.test_client().put(f'/api/v1/tasks/{task_id}', json={'title': 'written'}, headers=headers['alice'])
+
+    assert titles(other_worker.test_client(), headers['alice']) == ['written']
+
+
+def test_cache_is_filled_from_the_primary_after_a_write(task_id, make_replica_app, replica_path, headers):
+    app = make_replica_app(TASK_CACHE_ENABLED='auto')
+    client = app.test_client()
+    assert titles(client, headers['admin']) == ['primary']
+
+    # The replica lags behind the write
+    client.put(f'/api/v1/tasks/{task_id}', json={'title': 'written'}, headers=headers['alice'])
+
+    assert titles(client, headers['admin']) == ['written']
+    set_replica_title(replica_path, task_id, 'written')
+    assert titles(client, headers['admin']) == ['written']
+
+
+def test_failed_replica_falls_back_to_the_primary(task_id, make_replica_app, replica_path, headers):
+    app = make_replica_app()
+    with app.app_context():
+        db.get_engine(app, bind='replica_0').dispose()
+    replica_path.unlink()
+
+    assert titles(app.test_client(), headers['alice']) == ['primary']
+    assert replica_service._health['replica_0'][0] is False
+
+
+def test_replicas_need_a_shared_cache_backend(database_uri, replica_path):
+    app = make_app(
+        database_uri,
+        SQLALCHEMY_BINDS={'replica_0': f'sqlite:///{replica_path}'},
+        READ_REPLICA_BINDS=['replica_0'],
+    )
+    assert app.extensions['read_replicas'] == []
+
+
+def test_stream_with_an_invalid_sort_fails_before_streaming(client, headers):
+    response = client.get('/api/v1/tasks?sort=bogus',
+                          headers={**headers['alice'], 'Accept': 'application/x-ndjson'})
+    assert response.status_code == 400
+
+    response = client.get('/api/v1/tasks/export?due_before=tomorrow', headers=headers['alice'])
+    assert response.status_code == 400
+
+
+def test_session_reads_the_primary_once_it_has_written(task_id, make_replica_app, replica_path, database_uri, users):
+    app = make_replica_app()
+    set_replica_title(replica_path, task_id, 'replica')
+
+    def title():
+        return db.session.query(Task.title).filter(Task.id == task_id).scalar()
+
+    with app.app_context(), db.reading_from('replica_0'):
+        assert title() == 'replica'
+        db.session.add(Task(title='new', user_id=users['alice']))
+        db.session.flush()
+        assert title() == 'primary'
+        assert db.session.query(Task).count() == 2
+        db.session.commit()
+        assert title() == 'primary'
+        db.session.remove()
+        assert title() == 'replica'
+
+    for path, count in ((database_uri[len('sqlite:///'):], 2), (replica_path, 1)):
+        with sqlite3.connect(path) as connection:
+            assert connection.execute('SELECT count(*) FROM tasks').fetchone()[0] == count
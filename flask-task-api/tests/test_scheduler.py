@@ -0,0 +1,188 @@
+"""
+Tests of the due date scheduler and its high-water marks.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.services.event_sinks import OutboxSink
+from app.services.scheduler_service import SchedulerService
+from .conftest import make_app
+
+NOW = datetime(2030, 1, 1, 12)
+
+
+class RecordingSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, events):
+        self.events += events
+
+
+@pytest.fixture
+def app(database_uri):
+    app = make_app(database_uri, SCHEDULER_REMINDER_LEAD=3600, SCHEDULER_BATCH_SIZE=2)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def add_tasks(user_id, *due_dates, status='pending'):
+    tasks = [Task(title=f'due {due}', user_id=user_id, due_date=due, status=status) for due in due_dates]
+    db.session.add_all(tasks)
+    db.session.commit()
+    return [task.id for task in tasks]
+
+
+def tick(at):
+    sink = RecordingSink()
+    counts = SchedulerService.tick(now=at, sinks=[sink])
+    return counts, [(event['type'], event['task_id']) for event in sink.events]
+
+
+def test_first_tick_sets_marks_without_reporting(app, users):
+    with app.app_context():
+        add_tasks(users['alice'], NOW - timedelta(minutes=5), NOW + timedelta(minutes=5))
+
+        assert tick(NOW) == ({'due_soon': 0, 'overdue': 0}, [])
+        state = SchedulerService.get_state()
+        assert state['overdue']['due_mark'] == NOW.isoformat()
+        assert state['due_soon']['due_mark'] == (NOW + timedelta(hours=1)).isoformat()
+
+
+def test_each_task_is_reported_once(app, users):
+    with app.app_context():
+        tick(NOW)
+        soon, later = add_tasks(users['alice'], NOW + timedelta(minutes=70), NOW + timedelta(minutes=90))
+        add_tasks(users['alice'], NOW + timedelta(minutes=80), status='completed')
+
+        counts, events = tick(NOW + timedelta(minutes=15))
+        assert (counts, events) == ({'due_soon': 1, 'overdue': 0}, [('task.due_soon', soon)])
+        assert tick(NOW + timedelta(minutes=15))[1] == []
+        assert tick(NOW + timedelta(minutes=75))[1] == [('task.due_soon', later), ('task.overdue', soon)]
+        assert tick(NOW + timedelta(minutes=95))[1] == [('task.overdue', later)]
+
+
+def test_batches_advance_the_mark_by_task_id(app, users):
+    with app.app_context():
+        tick(NOW)
+        due = NOW + timedelta(minutes=30)
+        ids = add_tasks(users['alice'], due, due, due)
+
+        counts, events = tick(NOW + timedelta(minutes=31))
+        assert counts['overdue'] == 3
+        assert [task_id for kind, task_id in events if kind == 'task.overdue'] == ids
+        assert SchedulerService.get_state()['overdue']['id_mark'] is None
+
+
+def test_tasks_behind_the_mark_are_not_reported(app, users):
+    with app.app_context():
+        tick(NOW)
+        add_tasks(users['alice'], NOW - timedelta(minutes=1))
+
+        assert tick(NOW + timedelta(minutes=1))[1] == []
+
+
+def test_outbox_sink_writes_task_events(app, users):
+    with app.app_context():
+        app.config['SCHEDULER_SINKS'] = 'outbox'
+        SchedulerService.tick(now=NOW)
+        task_id, = add_tasks(users['alice'], NOW + timedelta(minutes=10))
+        before = TaskEvent.query.count()
+
+        assert SchedulerService.tick(now=NOW + timedelta(minutes=11)) == {'due_soon': 0, 'overdue': 1}
+        events = TaskEvent.query.order_by(TaskEvent.id).offset(before).all()
+        assert [(event.type, event.task_id) for event in events] == [('task.overdue', task_id)]
+
+
+def fail_state_updates(errorname):
+    """
+    Make the next mark updates fail with a SQLite error of the given result code.
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE scheduler_state'):
+            error = sqlite3.OperationalError('database is locked' if 'BUSY' in errorname else 'disk I/O error')
+            error.sqlite_errorname = errorname
+            raise OperationalError(statement, parameters, error)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_lost_mark_race_ends_the_scan(app, users):
+    with app.app_context():
+        tick(NOW)
+        add_tasks(users['alice'], NOW + timedelta(minutes=10))
+        restore = fail_state_updates('SQLITE_BUSY_SNAPSHOT')
+        try:
+            assert tick(NOW + timedelta(minutes=11))[0] == {'due_soon': 0, 'overdue': 0}
+        finally:
+            restore()
+        assert SchedulerService.get_state()['overdue']['due_mark'] == NOW.isoformat()
+
+
+def test_other_write_errors_are_raised(app, users):
+    with app.app_context():
+        tick(NOW)
+        restore = fail_state_updates('SQLITE_IOERR')
+        try:
+            with pytest.raises(OperationalError):
+                tick(NOW + timedelta(minutes=1))
+        finally:
+            restore()
+        assert SchedulerService.get_state()['overdue']['due_mark'] == NOW.isoformat()
+
+
+def test_scheduler_losing_the_race_emits_nothing(app, users, database_uri):
+    settings = dict(SCHEDULER_REMINDER_LEAD=3600, SCHEDULER_BATCH_SIZE=2,
+                    SQLITE_PRAGMAS={'journal_mode': 'WAL', 'busy_timeout': 5000})
+    first, second = make_app(database_uri, **settings), make_app(database_uri, **settings)
+    with second.app_context():
+        SchedulerService.tick(now=NOW, sinks=[OutboxSink(second.config)])
+        task_id, = add_tasks(users['alice'], NOW + timedelta(minutes=10))
+        db.session.remove()
+    at = NOW + timedelta(minutes=11)
+
+    def run_second():
+        with second.app_context():
+            SchedulerService.tick(now=at, sinks=[OutboxSink(second.config)])
+            db.session.remove()
+
+    other = threading.Thread(target=run_second)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # The other scheduler completes the overdue scan after this one read its mark
+        writes = statement.startswith('INSERT INTO task_events') or (
+            statement.startswith('UPDATE scheduler_state') and 'overdue' in parameters
+        )
+        if writes and other.ident is None:
+            other.start()
+            other.join()
+
+    with first.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        sink = RecordingSink()
+        assert SchedulerService.tick(now=at, sinks=[OutboxSink(first.config), sink]) == {
+            'due_soon': 0, 'overdue': 0
+        }
+        assert sink.events == []
+        assert [(row.type, row.task_id) for row in TaskEvent.query.filter_by(type='task.overdue')] == [
+            ('task.overdue', task_id)
+        ]
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        db.session.remove()
+    for scheduler in (first, second):
+        with scheduler.app_context():
+            db.engine.dispose()
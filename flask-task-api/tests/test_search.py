@@ -0,0 +1,67 @@
+"""
+Tests of task search and of the full-text index that backs it.
+"""
+
+from sqlalchemy import text
+
+from app import db
+from app.models.task import Task
+from app.utils import search
+from app.utils.timestamps import utcnow
+
+
+def search_titles(client, headers, query):
+    response = client.get('/api/v1/tasks/search', query_string={'q': query}, headers=headers)
+    assert response.status_code == 200
+    return [task['title'] for task in response.get_json()]
+
+
+def test_search_matches_every_word_and_a_last_prefix(client, headers):
+    for title in ('Quarterly report draft', 'Quarterly planning', 'Annual report'):
+        client.post('/api/v1/tasks', json={'title': title}, headers=headers['alice'])
+    client.post('/api/v1/tasks', json={'title': 'Quarterly report'}, headers=headers['bob'])
+
+    assert search_titles(client, headers['alice'], 'quarterly rep') == ['Quarterly report draft']
+    assert sorted(search_titles(client, headers['alice'], 'quart')) == ['Quarterly planning', 'Quarterly report draft']
+    assert search_titles(client, headers['alice'], 'report OR "planning') == []
+    assert client.get('/api/v1/tasks/search', query_string={'q': '!?'}, headers=headers['alice']).status_code == 400
+
+
+def test_search_index_follows_updates_and_deletes(client, headers):
+    task_id = client.post('/api/v1/tasks', json={'title': 'Draft budget'}, headers=headers['alice']).get_json()['id']
+    client.put(f'/api/v1/tasks/{task_id}', json={'title': 'Final budget', 'description': 'send to finance'},
+               headers=headers['alice'])
+
+    assert search_titles(client, headers['alice'], 'draft') == []
+    assert search_titles(client, headers['alice'], 'final finance') == ['Final budget']
+
+    client.delete(f'/api/v1/tasks/{task_id}', headers=headers['alice'])
+
+    assert search_titles(client, headers['alice'], 'budget') == []
+
+
+def test_suspended_index_is_filled_by_rebuild(app, client, headers, users):
+    client.post('/api/v1/tasks', json={'title': 'Indexed before'}, headers=headers['alice'])
+    with app.app_context():
+        connection = db.session.connection()
+        search.suspend_index(connection)
+        now = utcnow()
+        db.session.execute(Task.__table__.insert(), [
+            {'title': f'Loaded {number}', 'user_id': users['alice'], 'status': 'pending',
+             'priority': 'medium', 'created_at': now, 'updated_at': now}
+            for number in range(3)
+        ])
+        db.session.commit()
+
+    assert search_titles(client, headers['alice'], 'loaded') == []
+
+    with app.app_context():
+        search.rebuild_index(db.session.connection())
+        db.session.commit()
+        triggers = db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars()
+        assert set(triggers) >= {'tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update'}
+
+    assert sorted(search_titles(client, headers['alice'], 'loaded')) == ['Loaded 0', 'Loaded 1', 'Loaded 2']
+    assert search_titles(client, headers['alice'], 'indexed') == ['Indexed before']
+    client.post('/api/v1/tasks', json={'title': 'Indexed after'}, headers=headers['alice'])
+    assert search_titles(client, headers['alice'], 'indexed after') == ['Indexed after']
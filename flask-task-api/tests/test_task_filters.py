@@ -0,0 +1,81 @@
+"""
+Tests of the task list filters and sorting, and of the indexes serving them.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import event, inspect, text
+
+from app import db
+from .conftest import make_app
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+LIST_INDEXES = {'ix_tasks_user_id', 'ix_tasks_user_id_status_due_date', 'ix_tasks_user_id_updated_at'}
+
+
+@pytest.fixture
+def tasks(client, headers):
+    due = datetime(2030, 1, 1)
+    items = [
+        {'title': f'task {index}', 'status': ('pending', 'completed')[index % 2],
+         'due_date': (due + timedelta(days=5 - index)).isoformat()}
+        for index in range(6)
+    ]
+    client.post('/api/v1/tasks:batch', json={'tasks': items}, headers=headers['alice'])
+    client.post('/api/v1/tasks', json={'title': 'other user'}, headers=headers['bob'])
+
+
+def list_titles(client, headers, query):
+    response = client.get(f'/api/v1/tasks?{query}', headers=headers)
+    assert response.status_code == 200
+    return [task['title'] for task in response.get_json()]
+
+
+def test_filters_and_sort_apply_in_the_query(client, headers, tasks):
+    assert list_titles(client, headers['alice'], 'status=pending&sort=due_date') == ['task 4', 'task 2', 'task 0']
+    assert list_titles(client, headers['alice'], 'status=completed&due_before=2030-01-04T00:00:00Z') == [
+        'task 3', 'task 5'
+    ]
+    assert client.get('/api/v1/tasks?sort=title', headers=headers['alice']).status_code == 400
+
+
+@pytest.mark.parametrize('query, index', [
+    ('status=pending&sort=due_date', 'ix_tasks_user_id_status_due_date'),
+    ('sort=-updated_at', 'ix_tasks_user_id_updated_at'),
+])
+def test_list_queries_use_the_composite_indexes(app, client, headers, tasks, query, index):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT') and 'FROM tasks' in statement and 'LIMIT' in statement:
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            list_titles(client, headers['alice'], query)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        statement, parameters = statements[-1]
+        with db.engine.connect() as connection:
+            rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+            plan = ' '.join(row[-1] for row in rows)
+
+    # The index both selects and orders the rows
+    assert plan.startswith(f'SEARCH tasks USING INDEX {index} (user_id=?'), plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_migrations_create_the_list_indexes(tmp_path):
+    app = make_app('sqlite:///' + str(tmp_path / 'migrated.db'))
+    Migrate(app, db, directory=MIGRATIONS)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('tasks')}
+        assert db.session.execute(text('SELECT version_num FROM alembic_version')).scalar() == '0003'
+        db.session.remove()
+        db.engine.dispose()
+    assert LIST_INDEXES <= indexes
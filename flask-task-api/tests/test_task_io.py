@@ -0,0 +1,91 @@
+"""
+Tests of the streaming task export and import.
+"""
+
+import io
+import json
+
+import pytest
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from app.utils.task_io import InvalidRecord, decode_tasks
+
+
+class ServerBody:
+    """
+    Request body offering only read(size), like gunicorn's Body object.
+    """
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+
+@pytest.mark.parametrize('wrap', [io.BytesIO, ServerBody])
+def test_decode_ndjson(wrap):
+    data = b'\xef\xbb\xbf{"title": "first"}\n\nnot json\n{"title": "caf\xc3\xa9"}\n'
+
+    records = list(decode_tasks(wrap(data), 'ndjson'))
+
+    assert records[0] == {'title': 'first'}
+    assert isinstance(records[1], InvalidRecord)
+    assert records[2] == {'title': 'café'}
+
+
+@pytest.mark.parametrize('wrap', [io.BytesIO, ServerBody])
+def test_decode_csv_skips_empty_cells(wrap):
+    data = b'id,title,priority\r\n7,first,high\r\n8,second,\r\n'
+
+    records = list(decode_tasks(wrap(data), 'csv'))
+
+    assert records == [
+        {'id': '7', 'title': 'first', 'priority': 'high'},
+        {'id': '8', 'title': 'second'},
+    ]
+
+
+def test_import_reads_a_server_body(app, headers):
+    body = b'{"title": "first"}\n{"title": "second"}\n'
+    environ = EnvironBuilder('/api/v1/tasks/import?format=ndjson', method='POST', data=body,
+                             headers=headers['alice']).get_environ()
+    # Werkzeug passes wsgi.input through as is when the server terminates it
+    environ.update({'wsgi.input': ServerBody(body), 'wsgi.input_terminated': True})
+
+    app_iter, status, _ = run_wsgi_app(app, environ, buffered=True)
+
+    assert status == '200 OK'
+    assert json.loads(b''.join(app_iter)) == {'processed': 2, 'created': 2, 'failed': 0, 'errors': []}
+
+
+@pytest.mark.parametrize('format', ['csv', 'ndjson'])
+def test_export_import_round_trip(client, headers, format):
+    tasks = [
+        {'title': 'first', 'description': 'a, "quoted"\nline', 'priority': 'high'},
+        {'title': 'second', 'status': 'completed', 'due_date': '2030-01-02T03:04:05'},
+    ]
+    for task in tasks:
+        client.post('/api/v1/tasks', json=task, headers=headers['alice'])
+
+    exported = client.get(f'/api/v1/tasks/export?format={format}', headers=headers['alice']).get_data()
+    response = client.post(f'/api/v1/tasks/import?format={format}', data=exported, headers=headers['bob'])
+    assert response.get_json()['created'] == 2
+
+    fields = ('title', 'description', 'status', 'priority', 'due_date')
+    listed = {
+        username: [{field: task[field] for field in fields}
+                   for task in client.get('/api/v1/tasks', headers=headers[username]).get_json()]
+        for username in ('alice', 'bob')
+    }
+    assert listed['bob'] == listed['alice']
+
+
+def test_import_reports_failed_records(client, headers):
+    body = '\n'.join(json.dumps(record) for record in [{'title': 'ok'}, {'priority': 'high'}, {'title': 'ok'}])
+    response = client.post('/api/v1/tasks/import', data=body, content_type='application/x-ndjson',
+                           headers=headers['alice'])
+
+    summary = response.get_json()
+    assert (summary['processed'], summary['created'], summary['failed']) == (3, 2, 1)
+    assert summary['errors'][0]['index'] == 1
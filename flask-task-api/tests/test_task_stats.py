@@ -0,0 +1,77 @@
+"""
+Tests of the task statistics counters.
+"""
+
+from collections import Counter
+
+from app import db
+from app.models.task_stat import TaskStat
+from app.services import task_service
+from app.services.task_service import TaskService
+
+
+def counters(app):
+    with app.app_context():
+        return {(row.user_id, row.status, row.priority): row.count
+                for row in TaskStat.query.filter(TaskStat.count != 0)}
+
+
+def rebuilt_counters(app):
+    with app.app_context():
+        TaskService.rebuild_stats()
+    return counters(app)
+
+
+def test_counters_follow_task_writes(app, client, headers):
+    alice, bob = headers['alice'], headers['bob']
+    first = client.post('/api/v1/tasks', json={'title': 'a', 'priority': 'high'}, headers=alice).get_json()
+    client.post('/api/v1/tasks:batch', json={'tasks': [{'title': 'b'}, {'title': 'c', 'status': 'completed'}]},
+                headers=alice)
+    client.post('/api/v1/tasks', json={'title': 'd'}, headers=bob)
+    client.put(f"/api/v1/tasks/{first['id']}", json={'status': 'completed'}, headers=alice)
+    client.delete('/api/v1/tasks:batch', json={'ids': [first['id'] + 1]}, headers=alice)
+
+    live = counters(app)
+    assert sum(live.values()) == 3
+    assert live == rebuilt_counters(app)
+
+    response = client.get('/api/v1/admin/tasks/stats', headers=headers['admin'])
+    assert response.get_json()['by_status'] == {'completed': 2, 'pending': 1}
+
+
+def test_counters_are_upserted(app, users):
+    key = (users['alice'], 'pending', 'low')
+    with app.app_context():
+        for delta in (2, 3, -1):
+            task_service._adjust_stats(Counter({key: delta}))
+            db.session.commit()
+    assert counters(app) == {key: 4}
+
+
+def test_counters_accept_mixed_key_types(app, users):
+    alice = users['alice']
+    with app.app_context():
+        task_service._adjust_stats(Counter({(alice, 'pending', 1): 1, (alice, 'pending', 'high'): 1}))
+        db.session.commit()
+    assert counters(app) == {(alice, 'pending', '1'): 1, (alice, 'pending', 'high'): 1}
+
+
+def test_status_and_priority_are_validated(app, client, users, headers):
+    alice = headers['alice']
+    assert client.post('/api/v1/tasks', json={'title': 'a', 'priority': 1}, headers=alice).status_code == 400
+    assert client.post('/api/v1/tasks', json={'title': 'a', 'status': 'done'}, headers=alice).status_code == 400
+
+    results = client.post('/api/v1/tasks:batch', json={'tasks': [
+        {'title': 'b', 'priority': 'high'}, {'title': 'c', 'priority': 2},
+    ]}, headers=alice).get_json()['results']
+    assert [result['status'] for result in results] == [201, 400]
+
+    task_id = results[0]['id']
+    assert client.put(f'/api/v1/tasks/{task_id}', json={'priority': 3}, headers=alice).status_code == 400
+    results = client.patch('/api/v1/tasks:batch', json={'tasks': [
+        {'id': task_id, 'priority': 'low'}, {'id': task_id, 'status': None},
+    ]}, headers=alice).get_json()['results']
+    assert [result['status'] for result in results] == [200, 400]
+
+    assert counters(app) == {(users['alice'], 'pending', 'low'): 1}
+    assert counters(app) == rebuilt_counters(app)
@@ -0,0 +1,77 @@
+"""
+Tests of the verified token cache and the revoked token list.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+
+from flask_jwt_extended import JWTManager
+
+from app.asgi import TaskAsgiApp
+from app.services import token_service
+
+
+def test_jwt_manager_decode_signature_is_unchanged():
+    # CachingJWTManager overrides this private method of flask-jwt-extended
+    signature = inspect.signature(JWTManager._decode_jwt_from_config)
+
+    assert [(name, parameter.default) for name, parameter in signature.parameters.items()] == [
+        ('self', inspect.Parameter.empty),
+        ('encoded_token', inspect.Parameter.empty),
+        ('csrf_value', None),
+        ('allow_expired', False),
+    ]
+
+
+def test_verified_tokens_are_served_from_the_cache(app, client, headers):
+    for _ in range(3):
+        assert client.get('/api/v1/tasks', headers=headers['alice']).status_code == 200
+
+    with app.app_context():
+        stats = token_service.get_stats()['claims_cache']
+    assert (stats['misses'], stats['hits']) == (1, 2)
+
+
+def test_later_syncs_do_not_block_checks(app, monkeypatch):
+    blocklist = token_service.TokenBlocklist(app, 0)
+    with app.app_context():
+        assert 'revoked' not in blocklist
+
+    started, release = threading.Event(), threading.Event()
+    sync = token_service.TokenBlocklist.sync
+
+    def slow_sync(self):
+        started.set()
+        release.wait(5)
+        sync(self)
+        self._tokens['revoked'] = time.time() + 60
+
+    monkeypatch.setattr(token_service.TokenBlocklist, 'sync', slow_sync)
+    assert 'revoked' not in blocklist
+    assert started.wait(5)
+    assert 'revoked' not in blocklist
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while 'revoked' not in blocklist._tokens and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 'revoked' in blocklist
+
+
+def test_asgi_startup_runs_the_first_sync(app):
+    asgi_app = TaskAsgiApp(app)
+    messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert app.extensions['token_blocklist']._synced_from is not None
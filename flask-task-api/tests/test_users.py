@@ -0,0 +1,91 @@
+"""
+Tests of user registration, bulk provisioning and the bulk insert helper.
+"""
+
+import threading
+
+from app import db
+from app.models.task import Task
+from app.models.user import User
+from app.utils.bulk import insert_rows
+from app.utils.timestamps import utcnow
+from .conftest import make_app
+
+
+def register(client, username, email, **extra):
+    return client.post('/api/v1/auth/register',
+                       json={'username': username, 'email': email, 'password': 'password', **extra})
+
+
+def test_register_rejects_taken_username_and_email(app, client, users):
+    assert register(client, 'carol', 'carol@example.com').status_code == 201
+
+    taken_username = register(client, 'alice', 'other@example.com')
+    taken_email = register(client, 'other', 'alice@example.com')
+
+    assert (taken_username.status_code, taken_username.get_json()['message']) == (400, 'Username already exists')
+    assert (taken_email.status_code, taken_email.get_json()['message']) == (400, 'Email already exists')
+    with app.app_context():
+        assert User.query.count() == 4
+
+
+def test_batch_provisioning_reports_each_item(app, client, headers):
+    items = [
+        {'username': 'carol', 'email': 'carol@example.com', 'password': 'password'},
+        {'username': 'alice', 'email': 'new@example.com', 'password': 'password'},
+        {'username': 'dave', 'email': 'carol@example.com', 'password': 'password'},
+        {'username': 'erin', 'email': 'erin@example.com', 'password': 'password', 'role': 'root'},
+        {'username': 'frank', 'email': 'frank@example.com'},
+        {'username': 'grace', 'email': 'grace@example.com', 'password': 'password', 'role': 'admin'},
+    ]
+    response = client.post('/api/v1/admin/users:batch', json={'users': items}, headers=headers['admin'])
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == [201, 400, 400, 400, 400, 201]
+    assert [result.get('message') for result in results[1:3]] == ['Username already exists', 'Email already exists']
+    with app.app_context():
+        created = {result['id']: db.session.get(User, result['id']) for result in (results[0], results[5])}
+        assert [(user.username, user.role) for user in created.values()] == [('carol', 'user'), ('grace', 'admin')]
+        assert created[results[5]['id']].check_password('password')
+
+
+def test_batch_provisioning_requires_admin(client, headers):
+    items = [{'username': 'carol', 'email': 'carol@example.com', 'password': 'password'}]
+
+    assert client.post('/api/v1/admin/users:batch', json={'users': items}, headers=headers['alice']).status_code == 403
+
+
+def test_insert_rows_ids_match_rows_under_concurrent_inserts(database_uri, users):
+    settings = dict(SQLITE_PRAGMAS={'journal_mode': 'WAL', 'busy_timeout': 5000})
+    apps = [make_app(database_uri, **settings) for _ in range(2)]
+    inserted = {}
+    errors = []
+
+    def insert(app, name):
+        try:
+            with app.app_context():
+                for round_number in range(20):
+                    now = utcnow()
+                    mappings = [
+                        {'title': f'{name}-{round_number}-{index}', 'user_id': users['alice'],
+                         'status': 'pending', 'priority': 'medium', 'created_at': now, 'updated_at': now}
+                        for index in range(25)
+                    ]
+                    insert_rows(Task.__table__, mappings)
+                    db.session.commit()
+                    inserted.update((mapping['id'], mapping['title']) for mapping in mappings)
+                db.session.remove()
+        except Exception as error:  # pragma: no cover - reported below
+            errors.append(error)
+
+    threads = [threading.Thread(target=insert, args=(app, f'app{number}')) for number, app in enumerate(apps)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(inserted) == 1000
+    with apps[0].app_context():
+        assert dict(db.session.query(Task.id, Task.title)) == inserted
@@ -0,0 +1,17 @@
+"""
+WSGI entry point of the Flask Task Management API for production servers.
+
+Serve the API with gunicorn and the settings of gunicorn.conf.py::
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Unlike app.py, importing this module neither creates the database tables
+nor imports the ``flask`` commands, so worker processes start quickly.
+Migrate the database once per deployment with ``flask db upgrade``. The
+configuration is chosen with FLASK_CONFIG (default: production).
+"""
+
+import os
+from app import create_app
+
+app = create_app(os.getenv('FLASK_CONFIG', 'production'), cli=False)